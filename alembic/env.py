@@ -3,10 +3,11 @@ import typing as t
 from logging.config import fileConfig
 
 from alembic import context
-from sqlalchemy import engine_from_config, pool
+from sqlalchemy import engine_from_config, pool, text
 from sqlalchemy.ext.asyncio import AsyncEngine
 
-from bot.databases import DatabaseBase
+from bot import config as bot_config
+from bot.databases import DatabaseBase, bring_databases_into_scope
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -16,10 +17,19 @@ config = context.config
 # This line sets up loggers basically.
 fileConfig(config.config_file_name)
 
+# The database of the bot's environment is used when it's configured, otherwise the one
+# in `alembic.ini`. Pass `-x url=<url>` to run against any other database, like a local one.
+url = context.get_x_argument(as_dictionary=True).get("url")
+if url is None and bot_config.DATABASE["hostname"]:
+    url = bot_config.DATABASE_CONN
+if url is not None:
+    config.set_main_option("sqlalchemy.url", url)
+
 # add your model's MetaData object here
 # for 'autogenerate' support
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
+bring_databases_into_scope()
 target_metadata = DatabaseBase.metadata
 
 
@@ -52,6 +62,8 @@ def do_run_migrations(connection: t.Any) -> None:
     context.configure(connection=connection, target_metadata=target_metadata)
 
     with context.begin_transaction():
+        # Clusters starting together with AUTO_MIGRATE take turns, the later ones find nothing to do.
+        connection.execute(text("SELECT pg_advisory_xact_lock(hashtext('alembic'))"))
         context.run_migrations()
 
 
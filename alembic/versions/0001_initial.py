@@ -0,0 +1,179 @@
+"""Initial tables
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases created before the migrations already have some of the tables.
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "announcements" not in existing:
+        op.create_table(
+            "announcements",
+            sa.Column("guild_id", sa.BigInteger(), nullable=False),
+            sa.Column("channel_id", sa.BigInteger(), nullable=True),
+            sa.Column("role_id", sa.BigInteger(), nullable=True),
+            sa.PrimaryKeyConstraint("guild_id"),
+            sa.UniqueConstraint("guild_id"),
+        )
+
+    if "autoroles" not in existing:
+        op.create_table(
+            "autoroles",
+            sa.Column("guild_id", sa.BigInteger(), nullable=False),
+            sa.Column("auto_roles", postgresql.ARRAY(sa.BigInteger()), nullable=True),
+            sa.PrimaryKeyConstraint("guild_id"),
+            sa.UniqueConstraint("guild_id"),
+        )
+
+    if "command_stats" not in existing:
+        op.create_table(
+            "command_stats",
+            sa.Column("command", sa.String(), nullable=False),
+            sa.Column("usage_count", sa.BigInteger(), nullable=False),
+            sa.PrimaryKeyConstraint("command"),
+            sa.UniqueConstraint("command"),
+        )
+
+    if "hackernews_feed" not in existing:
+        op.create_table(
+            "hackernews_feed",
+            sa.Column("guild_id", sa.BigInteger(), nullable=False),
+            sa.Column("channel_id", sa.BigInteger(), nullable=False),
+            sa.PrimaryKeyConstraint("guild_id"),
+            sa.UniqueConstraint("guild_id"),
+        )
+
+    if "link_lock" not in existing:
+        op.create_table(
+            "link_lock",
+            sa.Column("guild_id", sa.BigInteger(), nullable=False),
+            sa.Column("lock_code", sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint("guild_id"),
+            sa.UniqueConstraint("guild_id"),
+        )
+
+    if "logging" not in existing:
+        op.create_table(
+            "logging",
+            sa.Column("guild_id", sa.BigInteger(), nullable=False),
+            sa.Column("server_log", sa.BigInteger(), nullable=True),
+            sa.Column("mod_log", sa.BigInteger(), nullable=True),
+            sa.Column("message_log", sa.BigInteger(), nullable=True),
+            sa.Column("member_log", sa.BigInteger(), nullable=True),
+            sa.Column("join_log", sa.BigInteger(), nullable=True),
+            sa.Column("voice_log", sa.BigInteger(), nullable=True),
+            sa.PrimaryKeyConstraint("guild_id"),
+            sa.UniqueConstraint("guild_id"),
+        )
+
+    if "mod_lock" not in existing:
+        op.create_table(
+            "mod_lock",
+            sa.Column("guild_id", sa.BigInteger(), nullable=False),
+            sa.Column("lock_code", sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint("guild_id"),
+            sa.UniqueConstraint("guild_id"),
+        )
+
+    if "prefixes" not in existing:
+        op.create_table(
+            "prefixes",
+            sa.Column("context_id", sa.BigInteger(), nullable=False),
+            sa.Column("prefix", sa.String(), nullable=False),
+            sa.PrimaryKeyConstraint("context_id"),
+            sa.UniqueConstraint("context_id"),
+        )
+
+    if "roles" not in existing:
+        op.create_table(
+            "roles",
+            sa.Column("guild_id", sa.BigInteger(), nullable=False),
+            sa.Column("mod_role", postgresql.ARRAY(sa.BigInteger()), nullable=True),
+            sa.Column("mute_role", sa.BigInteger(), nullable=True),
+            sa.Column("default_role", sa.BigInteger(), nullable=True),
+            sa.PrimaryKeyConstraint("guild_id"),
+            sa.UniqueConstraint("guild_id"),
+        )
+
+    if "suggestion_config" not in existing:
+        op.create_table(
+            "suggestion_config",
+            sa.Column("guild_id", sa.BigInteger(), nullable=False),
+            sa.Column("channel_id", sa.BigInteger(), nullable=True),
+            sa.Column("submission_channel_id", sa.BigInteger(), nullable=True),
+            sa.Column("anonymous", sa.Boolean(), nullable=True),
+            sa.Column("dm_notification", sa.Boolean(), nullable=True),
+            sa.Column("limit", sa.BigInteger(), nullable=True),
+            sa.PrimaryKeyConstraint("guild_id"),
+            sa.UniqueConstraint("channel_id"),
+            sa.UniqueConstraint("guild_id"),
+            sa.UniqueConstraint("submission_channel_id"),
+        )
+
+    if "suggestion_user" not in existing:
+        op.create_table(
+            "suggestion_user",
+            sa.Column("user_id", sa.BigInteger(), nullable=False),
+            sa.Column("anonymous", sa.Boolean(), nullable=True),
+            sa.Column("dm_notification", sa.Boolean(), nullable=True),
+            sa.PrimaryKeyConstraint("user_id"),
+            sa.UniqueConstraint("user_id"),
+        )
+
+    if "suggestion" not in existing:
+        op.create_table(
+            "suggestion",
+            sa.Column("suggestion_id", sa.BigInteger(), autoincrement=True, nullable=False),
+            sa.Column("guild_id", sa.BigInteger(), nullable=False),
+            sa.Column("user_id", sa.BigInteger(), nullable=False),
+            sa.Column("message_id", sa.BigInteger(), nullable=False),
+            sa.Column("accepted", sa.Boolean(), nullable=True),
+            sa.Column("suggestion", sa.String(), nullable=True),
+            sa.PrimaryKeyConstraint("suggestion_id", "guild_id"),
+            sa.UniqueConstraint("guild_id"),
+            sa.UniqueConstraint("message_id"),
+            sa.UniqueConstraint("suggestion_id"),
+            sa.UniqueConstraint("user_id"),
+        )
+
+    if "swear_filter" not in existing:
+        op.create_table(
+            "swear_filter",
+            sa.Column("guild_id", sa.BigInteger(), nullable=False),
+            sa.Column("manual_on", sa.Boolean(), nullable=True),
+            sa.Column("autoswear", sa.Boolean(), nullable=True),
+            sa.Column("notification", sa.Boolean(), nullable=True),
+            sa.Column("words", postgresql.ARRAY(sa.String()), nullable=True),
+            sa.PrimaryKeyConstraint("guild_id"),
+            sa.UniqueConstraint("guild_id"),
+        )
+
+
+def downgrade():
+    op.drop_table("swear_filter")
+    op.drop_table("suggestion")
+    op.drop_table("suggestion_user")
+    op.drop_table("suggestion_config")
+    op.drop_table("roles")
+    op.drop_table("prefixes")
+    op.drop_table("mod_lock")
+    op.drop_table("logging")
+    op.drop_table("link_lock")
+    op.drop_table("hackernews_feed")
+    op.drop_table("command_stats")
+    op.drop_table("autoroles")
+    op.drop_table("announcements")
@@ -0,0 +1,43 @@
+"""Event log
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 12:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases created before the migrations may already have the table and its indexes.
+    if "event_log" in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table(
+        "event_log",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("guild_id", sa.BigInteger(), nullable=False),
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column("event_type", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("data", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_event_log_guild_user_time", "event_log", ["guild_id", "user_id", "created_at"])
+    op.create_index("ix_event_log_guild_type_time", "event_log", ["guild_id", "event_type", "created_at"])
+    op.create_index("ix_event_log_created_at_brin", "event_log", ["created_at"], postgresql_using="brin")
+
+
+def downgrade():
+    op.drop_index("ix_event_log_created_at_brin", table_name="event_log")
+    op.drop_index("ix_event_log_guild_type_time", table_name="event_log")
+    op.drop_index("ix_event_log_guild_user_time", table_name="event_log")
+    op.drop_table("event_log")
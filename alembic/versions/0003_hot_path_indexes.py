@@ -0,0 +1,33 @@
+"""Indexes for the hot path queries
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 12:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Top commands for `sudo command-stats`.
+    op.create_index("ix_command_stats_usage_count", "command_stats", [sa.text("usage_count DESC")])
+
+    # Member log channels, loaded for every guild on startup.
+    op.create_index(
+        "ix_logging_member_log",
+        "logging",
+        ["guild_id", "member_log"],
+        postgresql_where=sa.text("member_log IS NOT NULL"),
+    )
+
+
+def downgrade():
+    op.drop_index("ix_logging_member_log", table_name="logging")
+    op.drop_index("ix_command_stats_usage_count", table_name="command_stats")
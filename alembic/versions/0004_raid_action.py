@@ -0,0 +1,23 @@
+"""Automatic lock on raids
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 15:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("mod_lock", sa.Column("raid_action", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade():
+    op.drop_column("mod_lock", "raid_action")
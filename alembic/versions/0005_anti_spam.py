@@ -0,0 +1,29 @@
+"""Spam detection settings
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 16:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "anti_spam",
+        sa.Column("guild_id", sa.BigInteger(), nullable=False),
+        sa.Column("enabled", sa.Boolean(), nullable=False),
+        sa.PrimaryKeyConstraint("guild_id"),
+        sa.UniqueConstraint("guild_id"),
+    )
+
+
+def downgrade():
+    op.drop_table("anti_spam")
@@ -1,6 +1,7 @@
 import asyncio
-import collections
+import importlib
 import sys
+import time
 import typing as t
 from datetime import datetime
 
@@ -8,14 +9,26 @@ import aiohttp
 import discord
 import spotify
 from asyncpg.exceptions import InvalidPasswordError
-from discord.ext.commands import AutoShardedBot, Context
+from discord.ext.commands import AutoShardedBot, Cog, Command, CommandError, Context
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from bot import config
-from bot.databases import DatabaseBase, bring_databases_into_scope
+from bot.core.autoroles import AutoRoleQueue
+from bot.core.event_store import EventStore
+from bot.core.executor import CPUExecutor
+from bot.core.ipc import IPCClient
+from bot.core.log_dispatcher import LogDispatcher
+from bot.core.loop_monitor import LoopMonitor
+from bot.core.member_resolver import MemberResolver
+from bot.core.profiler import Profiler
+from bot.core.shard_stats import ShardStats
+from bot.core.telemetry import Telemetry
+from bot.databases import bring_databases_into_scope, get_schema_head, get_schema_version, upgrade_schema
 from bot.databases.prefix import Prefix
+from bot.utils.audit_log import AuditLogTail
+from bot.utils.fuzzy import TrigramIndex
 
 # Logging configuration
 logger.configure(
@@ -34,6 +47,9 @@ logger.configure(
 class Bot(AutoShardedBot):
     def __init__(self, *args, **kwargs) -> None:
         """Initialize the subclass."""
+        # Fuzzy index of the command names, created first as the help command is added on init
+        self.command_index = TrigramIndex()
+
         super().__init__(*args, **kwargs)
 
         # Bot info
@@ -41,6 +57,11 @@ class Bot(AutoShardedBot):
         self.cluster_count = kwargs.get("cluster_count")
         self.version = kwargs.get("version")
 
+        # Connection to the cluster launcher, when running as one of many clusters
+        self.ipc = None
+        if kwargs.get("ipc_port"):
+            self.ipc = IPCClient(self, "127.0.0.1", kwargs["ipc_port"])
+
         # Prefix loading
         self.default_prefix = config.COMMAND_PREFIX
         self.prefix_dict = {}
@@ -52,12 +73,34 @@ class Bot(AutoShardedBot):
         self.session = None
         self.database = None
 
+        # Shared pool for CPU bound work
+        self.executor = CPUExecutor(max_workers=config.cpu_workers)
+
+        # Batched delivery to the log channels
+        self.log_dispatcher = LogDispatcher(self)
+
+        # Persistent history of the logged events
+        self.event_store = EventStore(self, retention=config.event_log_retention)
+
+        # Recent audit log entries, for correlating events to moderators
+        self.audit_logs = AuditLogTail()
+
+        # Batched member lookups
+        self.member_resolver = MemberResolver(self)
+
+        # Queued auto role assignment on join
+        self.autoroles = AutoRoleQueue(self)
+
         # Counters config
-        self.bot_counters = collections.defaultdict(collections.Counter)
-        self.guild_counters = collections.defaultdict(collections.Counter)
+        self.shard_stats = ShardStats(self)
+        self.telemetry = Telemetry(self)
+        self.profiler = Profiler()
+        self.loop_monitor = LoopMonitor(self)
 
         # Startup config
         self.initial_call = True
+        self.startup_phases: t.Dict[str, float] = {}
+        self._warm_up_task: t.Optional[asyncio.Task] = None
 
         # Spotify
         self.spotify = spotify.Client(
@@ -76,14 +119,14 @@ class Bot(AutoShardedBot):
         return await super().is_owner(user)
 
     async def init_db(self) -> sessionmaker:
-        """Initialize the database."""
+        """Initialize the database, checking that its schema is up to date."""
         bring_databases_into_scope()
 
         engine = create_async_engine(config.DATABASE_CONN, pool_size=30, max_overflow=0)
 
         try:
-            async with engine.begin() as conn:
-                await conn.run_sync(DatabaseBase.metadata.create_all)
+            async with engine.connect() as conn:
+                version = await get_schema_version(conn)
         except InvalidPasswordError as exc:
             logger.critical("The database password entered is invalid.")
             raise exc
@@ -93,33 +136,90 @@ class Bot(AutoShardedBot):
 
             return await self.init_db()
 
+        head = get_schema_head()
+        if version != head:
+            if not config.auto_migrate:
+                logger.critical(f"The database schema is at {version}, expected {head}. Run `alembic upgrade head`.")
+                raise RuntimeError("The database schema is outdated.")
+
+            logger.info(f"Migrating the database schema from {version} to {head}.")
+            await asyncio.get_running_loop().run_in_executor(None, upgrade_schema)
+
         async_session = sessionmaker(
             engine, expire_on_commit=False, class_=AsyncSession
         )
 
         return async_session
 
+    def _load_extension(self, extension: str) -> None:
+        from bot.core.loader import MANIFEST
+
+        start = time.perf_counter()
+        try:
+            self.load_extension(extension)
+        except Exception as exc:
+            logger.error(f"Cog {extension} failed to load with {type(exc)}: {exc!r}")
+            raise exc
+
+        MANIFEST.timings[extension] = time.perf_counter() - start
+        logger.info(f"Cog {extension} loaded in {MANIFEST.timings[extension] * 1000:.0f}ms.")
+
+    def _log_phase(self, phase: str, start: float) -> None:
+        self.startup_phases[phase] = time.perf_counter() - start
+        logger.info(f"Startup phase '{phase}' took {self.startup_phases[phase]:.2f}s.")
+
     async def load_extensions(self) -> None:
-        """Load all listed cogs."""
-        from bot.core import loader
+        """Load the core cogs, needed before connecting."""
+        from bot.core.loader import MANIFEST
+
+        for extension in MANIFEST.core_cogs:
+            self._load_extension(extension)
 
-        for extension in loader.COGS:
+    async def warm_up_extensions(self) -> None:
+        """
+        Load the other cogs in the background.
+
+        Their modules are imported concurrently in threads while the bot connects, so once
+        it's ready `load_extension` only has to run their setup.
+        """
+        from bot.core.loader import MANIFEST
+
+        loop = asyncio.get_running_loop()
+
+        async def warm_up(extension: str) -> None:
             try:
-                self.load_extension(extension)
-                logger.info(f"Cog {extension} loaded.")
+                await loop.run_in_executor(None, importlib.import_module, extension)
             except Exception as exc:
-                logger.error(
-                    f"Cog {extension} failed to load with {type(exc)}: {exc!r}"
-                )
-                raise exc
+                logger.warning(f"Couldn't import {extension} in the background: {exc!r}")
+
+        start = time.perf_counter()
+        await asyncio.gather(*(warm_up(extension) for extension in MANIFEST.background_cogs + MANIFEST.deferred_cogs))
+        self._log_phase("import cogs", start)
+
+        await self.wait_until_ready()
+
+        for phase, extensions in (("load cogs", MANIFEST.background_cogs), ("load deferred cogs", MANIFEST.deferred_cogs)):
+            start = time.perf_counter()
+
+            for extension in extensions:
+                try:
+                    self._load_extension(extension)
+                except Exception:
+                    continue
+
+                # Let the events queued up meanwhile run between the setups.
+                await asyncio.sleep(0)
+
+            self._log_phase(phase, start)
+
+        logger.info(f"All cogs loaded, {(datetime.utcnow() - self.start_time).total_seconds():.2f}s after starting.")
+        MANIFEST.save()
 
     async def on_ready(self) -> None:
         """Functions called when the bot is ready and connected."""
         if self.initial_call:
             self.initial_call = False
-            await self.load_extensions()
-
-            logger.info("Bot is ready")
+            logger.info(f"Bot is ready, {(datetime.utcnow() - self.start_time).total_seconds():.2f}s after starting.")
         else:
             logger.info("Bot connection reinitialized")
 
@@ -138,8 +238,27 @@ class Bot(AutoShardedBot):
 
     async def start(self, *args, **kwargs) -> None:
         """Starts the bot."""
+        self.loop_monitor.start()
+
+        start = time.perf_counter()
         self.session = aiohttp.ClientSession()
         self.database = await self.init_db()
+        self.event_store.start()
+        self.autoroles.start()
+        self._log_phase("database", start)
+
+        if self.ipc is not None:
+            await self.ipc.start()
+
+        if config.metrics_port:
+            # Each cluster serves its own metrics, on consecutive ports.
+            await self.telemetry.serve(config.metrics_host, config.metrics_port + (self.cluster or 0))
+
+        start = time.perf_counter()
+        await self.load_extensions()
+        self._log_phase("core cogs", start)
+
+        self._warm_up_task = asyncio.create_task(self.warm_up_extensions())
 
         await super().start(*args, **kwargs)
 
@@ -150,9 +269,107 @@ class Bot(AutoShardedBot):
         if hasattr(self, "session"):
             await self.session.close()
 
+        if self._warm_up_task is not None:
+            self._warm_up_task.cancel()
+
+        if self.ipc is not None:
+            await self.ipc.close()
+
+        self.loop_monitor.stop()
+        await self.telemetry.close()
+        await self.log_dispatcher.close()
+        await self.event_store.close()
+        await self.autoroles.close()
+        self.executor.shutdown()
+
         await super().close()
 
+    # -- Cogs --
+    def add_cog(self, cog: Cog) -> None:
+        super().add_cog(cog)
+        self.dispatch("cog_add", cog)
+
+    def remove_cog(self, name: str) -> None:
+        cog = self.get_cog(name)
+        super().remove_cog(name)
+
+        if cog is not None:
+            self.dispatch("cog_remove", cog)
+
+    # -- Commands --
+    def add_command(self, command: Command) -> None:
+        super().add_command(command)
+
+        # Hidden commands are never suggested.
+        if command.hidden:
+            return
+
+        self.command_index.add(command.name)
+        for alias in command.aliases:
+            self.command_index.add(alias)
+
+    def remove_command(self, name: str) -> t.Optional[Command]:
+        command = super().remove_command(name)
+
+        if command is not None:
+            # Removing an alias only removes that name, removing the command removes all of them.
+            if name in command.aliases:
+                self.command_index.remove(name)
+            else:
+                self.command_index.remove(command.name)
+                for alias in command.aliases:
+                    self.command_index.remove(alias)
+
+        return command
+
+    async def suggest_command(self, ctx: Context, name: str, cutoff: float = 0.6) -> t.Optional[str]:
+        """Get the command name closest to a mistyped one, out of the commands the author can run."""
+        for match in self.command_index.suggest(name, limit=3, cutoff=cutoff, candidates=10):
+            command = self.get_command(match)
+
+            try:
+                if command is not None and not command.hidden and await command.can_run(ctx):
+                    return match
+            except CommandError:
+                continue
+
+        return None
+
+    # -- Instrumentation --
+    async def _run_event(self, coro: t.Callable, event_name: str, *args, **kwargs) -> None:
+        """Run an event listener, timing it."""
+        start = time.perf_counter()
+        try:
+            await super()._run_event(coro, event_name, *args, **kwargs)
+        finally:
+            self.profiler.record_listener(getattr(coro, "__qualname__", event_name), time.perf_counter() - start)
+
+    async def invoke(self, ctx: Context) -> None:
+        """Invoke a command, timing it."""
+        start = time.perf_counter()
+        try:
+            await super().invoke(ctx)
+        finally:
+            if ctx.command is not None:
+                self.profiler.record_command(ctx.command.qualified_name, time.perf_counter() - start, ctx.command_failed)
+
     # -- Other methods --
+    def cluster_stats(self) -> t.Dict[str, t.Any]:
+        """Stats of this process, pushed to the cluster launcher."""
+        totals = self.shard_stats.totals()
+
+        return {
+            "guilds": totals["guilds"],
+            "members": totals["members"],
+            "shards": list(self.shards),
+            "latency": self.latency,
+            "started": self.start_time.timestamp(),
+        }
+
+    async def run_cpu(self, func: t.Callable, *args, **kwargs) -> t.Any:
+        """Run a CPU bound function in the shared worker pool, without blocking the event loop."""
+        return await self.executor.run(func, *args, **kwargs)
+
     async def get_msg_prefix(
         self, message: discord.Message, not_print: bool = True
     ) -> str:
@@ -173,64 +390,12 @@ class Bot(AutoShardedBot):
     async def get_or_fetch_member(
         self, guild: discord.Guild, member_id: int
     ) -> t.Optional[discord.Member]:
-        member = guild.get_member(member_id)
-        if member is not None:
-            return member
-
-        shard = self.get_shard(guild.shard_id)
-        if shard.is_ws_ratelimited():
-            try:
-                member = await guild.fetch_member(member_id)
-            except discord.HTTPException:
-                return None
-            else:
-                return member
-
-        members = await guild.query_members(limit=1, user_ids=[member_id], cache=True)
-        if not members:
-            return None
-        return members[0]
+        """Get a member from the cache, or fetch it batched with the other concurrent lookups."""
+        return await self.member_resolver.resolve(guild, member_id)
 
     async def resolve_member_ids(
-        self, guild: t.Union[int, discord.Guild], member_ids: t.Union[list, tuple]
+        self, guild: discord.Guild, member_ids: t.Union[list, tuple]
     ) -> t.AsyncIterable:
-        needs_resolution = []
-        for member_id in member_ids:
-            member = guild.get_member(member_id)
-            if member is not None:
-                yield member
-            else:
-                needs_resolution.append(member_id)
-
-        total_need_resolution = len(needs_resolution)
-
-        if total_need_resolution == 1:
-            shard = self.get_shard(guild.shard_id)
-            if shard.is_ws_ratelimited():
-                try:
-                    member = await guild.fetch_member(needs_resolution[0])
-                except discord.HTTPException:
-                    pass
-                else:
-                    yield member
-            else:
-                members = await guild.query_members(
-                    limit=1, user_ids=needs_resolution, cache=True
-                )
-                if members:
-                    yield members[0]
-        elif total_need_resolution <= 100:
-            resolved = await guild.query_members(
-                limit=100, user_ids=needs_resolution, cache=True
-            )
-            for member in resolved:
-                yield member
-        else:
-            for index in range(0, total_need_resolution, 100):
-                to_resolve = needs_resolution[index: index + 100]
-                members = await guild.query_members(
-                    limit=100, user_ids=to_resolve, cache=True
-                )
-
-                for member in members:
-                    yield member
+        """Resolve the members of the IDs, yielding the ones that were found."""
+        async for member in self.member_resolver.resolve_many(guild, member_ids):
+            yield member
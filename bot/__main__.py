@@ -1,3 +1,4 @@
+import asyncio
 import os
 
 import discord
@@ -14,21 +15,38 @@ async def command_prefix(bot: Bot, message: discord.Message) -> str:
 TOKEN = os.getenv("BOT_TOKEN")
 PREFIX = config.COMMAND_PREFIX
 
-intents = discord.Intents.all()
-intents.presences = False
-
-bot = Bot(
-    version="0.2.0",
-    command_prefix=command_prefix,
-    intents=intents,
-    activity=discord.Game(name=f"{PREFIX}help | Busy coding with developers!"),
-    case_insensitive=True,
-    owner_ids=config.devs,
-    heartbeat_timeout=150.0,
-    member_cache_flags=discord.MemberCacheFlags(
-        online=False, joined=True, voice=True
-    ),
-)
+
+def create_bot(**kwargs) -> Bot:
+    """Create the bot, with the cluster options passed by the launcher if any."""
+    intents = discord.Intents.all()
+    intents.presences = False
+
+    return Bot(
+        version="0.2.0",
+        command_prefix=command_prefix,
+        intents=intents,
+        activity=discord.Game(name=f"{PREFIX}help | Busy coding with developers!"),
+        case_insensitive=True,
+        owner_ids=config.devs,
+        heartbeat_timeout=150.0,
+        member_cache_flags=discord.MemberCacheFlags(
+            online=False, joined=True, voice=True
+        ),
+        **kwargs,
+    )
+
+
+def main() -> None:
+    # The token check happens in `Bot.run`, so it's done before asking Discord for a shard count too.
+    if config.cluster_count <= 1 or not TOKEN:
+        create_bot().run(TOKEN)
+        return
+
+    from bot.core.cluster import ClusterLauncher, fetch_recommended_shards
+
+    shard_count = config.shard_count or asyncio.run(fetch_recommended_shards(TOKEN))
+    ClusterLauncher(config.cluster_count, shard_count, ipc_port=config.ipc_port).run()
+
 
 if __name__ == "__main__":
-    bot.run(TOKEN)
+    main()
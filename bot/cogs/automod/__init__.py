@@ -1,4 +1,5 @@
 from bot import Bot
+from .anti_spam import AntiSpam
 from .file_security import FileSecurity
 from .link_lock import LinkLock
 from .mod_lock import ModerationLock
@@ -7,6 +8,7 @@ from .swear_filter import SwearFilter
 
 def setup(bot: Bot) -> None:
     """Load the cogs."""
+    bot.add_cog(AntiSpam(bot))
     bot.add_cog(FileSecurity(bot))
     bot.add_cog(LinkLock(bot))
     bot.add_cog(ModerationLock(bot))
@@ -0,0 +1,144 @@
+import asyncio
+import textwrap
+import typing as t
+from contextlib import suppress
+
+import discord
+from discord.ext.commands import Cog, Context, group, guild_only, has_permissions
+from loguru import logger
+
+from bot import Bot
+from bot.databases.anti_spam import AntiSpam as AntiSpamDB
+from bot.utils.spam import SpamDetector
+
+# Seconds the deletions of a channel are gathered for, before being sent as one bulk delete.
+DELETE_DELAY = 1.0
+# Slowmode applied to flooded channels, and for how long, in seconds.
+FLOOD_SLOWMODE = 5
+FLOOD_DURATION = 60
+
+
+class AntiSpam(Cog):
+    def __init__(self, bot: Bot) -> None:
+        self.bot = bot
+        self.detector = SpamDetector()
+
+        # Guild ID -> whether the detection is enabled, so messages don't need a query.
+        self.configs: t.Dict[int, bool] = {}
+
+        # Channel ID -> IDs of the messages to delete on the next bulk delete.
+        self.deletions: t.Dict[int, t.Set[int]] = {}
+
+    async def is_enabled(self, guild_id: int) -> bool:
+        if guild_id not in self.configs:
+            row = await AntiSpamDB.get_config(self.bot.database, guild_id)
+            self.configs[guild_id] = bool(row and row["enabled"])
+
+        return self.configs[guild_id]
+
+    def queue_deletions(self, channel: discord.TextChannel, message_ids: t.Iterable[int]) -> None:
+        """Gather message deletions, flushing them as a single bulk delete after a short delay."""
+        pending = self.deletions.get(channel.id)
+
+        if pending is None:
+            pending = self.deletions[channel.id] = set()
+            self.bot.loop.create_task(self.flush_deletions(channel))
+
+        pending.update(message_ids)
+
+    async def flush_deletions(self, channel: discord.TextChannel) -> None:
+        await asyncio.sleep(DELETE_DELAY)
+        message_ids = sorted(self.deletions.pop(channel.id, ()))
+
+        for start in range(0, len(message_ids), 100):
+            messages = [discord.Object(id=message_id) for message_id in message_ids[start:start + 100]]
+            try:
+                await channel.delete_messages(messages)
+            except (discord.NotFound, discord.Forbidden):
+                pass
+            except discord.HTTPException as exc:
+                logger.warning(f"Couldn't delete {len(messages)} spam messages in {channel.id}: {exc!r}")
+
+    async def slow_down(self, channel: discord.TextChannel) -> None:
+        """Set a slowmode on a flooded channel for a while, unless it already has one."""
+        if channel.slowmode_delay:
+            return
+
+        with suppress(discord.HTTPException):
+            await channel.edit(slowmode_delay=FLOOD_SLOWMODE, reason="Automod: channel flood")
+            await channel.send(f"🐢 This channel is flooded, slowmode is on for {FLOOD_DURATION} seconds.", delete_after=FLOOD_DURATION)
+
+            await asyncio.sleep(FLOOD_DURATION)
+            await channel.edit(slowmode_delay=0, reason="Automod: channel flood is over")
+
+    @Cog.listener()
+    async def on_message(self, message: discord.Message) -> None:
+        if not message.guild or message.author.bot:
+            return
+
+        if not await self.is_enabled(message.guild.id):
+            return
+
+        if message.author.permissions_in(message.channel).manage_messages:
+            return
+
+        verdict = self.detector.check(
+            message.guild.id,
+            message.channel.id,
+            message.author.id,
+            message.id,
+            message.content,
+            len(message.raw_mentions) + len(message.raw_role_mentions) + message.mention_everyone,
+        )
+        if verdict is None:
+            return
+
+        if verdict.messages:
+            by_channel: t.Dict[int, t.List[int]] = {}
+            for channel_id, message_id in verdict.messages:
+                by_channel.setdefault(channel_id, []).append(message_id)
+
+            for channel_id, message_ids in by_channel.items():
+                channel = message.guild.get_channel(channel_id)
+                if channel is not None:
+                    self.queue_deletions(channel, message_ids)
+
+            if verdict.first:
+                with suppress(discord.HTTPException):
+                    await message.channel.send(
+                        f"{message.author.mention}, please stop {verdict.reason}! Your messages were removed.",
+                        delete_after=10,
+                    )
+
+        if verdict.flood:
+            self.bot.loop.create_task(self.slow_down(message.channel))
+
+    @group(aliases=["anti-spam"], invoke_without_command=True)
+    @guild_only()
+    @has_permissions(ban_members=True)
+    async def anti_spam(self, ctx: Context) -> None:
+        """Show the spam and flood detection settings."""
+        enabled = await self.is_enabled(ctx.guild.id)
+
+        await ctx.send(
+            embed=discord.Embed(
+                title="Anti spam settings configuration",
+                description=textwrap.dedent(
+                    f"""
+                    • Spam detection: **`{"Enabled" if enabled else "Disabled"}`**
+                    • Users flagged since startup: **`{self.detector.flagged}`**
+                    """
+                ),
+                color=discord.Color.blue(),
+            )
+        )
+
+    @anti_spam.command()
+    async def toggle(self, ctx: Context) -> None:
+        """Enable or disable the spam and flood detection."""
+        enabled = not await self.is_enabled(ctx.guild.id)
+
+        await AntiSpamDB.set_enabled(self.bot.database, ctx.guild.id, enabled)
+        self.configs[ctx.guild.id] = enabled
+
+        await ctx.send(f"Spam detection {'enabled!' if enabled else 'disabled.'}")
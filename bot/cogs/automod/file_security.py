@@ -81,7 +81,7 @@ class FileSecurity(Cog):
             await message.delete()
             await message.channel.send(f"Hey {message.author.mention}!", embed=embed)
 
-            file_pastes = await file_uploader(attachments)
+            file_pastes = await file_uploader(self.bot.session, attachments)
 
             if file_pastes is not None:
                 paste_embed = discord.Embed(
@@ -1,44 +1,172 @@
+import asyncio
 import textwrap
+import typing as t
+from datetime import datetime
 
 import discord
+from discord.ext import tasks
 from discord.ext.commands import Cog, Context, group, guild_only, has_permissions
+from loguru import logger
 
 from bot import Bot
+from bot.databases.logging import Logging
 from bot.databases.mod_lock import ModLock as ModLockDB
+from bot.utils.raid import Raid, RaidDetector
+
+
+# Lock codes, see the `ModLock` table.
+NO_LOCK, KICK_LOCK, BAN_LOCK = 0, 1, 2
+LOCK_NAMES = {NO_LOCK: "❌ No lock", KICK_LOCK: "⚙️Kick lock enabled", BAN_LOCK: "⚙️Ban lock enabled"}
+
+# Kicks and bans running at once, and how many are taken from the queue at a time.
+ACTION_CONCURRENCY = 5
+ACTION_BATCH_SIZE = 50
 
 
 class ModerationLock(Cog):
     def __init__(self, bot: Bot) -> None:
         self.bot = bot
 
+        # Guild ID -> (lock code, raid action), so joins don't need a query.
+        self.configs: t.Dict[int, t.Tuple[int, int]] = {}
+        self.detector = RaidDetector()
+
+        self.actions: "asyncio.Queue[t.Tuple[discord.Guild, int, int, str]]" = asyncio.Queue()
+        self.pending: t.Set[t.Tuple[int, int]] = set()
+        self.action_worker = self.bot.loop.create_task(self.run_actions())
+        self.prune_detector.start()
+
+    def cog_unload(self) -> None:
+        self.action_worker.cancel()
+        self.prune_detector.cancel()
+
+    @tasks.loop(minutes=1)
+    async def prune_detector(self) -> None:
+        self.detector.prune()
+
+    # -- Kicks and bans --
+    def queue_action(self, guild: discord.Guild, member_id: int, lock_code: int, reason: str) -> None:
+        """Queue a kick or ban, ignoring the members already queued."""
+        if (guild.id, member_id) in self.pending:
+            return
+
+        self.pending.add((guild.id, member_id))
+        self.actions.put_nowait((guild, member_id, lock_code, reason))
+
+    async def _apply_action(self, guild: discord.Guild, member_id: int, lock_code: int, reason: str) -> None:
+        try:
+            if lock_code == BAN_LOCK:
+                await guild.ban(discord.Object(id=member_id), reason=reason, delete_message_days=1)
+            else:
+                await guild.kick(discord.Object(id=member_id), reason=reason)
+        except discord.NotFound:
+            pass
+        except discord.HTTPException as exc:
+            logger.warning(f"Couldn't apply the lock to {member_id} in {guild.id}: {exc!r}")
+        finally:
+            self.pending.discard((guild.id, member_id))
+
+    async def run_actions(self) -> None:
+        """Apply the queued kicks and bans in batches, a few at once."""
+        semaphore = asyncio.Semaphore(ACTION_CONCURRENCY)
+
+        async def apply(action: t.Tuple[discord.Guild, int, int, str]) -> None:
+            async with semaphore:
+                await self._apply_action(*action)
+
+        while True:
+            batch = [await self.actions.get()]
+            while not self.actions.empty() and len(batch) < ACTION_BATCH_SIZE:
+                batch.append(self.actions.get_nowait())
+
+            await asyncio.gather(*(apply(action) for action in batch))
+
+    # -- Lock configuration --
+    async def get_config(self, guild_id: int) -> t.Tuple[int, int]:
+        """Get the lock code and raid action of a guild, from the cache if possible."""
+        if guild_id not in self.configs:
+            row = await ModLockDB.get_config(self.bot.database, guild_id=guild_id)
+            self.configs[guild_id] = (row["lock_code"], row["raid_action"]) if row else (NO_LOCK, NO_LOCK)
+
+        return self.configs[guild_id]
+
+    async def get_lock(self, guild_id: int) -> int:
+        lock_code, _ = await self.get_config(guild_id)
+        return lock_code
+
+    async def set_lock(self, guild_id: int, lock_code: int) -> None:
+        """Set the lock code, in the cache first so joins handled during the write already see it."""
+        _, raid_action = await self.get_config(guild_id)
+        self.configs[guild_id] = (lock_code, raid_action)
+
+        await ModLockDB.set_lock(self.bot.database, guild_id, lock_code)
+
+    async def set_raid_action(self, guild_id: int, raid_action: int) -> None:
+        lock_code, _ = await self.get_config(guild_id)
+        self.configs[guild_id] = (lock_code, raid_action)
+
+        await ModLockDB.set_raid_action(self.bot.database, guild_id, raid_action)
+
     @Cog.listener("on_member_join")
     async def apply_lock(self, member: discord.Member) -> None:
-        """Apply the lock status if there is one."""
-        status = await self.get_lock(member.guild.id)
+        """Apply the lock status if there is one, and lock the server when the join is part of a raid."""
+        guild = member.guild
+        lock_code, raid_action = await self.get_config(guild.id)
 
-        if status == 2:
-            await member.ban(reason="Automod ban lock")
+        if lock_code != NO_LOCK:
+            self.queue_action(guild, member.id, lock_code, f"Automod {'ban' if lock_code == BAN_LOCK else 'kick'} lock")
+            return
 
-        elif status == 1:
-            await member.kick(reason="Automod kick lock")
+        if raid_action == NO_LOCK:
+            return
 
-    async def get_lock(self, guild_id: int) -> int:
-        """Ensure that the given guild_id is in the database."""
-        row = await ModLockDB.get_config(self.bot.database, guild_id=guild_id)
+        raid = self.detector.observe(
+            guild.id,
+            member.id,
+            (datetime.utcnow() - member.created_at).total_seconds(),
+            member.name,
+            member.avatar,
+        )
+        if raid is not None:
+            await self.lock_raid(guild, raid, raid_action)
+
+    async def lock_raid(self, guild: discord.Guild, raid: Raid, raid_action: int) -> None:
+        """Enable the lock for the raid, apply it to the raiders who already joined and notify the moderators."""
+        reason = f"Automod raid {'ban' if raid_action == BAN_LOCK else 'kick'} lock: {raid.reason}"
+        for member_id in raid.members:
+            self.queue_action(guild, member_id, raid_action, reason)
+
+        await self.set_lock(guild.id, raid_action)
 
-        if not row:
-            return 0
-        return row["lock_code"]
+        logger.info(f"Raid detected in {guild.id}, {LOCK_NAMES[raid_action]}: {raid.reason}")
+
+        row = await Logging.get_config(self.bot.database, guild.id)
+        channel = guild.get_channel(row["mod_log"]) if row and row["mod_log"] else None
+        if channel is None:
+            return
+
+        embed = discord.Embed(
+            title="Raid detected",
+            description=textwrap.dedent(
+                f"""
+                • Reason: **`{raid.reason}`**
+                • Lock type: **`{LOCK_NAMES[raid_action]}`**
+                • Raiders already joined: **`{len(raid.members)}`**
+
+                Use `mod-lock unlock` to lift the lock once the raid is over.
+                """
+            ),
+            color=discord.Color.red(),
+        )
+        embed.timestamp = datetime.utcnow()
+        self.bot.log_dispatcher.send(channel, embed)
 
     @group(invoke_without_command=True, name="mod-lock")
     @has_permissions(ban_members=True)
     @guild_only()
     async def mod_lock(self, ctx: Context) -> None:
         """Set the mod lock mode."""
-        lock_mode = await self.get_lock(ctx.guild.id)
-
-        mapping = {0: "❌ No lock", 1: "⚙️Kick lock enabled",
-                   2: "⚙️Ban lock enabled"}
+        lock_mode, raid_action = await self.get_config(ctx.guild.id)
 
         await ctx.send(
             embed=discord.Embed(
@@ -46,7 +174,9 @@ class ModerationLock(Cog):
                 description=textwrap.dedent(
                     f"""
                     • LOCK ENABLED: **`{True if lock_mode != 0 else False}`**
-                    • Lock type: **`{mapping[lock_mode]}`**
+                    • Lock type: **`{LOCK_NAMES[lock_mode]}`**
+                    • Raid lock: **`{LOCK_NAMES[raid_action] if raid_action else "❌ Disabled"}`**
+                    • Joins per minute: **`{self.detector.rate(ctx.guild.id):.0f}`**
                     """
                 ),
                 color=discord.Color.blue(),
@@ -66,7 +196,7 @@ class ModerationLock(Cog):
             await ctx.send(embed=embed)
             return
 
-        await ModLockDB.set_lock(self.bot.database, ctx.guild.id, 0)
+        await self.set_lock(ctx.guild.id, NO_LOCK)
         embed = discord.Embed(
             description="Server Locks Are Successfully Disabled! You can now invite your friends and everyone!",
             color=discord.Color.blue(),
@@ -91,7 +221,7 @@ class ModerationLock(Cog):
             await ctx.send(embed=embed)
             return
 
-        await ModLockDB.set_lock(self.bot.database, ctx.guild.id, 1)
+        await self.set_lock(ctx.guild.id, KICK_LOCK)
         desc = textwrap.dedent(
             f"""
             **Lock type**: ⚙️Kick Lock
@@ -122,7 +252,7 @@ class ModerationLock(Cog):
             await ctx.send(embed=embed)
             return
 
-        await ModLockDB.set_lock(self.bot.database, ctx.guild.id, 2)
+        await self.set_lock(ctx.guild.id, BAN_LOCK)
         desc = textwrap.dedent(
             f"""
             **Lock type**: ⚙️Ban Lock
@@ -134,3 +264,26 @@ class ModerationLock(Cog):
             title="Server Lock Enabled", description=desc, color=discord.Color.blue()
         )
         await ctx.send(embed=embed)
+
+    @mod_lock.command()
+    async def raid(self, ctx: Context, action: str) -> None:
+        """
+        Set the lock enabled automatically when a raid is detected, `kick`, `ban` or `off`.
+
+        A raid is a burst of joins that are mostly fresh accounts, or share a username or an avatar.
+        """
+        actions = {"off": NO_LOCK, "kick": KICK_LOCK, "ban": BAN_LOCK}
+
+        if action.lower() not in actions:
+            await ctx.send(f"❌ Invalid raid lock `{action}`, it must be one of `kick`, `ban` or `off`.")
+            return
+
+        await self.set_raid_action(ctx.guild.id, actions[action.lower()])
+        embed = discord.Embed(
+            description=(
+                f"Raid lock set to **`{action.lower()}`**."
+                if actions[action.lower()] else "Raid detection disabled."
+            ),
+            color=discord.Color.blue(),
+        )
+        await ctx.send(embed=embed)
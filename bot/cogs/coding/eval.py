@@ -1,16 +1,22 @@
-import json
+import asyncio
 import re
+import textwrap
+import typing as t
+from contextlib import suppress
 from pathlib import Path
-from typing import Optional
 
-from discord import Embed, Message
+import aiohttp
+from discord import Embed, HTTPException, Message
 from discord.ext import commands, menus, tasks
 from discord.ext.commands import Cog, Context, command
 from discord.utils import escape_mentions
+from loguru import logger
 from yaml import safe_load
 
-from bot import Bot
-from bot.utils.eval_helper import EvalHelper, FormatOutput, Tio
+from bot import Bot, config
+from bot.utils.eval_helper import EvalHelper, FormatOutput
+from bot.utils.eval_scheduler import EvalScheduler
+from bot.utils.languages import LanguageCatalogue
 from bot.utils.pages import CodeInfoSource
 
 SOFT_RED = 0xCD6D6D
@@ -22,29 +28,40 @@ class Eval(Cog):
 
     def __init__(self, bot: Bot) -> None:
         self.bot = bot
-        self.languages = None
-        self.languages_url = "https://tio.run/languages.json"
+        self.catalogue = LanguageCatalogue(config.tio_languages_snapshot)
         self.update_languages.start()
 
-        with Path("bot/assets/default_langs.yml").open(encoding="utf8") as file:
-            self.default_languages = safe_load(file)
+        self.scheduler = EvalScheduler(bot.session, max_concurrency=config.eval_concurrency)
 
         with Path("bot/assets/wrapping.yml").open(encoding="utf8") as file:
             self.wrapping = safe_load(file)
 
-        with Path("bot/assets/quick_map.yml").open(encoding="utf8") as file:
-            self.quick_map = safe_load(file)
+    def cog_unload(self) -> None:
+        self.update_languages.cancel()
+        self.scheduler.stop()
+
+    @property
+    def languages(self) -> t.Tuple[str, ...]:
+        return self.catalogue.languages
+
+    async def _refresh_languages(self) -> None:
+        try:
+            if await self.catalogue.refresh(self.bot.session):
+                logger.info(f"Updated the tio.run catalogue with {len(self.languages)} languages.")
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as exc:
+            logger.warning(f"Couldn't update the tio.run catalogue: {exc!r}")
 
     @tasks.loop(hours=5)
     async def update_languages(self) -> None:
-        """Update list of languages supported by api every 5 hour."""
-        async with self.bot.session.get(self.languages_url) as response:
-            languages = tuple(sorted(json.loads(await response.text())))
-            self.languages = languages
+        """Update list of languages supported by api every 5 hour, if it changed."""
+        await self._refresh_languages()
 
     @command(aliases=["language-list", "langs", "langs-list"])
     async def language_supported(self, ctx: Context) -> None:
         """Show all the languages supported by this compiler."""
+        if not self.catalogue:
+            await self._refresh_languages()
+
         paginator = commands.Paginator(
             max_size=2048,
         )
@@ -67,7 +84,7 @@ class Eval(Cog):
     @commands.cooldown(3, 10, commands.BucketType.user)
     async def eval_command(
         self, ctx: Context, language: str, *, code: str = ""
-    ) -> Optional[Message]:
+    ) -> t.Optional[Message]:
         """
         eval <language> [--wrapped] [--stats] <code>
 
@@ -119,13 +136,13 @@ class Eval(Cog):
                 raise commands.MissingRequiredArgument(
                     ctx.command.clean_params["code"])
 
-            if lang in self.quick_map:
-                lang = self.quick_map[lang]
+            lang = self.catalogue.resolve(lang)
 
-            if lang in self.default_languages:
-                lang = self.default_languages[lang]
+            # No snapshot and the first fetch hasn't finished yet.
+            if not self.catalogue:
+                await self._refresh_languages()
 
-            if lang not in self.languages:
+            if lang not in self.catalogue:
                 if not escape_mentions(lang):
                     embed = Embed(
                         title="MissingRequiredArgument",
@@ -134,9 +151,15 @@ class Eval(Cog):
                         color=SOFT_RED,
                     )
                 else:
+                    suggestions = self.catalogue.suggest(lang)
+                    did_you_mean = (
+                        f"Did you mean: {', '.join(f'`{name}`' for name in suggestions)}?\n" if suggestions else ""
+                    )
+
                     embed = Embed(
                         title="Language Not Supported",
                         description=f"Your language was invalid: {lang}\n"
+                        f"{did_you_mean}"
                         f"All Supported languages: [here](https://tio.run)\n\nUsage:\n"
                         f"```{ctx.prefix}{ctx.command} {ctx.command.signature}```",
                         color=SOFT_RED,
@@ -156,9 +179,14 @@ class Eval(Cog):
                         text = self.wrapping[beginning].replace("code", text)
                         break
 
-            tio = Tio(lang, text, inputs, compiler_flags,
-                      command_line_options, args)
-            result = await tio.get_result()
+            key = self.scheduler.make_key(lang, text, inputs, compiler_flags, command_line_options, args)
+            try:
+                result = await self.scheduler.submit(key, self.bot.get_id(ctx), ctx.author.id)
+            except asyncio.CancelledError:
+                if not self.bot.is_closed():
+                    with suppress(HTTPException):
+                        await ctx.send(f"{ctx.author.mention} Your eval job was cancelled.")
+                raise
 
             result = result.rstrip("\n")
 
@@ -184,3 +212,31 @@ class Eval(Cog):
 
             embed = format_output.format_code_output(result)
             await ctx.send(content=f"{ctx.author.mention}", embed=embed)
+
+    @command(name="eval-cancel", aliases=["eval_cancel"])
+    async def eval_cancel(self, ctx: Context) -> None:
+        """Cancel your eval jobs that are still waiting in the queue."""
+        cancelled = self.scheduler.cancel(ctx.author.id)
+
+        if not cancelled:
+            await ctx.send(":x: You don't have any queued eval jobs!")
+        else:
+            await ctx.send(f":white_check_mark: Cancelled {cancelled} queued eval job(s).")
+
+    @command(name="eval-stats", aliases=["eval_stats"])
+    async def eval_stats(self, ctx: Context) -> None:
+        """Show the eval queue load, wait times and execution latency."""
+        stats = self.scheduler.stats()
+
+        description = textwrap.dedent(
+            f"""
+            • Running: **`{stats["running"]}`** / `{self.scheduler.max_concurrency}`
+            • Queued: **`{stats["queued"]}`** across `{stats["guilds_waiting"]}` server(s)
+            • Cache hits / misses: **`{stats["cache_hits"]}`** / **`{stats["cache_misses"]}`**
+
+            • Queue wait p50 / p95: **`{stats["wait_p50"]:.2f}s`** / **`{stats["wait_p95"]:.2f}s`**
+            • Execution p50 / p95: **`{stats["latency_p50"]:.2f}s`** / **`{stats["latency_p95"]:.2f}s`**
+            """
+        )
+
+        await ctx.send(embed=Embed(title="Eval queue", description=description, color=GREEN))
@@ -1,7 +1,7 @@
 import os
 import re
 import textwrap
-from typing import List
+from typing import List, Sequence
 
 import aiohttp
 import html2text
@@ -14,6 +14,18 @@ from bot import Bot, config
 filter_words = config.filter_words
 
 
+def html_to_markdown(texts: Sequence[str]) -> List[str]:
+    """Convert a batch of HTML snippets to plain markdown, meant to be run in the worker pool."""
+    tomd = html2text.HTML2Text()
+    tomd.ignore_links = True
+    tomd.ignore_images = True
+    tomd.ignore_tables = True
+    tomd.ignore_emphasis = True
+    tomd.body_width = 0
+
+    return [tomd.handle(text).rstrip("\n") for text in texts]
+
+
 class SafesearchFail(CommandError):
     """Thrown when a query contains NSFW content."""
 
@@ -26,14 +38,6 @@ class Search(Cog):
         self.bot = bot
         self.emoji = "\U0001F50D"
 
-        # Markdown converter
-        self.tomd = html2text.HTML2Text()
-        self.tomd.ignore_links = True
-        self.tomd.ignore_images = True
-        self.tomd.ignore_tables = True
-        self.tomd.ignore_emphasis = True
-        self.tomd.body_width = 0
-
     async def _search_logic(
         self, query: str, is_nsfw: bool = False, category: str = "web", count: int = 5
     ) -> list:
@@ -86,17 +90,20 @@ class Search(Cog):
             if not count:
                 return await ctx.send(f"No results found for `{query_display}`.")
 
+            # Convert all the HTML in one go, off the event loop
+            titles = await self.bot.run_cpu(
+                html_to_markdown, [result["title"] for result in results] + [results[0]["desc"]]
+            )
+            first_desc = titles.pop()
+
             # Gets the first entry's data
-            first_title = self.tomd.handle(
-                results[0]["title"]).rstrip("\n").strip("<>")
+            first_title = titles[0].strip("<>")
             first_url = results[0]["url"]
-            first_desc = self.tomd.handle(results[0]["desc"]).rstrip("\n")
 
             # Builds the substring for each of the other result.
             other_results: List[str] = []
 
-            for result in results[1:count]:
-                title = self.tomd.handle(result["title"]).rstrip("\n")
+            for title, result in zip(titles[1:], results[1:count]):
                 url = result["url"]
                 other_results.append(f"**{title}**\n{url}")
 
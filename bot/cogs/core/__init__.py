@@ -1,5 +1,3 @@
-from collections import Counter
-
 from bot import Bot
 from .error import ErrorHandler
 from .events import Events
@@ -9,9 +7,6 @@ from .sudo import Sudo
 
 def setup(bot: Bot) -> None:
     """Load the cogs."""
-    if not hasattr(bot, "socket_stats"):
-        bot.socket_stats = Counter()
-
     bot.add_cog(Events(bot))
     bot.add_cog(ErrorHandler(bot))
     bot.add_cog(Help(bot))
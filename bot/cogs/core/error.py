@@ -110,6 +110,10 @@ class ErrorHandler(Cog):
             return
 
         if isinstance(error, errors.CommandNotFound):
+            # Only suggest close matches, so messages merely starting with the prefix are left alone.
+            suggestion = await self.bot.suggest_command(ctx, ctx.invoked_with, cutoff=0.75) if ctx.invoked_with else None
+            if suggestion:
+                await self.error_embed(ctx, description=f"No command called `{ctx.invoked_with}` found. Did you mean `{suggestion}`?")
             return
 
         elif isinstance(error, IncorrectChannelError):
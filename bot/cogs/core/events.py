@@ -3,7 +3,6 @@ from discord.ext.commands import Cog
 from loguru import logger
 
 from bot import Bot
-from bot.databases.autorole import AutoRoles
 
 
 class Events(Cog):
@@ -22,22 +21,10 @@ class Events(Cog):
 
     @Cog.listener()
     async def on_member_join(self, member: discord.Member) -> None:
+        self.bot.member_resolver.forget(member.guild.id, member.id)
+
         # Ignore if the member is a bot.
         if member.bot:
             return
 
-        guild = member.guild
-
-        row = await AutoRoles.get_roles(self.bot.database, guild.id)
-
-        if row is not None and row["auto_roles"] != []:
-            roles = row["auto_roles"]
-
-            for role in roles:
-                role_obj = guild.get_role(role)
-
-                if not role_obj:
-                    continue
-                await member.add_roles(role_obj)
-        else:
-            return
+        await self.bot.autoroles.add(member)
@@ -1,4 +1,3 @@
-import difflib
 import textwrap
 import typing as t
 from collections import namedtuple
@@ -15,61 +14,114 @@ MAX_CHARACTERS = 400
 field = namedtuple("field", ("name", "value"))
 
 
+class CommandDoc(t.NamedTuple):
+    """The prefix independent parts of a command's help."""
+
+    command: Command
+    name: str
+    usage: str
+    help: str
+    aliases: str
+
+    def syntax(self, prefix: str) -> str:
+        return f"{prefix}{self.usage}"
+
+
+def describe_command(command: Command) -> CommandDoc:
+    """
+    Describe command in a meaningful syntax which can than be showed to
+    users to provide details about given command.
+    1. `name`: the exact syntax (without prefix) used to call the command
+    2. `usage`: the command name and the values command takes, to prefix for the syntax
+    3. `help`: the help docstring from given command
+    4. `aliases`: all aliases the command has, separated by comma.
+    """
+    parent = command.full_parent_name
+
+    name = str(command) if not parent else f"{parent} {command.name}"
+    aliases = [
+        f"`{alias}`" if not parent else f"`{parent} {alias}`"
+        for alias in command.aliases
+    ]
+
+    return CommandDoc(
+        command=command,
+        name=name,
+        usage=f"{name} {command.signature}",
+        help=f"{command.help or 'No description provided.'}",
+        aliases=", ".join(sorted(aliases)),
+    )
+
+
+class HelpCache:
+    """
+    Pre-rendered help of every command.
+
+    Commands are described once when their cog is added, and dropped when it's removed,
+    so a help invocation only has to filter the commands the user can run and assemble
+    the cached parts with the guild's prefix.
+    """
+
+    def __init__(self, bot: Bot) -> None:
+        self.bot = bot
+        self.docs: t.Dict[str, CommandDoc] = {}
+
+    def rebuild(self) -> None:
+        self.docs.clear()
+
+        for command in self.bot.walk_commands():
+            self.docs[command.qualified_name] = describe_command(command)
+
+    def add_cog(self, cog: Cog) -> None:
+        for command in cog.walk_commands():
+            self.docs[command.qualified_name] = describe_command(command)
+
+    def remove_cog(self, cog: Cog) -> None:
+        for command in cog.walk_commands():
+            self.docs.pop(command.qualified_name, None)
+
+    def get(self, command: Command) -> CommandDoc:
+        """Get the help of a command, describing it if it isn't cached or changed since."""
+        doc = self.docs.get(command.qualified_name)
+
+        if doc is None or doc.command is not command:
+            doc = self.docs[command.qualified_name] = describe_command(command)
+
+        return doc
+
+
 class HelpPages(EmbedPages):
     @staticmethod
     def _split_messages(messages: t.List[str], initial_length: int = 0) -> t.List[str]:
-        split_messages = []
-        index = 0
-        for message in messages:
-            try:
-                stored_msg = split_messages[index]
-            except IndexError:
-                stored_msg = ""
-                split_messages.append(stored_msg)
-
-            length = len(stored_msg + message)
-
-            if index == 0:
-                length -= initial_length
+        split_messages = [[]]
+        length = -initial_length
 
-            if length > MAX_CHARACTERS:
-                index += 1
+        for message in messages:
+            if split_messages[-1] and length + len(message) > MAX_CHARACTERS:
+                split_messages.append([])
+                length = 0
 
-            try:
-                split_messages[index] += message
-            except IndexError:
-                split_messages.append(message)
+            split_messages[-1].append(message)
+            length += len(message)
 
-        return split_messages
+        return ["".join(page) for page in split_messages]
 
     @staticmethod
     def _split_fields(
         fields: t.List[field], initial_length: int = 0
     ) -> t.List[t.List[field]]:
-        split_fields = []
-        index = 0
-        for fld in fields:
-            try:
-                stored_fields = split_fields[index]
-            except IndexError:
-                stored_fields = []
-                split_fields.append(stored_fields)
-
-            length = 0
-            for stored_fld in stored_fields:
-                length += len(stored_fld.name) + len(stored_fld.value)
-            length += len(fld.name) + len(fld.value)
+        split_fields = [[]]
+        length = -initial_length
 
-            if index == 0:
-                length -= initial_length
+        for fld in fields:
+            field_length = len(fld.name) + len(fld.value)
 
-            if length > MAX_CHARACTERS:
-                index += 1
+            if split_fields[-1] and length + field_length > MAX_CHARACTERS:
+                split_fields.append([])
+                length = 0
 
-            try:
-                split_fields[index].append(fld)
-            except IndexError:
-                split_fields.append([fld])
+            split_fields[-1].append(fld)
+            length += field_length
 
         return split_fields
 
@@ -138,62 +190,34 @@ class HelpPages(EmbedPages):
 class HelpCommand(BaseHelpCommand):
     """The help command implementation."""
 
-    def __init__(self):
+    def __init__(self, cache: HelpCache):
         super().__init__(
             command_attrs={
                 "help": "Shows help for given command / all commands"}
         )
+        self.cache = cache
 
-    def command_not_found(self, string: str) -> str:
-        ctx = self.context
+    async def command_not_found(self, string: str) -> str:
         output = f"No command called `{string}` found."
 
-        close_matches = difflib.get_close_matches(string, ctx.bot.all_commands.keys(), n=1)
-        if close_matches:
-            output += f"\nDid you mean `{close_matches[0]}`?"
+        close_match = await self.context.bot.suggest_command(self.context, string)
+        if close_match:
+            output += f"\nDid you mean `{close_match}`?"
 
         return output
 
-    async def _describe_command(self, command: Command) -> t.Tuple[str, str, str, str]:
-        """
-        Describe command in a meaningful syntax which can than be showed to
-        users to provide details about given command.
-        Returns a tuple of these variables:
-        1. `command_name`: the exact syntax (without prefix) used to call the command
-        2. `command_syntax`: contains the command name with prefix and the values command takes
-        3. `command_help`: the help docstring from given command
-        4. `aliases`: all aliases the command has, separated by comma.
-        """
+    async def _get_prefix(self) -> str:
+        return await self.context.bot.get_msg_prefix(self.context.message, not_print=False)
+
+    async def _format_command(self, command: Command, prefix: t.Optional[str] = None) -> Embed:
+        """Format a help embed message for given `command`."""
         if not await command.can_run(self.context):
             raise CheckFailure(
                 "You don't have permission to view help for this command."
             )
 
-        parent = command.full_parent_name
-        command_prefix = await self.context.bot.get_msg_prefix(self.context.message, not_print=False)
-        print(command_prefix)
-
-        command_name = str(command) if not parent else f"{parent} {command.name}"
-        command_syntax = f"{command_prefix}{command_name} {command.signature}"
-        command_help = f"{command.help or 'No description provided.'}"
-
-        aliases = [
-            f"`{alias}`" if not parent else f"`{parent} {alias}`"
-            for alias in command.aliases
-        ]
-        aliases = ", ".join(sorted(aliases))
-
-        return command_name, command_syntax, command_help, aliases
-
-    async def _format_command(self, command: Command) -> Embed:
-        """Format a help embed message for given `command`."""
-
-        (
-            command_name,
-            command_syntax,
-            command_help,
-            aliases,
-        ) = await self._describe_command(command)
+        doc = self.cache.get(command)
+        prefix = prefix if prefix is not None else await self._get_prefix()
 
         embed = Embed(
             title="Command Help",
@@ -201,40 +225,37 @@ class HelpCommand(BaseHelpCommand):
             color=Color.blue(),
         )
         embed.add_field(
-            name=f"Syntax for {command_name}",
-            value=f"```{command_syntax}```",
+            name=f"Syntax for {doc.name}",
+            value=f"```{doc.syntax(prefix)}```",
             inline=False,
         )
         embed.add_field(
-            name="Command description", value=f"{command_help}", inline=False
+            name="Command description", value=f"{doc.help}", inline=False
         )
-        if aliases:
-            embed.add_field(name="Aliases", value=aliases, inline=False)
+        if doc.aliases:
+            embed.add_field(name="Aliases", value=doc.aliases, inline=False)
 
         return embed
 
     async def _format_group(self, group: Group) -> t.Union[Embed, HelpPages]:
         """Format a help embed message for giver `group`."""
-        subcommands = group.commands
+        prefix = await self._get_prefix()
+        embed = await self._format_command(group, prefix)
 
-        # If a group doesn't have any subcommands, treat it as a group
-        if len(subcommands) == 0:
-            await self.send_command_help(group)
+        # If a group doesn't have any subcommands, treat it as a command
+        if len(group.commands) == 0:
+            return embed
 
-        subcommands = await self.filter_commands(subcommands, sort=True)
-
-        embed = await self._format_command(group)
+        subcommands = await self.filter_commands(group.commands, sort=True)
 
         messages = []
         for subcommand in subcommands:
-            _, command_syntax, command_help, _ = await self._describe_command(
-                subcommand
-            )
+            doc = self.cache.get(subcommand)
             messages.append(
                 textwrap.dedent(
                     f"""
-                `{command_syntax}`
-                {command_help}
+                `{doc.syntax(prefix)}`
+                {doc.help}
                 """
                 )
             )
@@ -251,7 +272,7 @@ class HelpCommand(BaseHelpCommand):
         return embed
 
     async def _format_cog(
-        self, cog: t.Optional[Cog], commands: t.Optional[t.List[Command]] = None
+        self, cog: t.Optional[Cog], commands: t.Optional[t.List[Command]] = None, prefix: t.Optional[str] = None
     ) -> t.Union[Embed, HelpPages]:
         """
         Format a help embed message for the given `cog`.
@@ -280,14 +301,16 @@ class HelpCommand(BaseHelpCommand):
         if commands is None:
             commands = await self.filter_commands(cog.get_commands())
 
+        prefix = prefix if prefix is not None else await self._get_prefix()
+
         fields = []
         for command in commands:
-            _, command_syntax, command_help, _ = await self._describe_command(command)
+            doc = self.cache.get(command)
 
             fields.append(
                 field(
-                    name=f"**`{command_syntax}`**",
-                    value=command_help,
+                    name=f"**`{doc.syntax(prefix)}`**",
+                    value=doc.help,
                 )
             )
 
@@ -310,11 +333,13 @@ class HelpCommand(BaseHelpCommand):
         sorted_cogs = sorted(
             mapping, key=lambda cog: cog.qualified_name if cog else "ZZ"
         )
+        prefix = await self._get_prefix()
+
         cog_embeds = []
         for cog in sorted_cogs:
             commands = await self.filter_commands(mapping[cog])
             if commands:
-                formatted_help = await self._format_cog(cog, commands)
+                formatted_help = await self._format_cog(cog, commands, prefix)
                 if isinstance(formatted_help, HelpPages):
                     cog_embeds += formatted_help.embeds
                 else:
@@ -350,8 +375,21 @@ class HelpCommand(BaseHelpCommand):
 class Help(Cog):
     def __init__(self, bot: Bot):
         self.bot = bot
+        self.cache = HelpCache(bot)
+
         self.old_help_command = bot.help_command
-        bot.help_command = HelpCommand()
+        bot.help_command = HelpCommand(self.cache)
+
+        # Built after replacing the help command, so the new one is included.
+        self.cache.rebuild()
 
     def cog_unload(self) -> None:
         self.bot.help_command = self.old_help_command
+
+    @Cog.listener()
+    async def on_cog_add(self, cog: Cog) -> None:
+        self.cache.add_cog(cog)
+
+    @Cog.listener()
+    async def on_cog_remove(self, cog: Cog) -> None:
+        self.cache.remove_cog(cog)
@@ -1,5 +1,3 @@
-import collections
-import enum
 import io
 import os
 import platform
@@ -12,23 +10,17 @@ from datetime import datetime
 
 import humanize
 import psutil
-from discord import Activity, ActivityType, Color, DiscordException, Embed, Game, Status
+from discord import Activity, ActivityType, Color, DiscordException, Embed, File, Game, Status
 from discord import __version__ as discord_version
 from discord.ext.commands import Cog, Context, group, is_owner
 from jishaku.cog import STANDARD_FEATURES
+from loguru import logger
 from tabulate import tabulate
 
 from bot import Bot, config
 from bot.databases.command_stats import CommandStats
 
 
-class CounterKeys(enum.Enum):
-    MESSAGES_RECIEVED = 0x100
-
-    def __repr__(self) -> str:
-        return self.name
-
-
 class Sudo(*STANDARD_FEATURES, Cog):
     def __init__(self, bot: Bot) -> None:
         super().__init__(bot=bot)
@@ -51,11 +43,6 @@ class Sudo(*STANDARD_FEATURES, Cog):
             formatted = f"{hours} hr, {minutes} mins, and {seconds} secs"
         return formatted
 
-    @Cog.listener()
-    async def on_socket_response(self, msg: t.Any) -> None:
-        """Cog listener for socket responses."""
-        self.bot.socket_stats[msg.get("t")] += 1
-
     @group(hidden=True)
     @is_owner()
     async def sudo(self, ctx: Context) -> None:
@@ -188,29 +175,67 @@ class Sudo(*STANDARD_FEATURES, Cog):
                     )
                 )
 
-    @sudo.command()
+    @sudo.command(aliases=["telemetry"])
     async def socketstats(self, ctx: Context) -> None:
-        """Get the bot's socket stats."""
-        delta = datetime.utcnow() - self.bot.start_time
-        minutes = delta.total_seconds() / 60
+        """Get the gateway event rates and dispatch latencies."""
+        telemetry = self.bot.telemetry
+        total = sum(telemetry.totals.values())
 
-        total = sum(self.bot.socket_stats.values())
-        cpm = total / minutes
-        await ctx.send(
-            embed=Embed(
-                title="Socket stats",
-                description=f"{total} socket events observed ({cpm:.2f}/minute):\n`{self.bot.socket_stats}`",
-                color=Color.blue(),
-            )
+        general = textwrap.dedent(
+            f"""
+            • Events: **`{total}`**
+            • Rate (1m / 5m): **`{telemetry.all.rate(60):.2f}/s`** / **`{telemetry.all.rate(300):.2f}/s`**
+            """
+        )
+
+        events = [
+            [event, f"{rate:.2f}/s", telemetry.totals[event], f"{telemetry.latency[event].quantile(0.95) * 1000:.2f}ms"]
+            for event, rate in telemetry.top_events()
+        ]
+        shards = [
+            ["N/A" if shard_id < 0 else shard_id, f"{rate:.2f}/s"]
+            for shard_id, rate in telemetry.shard_rates().items()
+        ]
+
+        embed = Embed(title="Socket stats", description=general, color=Color.blue())
+        embed.add_field(
+            name="**❯ Events**",
+            value=f"```{tabulate(events, headers=('Event', 'Rate', 'Total', 'p95'))}```",
+            inline=False,
+        )
+        embed.add_field(
+            name="**❯ Shards**",
+            value=f"```{tabulate(shards, headers=('Shard', 'Rate'))}```",
+            inline=False,
+        )
+
+        lag = self.bot.loop_monitor.stats()
+        stalls = self.bot.loop_monitor.stalls.most_common(3)
+        loop_info = textwrap.dedent(
+            f"""
+            • Lag p50 / p95: **`{lag["p50"] * 1000:.2f}ms`** / **`{lag["p95"] * 1000:.2f}ms`** (max: `{lag["max"] * 1000:.2f}ms`)
+            • Stalls: **`{lag["stalls"]}`**
+            """
         )
+        loop_info += "\n".join(f"• `{location}`: `{count}`" for location, count in stalls)
+        embed.add_field(name="**❯ Event loop**", value=loop_info, inline=False)
+
+        await ctx.send(embed=embed)
+
+    @sudo.command()
+    async def metrics(self, ctx: Context) -> None:
+        """Get the metrics in the Prometheus text format."""
+        file = File(io.BytesIO(self.bot.telemetry.export().encode()), filename="metrics.txt")
+        await ctx.send(file=file)
 
     @sudo.command()
     async def stats(self, ctx: Context) -> None:
         """Show full bot stats."""
+        totals = self.bot.shard_stats.totals()
         general = textwrap.dedent(
             f"""
-            • Servers: **`{len(self.bot.guilds)}`**
-            • Members: **`{len(set(self.bot.get_all_members()))}`**
+            • Servers: **`{totals["guilds"]}`**
+            • Members: **`{totals["members"]}`**
             • Commands: **`{len(self.bot.commands)}`**
             • Uptime: **`{self.get_uptime()}`**
             """
@@ -231,6 +256,18 @@ class Sudo(*STANDARD_FEATURES, Cog):
 
         embed = Embed(title="BOT STATISTICS", color=Color.blue())
         embed.add_field(name="**❯ General**", value=general, inline=False)
+
+        if self.bot.ipc is not None and self.bot.ipc.connected:
+            clusters = await self.bot.ipc.request("stats")
+            cluster_info = textwrap.dedent(
+                f"""
+                • Clusters: **`{len(clusters)}`** / **`{self.bot.cluster_count}`** (current: `{self.bot.cluster}`)
+                • Servers: **`{sum(stats["guilds"] for stats in clusters.values())}`**
+                • Members: **`{sum(stats["members"] for stats in clusters.values())}`**
+                """
+            )
+            embed.add_field(name="**❯ Clusters**", value=cluster_info, inline=False)
+
         embed.add_field(name="**❯ System**", value=system, inline=False)
         embed.add_field(name="**❯ Shard info**",
                         value=shard_info, inline=False)
@@ -309,6 +346,163 @@ class Sudo(*STANDARD_FEATURES, Cog):
             )
         )
 
+    @sudo.command()
+    async def clusters(self, ctx: Context) -> None:
+        """Get the status of every cluster."""
+        if self.bot.ipc is None or not self.bot.ipc.connected:
+            await ctx.send("❌ The bot isn't running as clusters.")
+            return
+
+        clusters = await self.bot.ipc.request("clusters")
+        stats = await self.bot.ipc.request("stats")
+
+        output = []
+        for cluster_id, info in sorted(clusters.items(), key=lambda item: int(item[0])):
+            cluster_stats = stats.get(cluster_id, {})
+            latency = cluster_stats.get("latency")
+
+            output.append([
+                cluster_id,
+                f"{info['shards'][0]}-{info['shards'][-1]}",
+                "up" if info["alive"] else "down",
+                info["restarts"],
+                cluster_stats.get("guilds", "N/A"),
+                f"{round(latency * 1000)}ms" if latency is not None else "N/A",
+            ])
+
+        table = tabulate(output, headers=("Cluster", "Shards", "Status", "Restarts", "Guilds", "Latency"))
+        await ctx.send(f"```{table}```")
+
+    @sudo.command()
+    async def broadcast(self, ctx: Context, process: str, extension: str) -> None:
+        """Load, unload or reload a cog on every cluster."""
+        if process not in ("load", "unload", "reload"):
+            await ctx.send("❌ Invalid process for extensions")
+            return
+
+        if self.bot.ipc is None or not self.bot.ipc.connected:
+            await self._manage_cog(ctx, process, extension)
+            return
+
+        await self.bot.ipc.broadcast(process, f"bot.cogs.{extension}")
+        await ctx.message.add_reaction("✅")
+
+    @Cog.listener()
+    async def on_ipc_command(self, command: str, *args) -> None:
+        """Run the commands broadcasted to every cluster."""
+        if command not in ("load", "unload", "reload"):
+            return
+
+        extension, = args
+        try:
+            if command in ("unload", "reload"):
+                self.bot.unload_extension(extension)
+            if command in ("load", "reload"):
+                self.bot.load_extension(extension)
+        except DiscordException as exc:
+            logger.error(f"Broadcasted {command} of {extension} failed: {exc!r}")
+
+    @sudo.command()
+    async def profile(self, ctx: Context, capture: t.Optional[float] = None) -> None:
+        """
+        Get the slowest listeners and commands.
+
+        `profile` - Show the listeners and commands with the highest p95 latency
+        `profile <seconds>` - Capture a cProfile report of the event loop for the window
+        """
+        profiler = self.bot.profiler
+
+        if capture is not None:
+            if profiler.capturing:
+                await ctx.send("❌ A capture is already running.")
+                return
+
+            await ctx.send(f"Profiling for {capture:.0f} seconds...")
+            report = await profiler.capture(min(capture, 120))
+            await ctx.send(file=File(io.BytesIO(report.encode()), filename="profile.txt"))
+            return
+
+        def table(rows: list, title: str) -> str:
+            output = [
+                [name[:30], stats["calls"], f"{stats['p50'] * 1000:.1f}ms", f"{stats['p95'] * 1000:.1f}ms", f"{stats['max'] * 1000:.1f}ms"]
+                for name, stats in rows
+            ]
+            return tabulate(output, headers=(title, "Calls", "p50", "p95", "Max"))
+
+        embed = Embed(title="Profile", color=Color.blue())
+        embed.add_field(name="**❯ Listeners**", value=f"```{table(profiler.top_listeners(8), 'Listener')}```", inline=False)
+        embed.add_field(name="**❯ Commands**", value=f"```{table(profiler.top_commands(8), 'Command')}```", inline=False)
+
+        await ctx.send(embed=embed)
+
+    @sudo.command(aliases=["executor"])
+    async def workers(self, ctx: Context) -> None:
+        """Get the queue depth and latency of the CPU worker pool."""
+        stats = self.bot.executor.stats()
+
+        description = textwrap.dedent(
+            f"""
+            • Pool: **`{stats["kind"]}`**
+            • Queue depth: **`{stats["pending"]}`**
+            • Completed: **`{stats["completed"]}`** (failed: `{stats["failed"]}`, thread fallbacks: `{stats["fallbacks"]}`)
+
+            • Wait p50 / p95: **`{stats["wait_p50"] * 1000:.2f}ms`** / **`{stats["wait_p95"] * 1000:.2f}ms`**
+            • Latency p50 / p95: **`{stats["latency_p50"] * 1000:.2f}ms`** / **`{stats["latency_p95"] * 1000:.2f}ms`**
+            """
+        )
+
+        await ctx.send(embed=Embed(title="Worker pool", description=description, color=Color.blue()))
+
+    @sudo.command(name="log-queue", aliases=["logqueue"])
+    async def log_queue(self, ctx: Context) -> None:
+        """Get the delivery stats of the log channels."""
+        stats = self.bot.log_dispatcher.stats()
+
+        description = textwrap.dedent(
+            f"""
+            • Queued: **`{stats["queued"]}`** embeds for `{stats["channels"]}` channel(s)
+            • Sent: **`{stats["sent_embeds"]}`** embeds in `{stats["sent_messages"]}` message(s)
+            • Dropped: **`{stats["dropped"]}`**
+            """
+        )
+
+        await ctx.send(embed=Embed(title="Log delivery", description=description, color=Color.blue()))
+
+    @sudo.command(name="member-cache", aliases=["membercache"])
+    async def member_cache(self, ctx: Context) -> None:
+        """Get the hit and miss stats of the member lookups."""
+        stats = self.bot.member_resolver.stats()
+        lookups = stats["hits"] + stats["misses"] + stats["negative_hits"]
+
+        description = textwrap.dedent(
+            f"""
+            • Lookups: **`{lookups}`**
+            • Cache hits: **`{stats["hits"]}`**
+            • Negative cache hits: **`{stats["negative_hits"]}`**
+            • Misses: **`{stats["misses"]}`** resolved in `{stats["requests"]}` request(s)
+            • Pending: **`{stats["pending"]}`**
+            """
+        )
+
+        await ctx.send(embed=Embed(title="Member lookups", description=description, color=Color.blue()))
+
+    @sudo.command(name="auto-roles", aliases=["autoroles"])
+    async def auto_roles(self, ctx: Context) -> None:
+        """Get the stats of the auto role queue."""
+        stats = self.bot.autoroles.stats()
+
+        description = textwrap.dedent(
+            f"""
+            • Queued: **`{stats["queued"]}`** member(s)
+            • Assigned: **`{stats["assigned"]}`** with `{stats["retried"]}` retry(s)
+            • Failed: **`{stats["failed"]}`**
+            • Dropped: **`{stats["dropped"]}`**
+            • Delay p95: **`{stats["p95"]:.2f}s`**
+            """
+        )
+
+        await ctx.send(embed=Embed(title="Auto roles", description=description, color=Color.blue()))
+
     @sudo.command(aliases=["shard-stats"])
     async def shard_stats(self, ctx: Context) -> None:
         """Provides statistics for each shard of the bot."""
@@ -316,44 +510,26 @@ class Sudo(*STANDARD_FEATURES, Cog):
         latencies = dict(ctx.bot.latencies)
 
         columns = (
-            "Shard",
-            "Guilds",
-            "Total Members",
-            "Loaded Members",
-            "Music",
-            "Messages",
-            "Latency",
+            ("Guilds", "guilds"),
+            ("Total Members", "members"),
+            ("Loaded Members", "loaded_members"),
+            ("Voice", "voice"),
+            ("Music", "music"),
+            ("Messages", "messages"),
         )
-        shard_stats = {
-            shard_id: self.get_shard_stats(ctx, shard_id)
-            for shard_id in latencies.keys()
-        }
-
-        for shard_id, stats in sorted(shard_stats.items()):
-            stats["Latency"] = round(latencies.get(shard_id) * 1000) or "N/A"
-            output.append([shard_id] + [stats[key] for key in columns[1:]])
 
-        table = tabulate(output, headers=columns)
-        await ctx.send(f"```{table}```")
-
-    @staticmethod
-    def get_shard_stats(ctx: Context, shard_id: int) -> collections.Counter:
-        counters = collections.Counter()
-        counters["Shard"] = shard_id
+        for shard_id in sorted(latencies):
+            stats = self.bot.shard_stats.get(shard_id)
+            latency = latencies[shard_id]
 
-        for guild in ctx.bot.guilds:
-            if guild.shard_id != shard_id:
-                continue
-            guild_counts = ctx.bot.guild_counters[guild.id]
-            counters["Guilds"] += 1
-            counters["Total Members"] += guild.member_count
-            counters["Loaded Members"] += len(guild.members)
-            counters["Messages"] += guild_counts[CounterKeys.MESSAGES_RECIEVED]
-
-            if any(guild.me.id in vc.voice_states for vc in guild.voice_channels):
-                counters["Music"] += 1
+            output.append(
+                [shard_id]
+                + [stats[key] for _, key in columns]
+                + [round(latency * 1000) if latency == latency else "N/A"]
+            )
 
-        return counters
+        table = tabulate(output, headers=("Shard", *(name for name, _ in columns), "Latency"))
+        await ctx.send(f"```{table}```")
 
     @staticmethod
     def cleanup_code(content: str) -> str:
@@ -411,7 +587,7 @@ class Sudo(*STANDARD_FEATURES, Cog):
 
     @sudo.command(aliases=["command-stats", "cmd-stats"])
     async def command_stats(self, ctx: Context) -> None:
-        rows = await CommandStats.get_stats(self.bot.database)
+        records = await CommandStats.get_stats(self.bot.database, limit=10)
 
         embed = Embed(
             title="Usage stats",
@@ -421,11 +597,6 @@ class Sudo(*STANDARD_FEATURES, Cog):
             name=ctx.author.display_name,
             icon_url=str(ctx.author.avatar_url),
         )
-        records = sorted(
-            rows,
-            key=lambda elem: elem["usage_count"],
-            reverse=True,
-        )[:10]
 
         for record in records:
             embed.add_field(
@@ -1,12 +1,11 @@
-import io
-import random
+import typing as t
 
-import aiohttp
-from bs4 import BeautifulSoup
-from discord import Color, Embed, File
+from discord import Color, Embed
+from discord.ext import tasks
 from discord.ext.commands import Cog, Context, group
 
 from bot import Bot, config
+from bot.utils.comics import ComicIndex, parse_image_src
 
 
 class Comics(Cog):
@@ -14,6 +13,27 @@ class Comics(Cog):
 
     def __init__(self, bot: Bot) -> None:
         self.bot = bot
+        self.index = ComicIndex(bot)
+        self.refresh_index.start()
+
+    def cog_unload(self) -> None:
+        self.refresh_index.cancel()
+
+    @tasks.loop(hours=6)
+    async def refresh_index(self) -> None:
+        """Refresh the comic archives and latest IDs every 6 hours."""
+        await self.index.refresh()
+
+    @staticmethod
+    async def send_comic(ctx: Context, title: str, img_url: t.Optional[str]) -> None:
+        """Send the comic by embedding its URL, instead of re-uploading the image."""
+        if img_url is None:
+            await ctx.send(":x: Couldn't find the comic, Please try again later!")
+            return
+
+        embed = Embed(title=title, color=Color.blurple())
+        embed.set_image(url=img_url)
+        await ctx.send(embed=embed)
 
     @group(invoke_without_command=True)
     async def comic(self, ctx: Context) -> None:
@@ -23,146 +43,72 @@ class Comics(Cog):
     @comic.command()
     async def ohno(self, ctx: Context) -> None:
         """Send a random 'Webcomic Name' comic."""
-        url = "http://webcomicname.com/random"
-
         async with ctx.typing():
-            async with self.bot.session.get(url) as response:
-                soup = BeautifulSoup(await response.text(), "html.parser")
-
-            img_url = soup.find(property="og:image")["content"]
-
-            async with self.bot.session.get(img_url) as response:
-                img = io.BytesIO(await response.read())
-
-            embed = Embed(title="Random Webcomic", color=Color.blurple())
-            embed.set_image(url="attachment://ohno.png")
-            file = File(img, "ohno.png")
-            await ctx.send(file=file, embed=embed)
+            img_url = await self.index.og_image("http://webcomicname.com/random")
+            await self.send_comic(ctx, "Random Webcomic", img_url)
 
     @comic.command()
     async def smbc(self, ctx: Context) -> None:
         """Send a random 'Saturday Morning' comic."""
-        url = "http://www.smbc-comics.com/comic/archive"
-
         async with ctx.typing():
-            async with self.bot.session.get(
-                url, headers={"Connection": "keep-alive"}
-            ) as response:
-                soup = BeautifulSoup(await response.text(), "html.parser")
-
-            all_comics = soup.find("select", attrs={"name": "comic"})
-            all_comics_url_stubs = [
-                option["value"] for option in all_comics.findChildren()
-            ]
-
-            random_comic = random.choice(all_comics_url_stubs)
-            comic_url = f"http://www.smbc-comics.com/{random_comic}"
-
-            async with self.bot.session.get(
-                comic_url, headers={"Connection": "keep-alive"}
-            ) as resp:
-                soup = BeautifulSoup(await resp.text(), "html.parser")
-                img_url = soup.find(property="og:image")["content"]
-
-            async with self.bot.session.get(img_url) as response:
-                img = io.BytesIO(await response.read())
-
-            embed = Embed(title="Random Sunday Morning", color=Color.blurple())
-            embed.set_image(url="attachment://smbc.png")
-            file = File(img, "smbc.png")
-            await ctx.send(file=file, embed=embed)
+            img_url = await self.index.random_smbc()
+            await self.send_comic(ctx, "Random Sunday Morning", img_url)
 
     @comic.command()
     async def pbf(self, ctx: Context) -> None:
         """Send a random 'The Perry Bible' comic."""
-        url = "http://pbfcomics.com/random"
-
         async with ctx.typing():
-            async with self.bot.session.get(url) as response:
-                soup = BeautifulSoup(await response.text(), "html.parser")
-
-            img_url = soup.find(property="og:image")["content"]
-
-            async with self.bot.session.get(img_url) as response:
-                img = io.BytesIO(await response.read())
-
-            embed = Embed(title="Random Perry Bible", color=Color.blurple())
-            embed.set_image(url="attachment://pbf.png")
-            file = File(img, "pbf.png")
-            await ctx.send(file=file, embed=embed)
+            img_url = await self.index.og_image("http://pbfcomics.com/random")
+            await self.send_comic(ctx, "Random Perry Bible", img_url)
 
     @comic.command()
     async def cah(self, ctx: Context) -> None:
         """Send a random 'Cyanide and Happiness' comic."""
-        url = "http://explosm.net/comics/random"
-
         async with ctx.typing():
-            async with self.bot.session.get(url) as response:
-                soup = BeautifulSoup(await response.text(), "html.parser")
-
-            img_url = soup.find(property="og:image")["content"]
-
-            async with self.bot.session.get(img_url) as response:
-                img = io.BytesIO(await response.read())
-
-            embed = Embed(title="Random Cyanide and Happiness",
-                          color=Color.blurple())
-            embed.set_image(url="attachment://cah.png")
-            file = File(img, "cah.png")
-            await ctx.send(file=file, embed=embed)
+            img_url = await self.index.og_image("http://explosm.net/comics/random")
+            await self.send_comic(ctx, "Random Cyanide and Happiness", img_url)
 
     @comic.command()
     async def xkcd(self, ctx: Context, comic_type: str = "latest") -> None:
         """See the latest/a random 'xkcd' comic."""
         comic_type = comic_type.lower()
 
-        if comic_type not in ["latest", "random"]:
-            url = f"https://xkcd.com/{comic_type}/info.0.json"
+        if comic_type == "latest":
+            data = await self.index.latest_xkcd()
+        elif comic_type == "random":
+            data = await self.index.random_xkcd()
+        elif comic_type.isdigit():
+            data = await self.index.xkcd(int(comic_type))
+        else:
+            data = None
+
+        if data is not None:
+            day, month, year = data["day"], data["month"], data["year"]
+            comic_num = data["num"]
+
+            embed = Embed(
+                title=data["title"],
+                description=data["alt"],
+                color=Color.blurple(),
+            )
+            embed.set_image(url=data["img"])
+            embed.set_footer(
+                text=f"Comic date : [{day}/{month}/{year}] | Comic Number - {comic_num}"
+            )
+
+            await ctx.send(embed=embed)
         else:
-            url = "https://xkcd.com/info.0.json"
-
-        if comic_type == "random":
-            async with aiohttp.ClientSession() as session:
-                async with session.get("https://xkcd.com/info.0.json") as response:
-                    data = await response.json()
-                random_comic = random.randint(1, data["num"])
-
-                url = f"https://xkcd.com/{random_comic}/info.0.json"
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    day, month, year = data["day"], data["month"], data["year"]
-                    comic_num = data["num"]
-
-                    embed = Embed(
-                        title=data["title"],
-                        description=data["alt"],
-                        color=Color.blurple(),
-                    )
-                    embed.set_image(url=data["img"])
-                    embed.set_footer(
-                        text=f"Comic date : [{day}/{month}/{year}] | Comic Number - {comic_num}"
-                    )
-
-                    await ctx.send(embed=embed)
-                else:
-                    url = "https://xkcd.com/info.0.json"
-                    async with aiohttp.ClientSession() as csession:
-                        async with csession.get(url) as req:
-                            data = await req.json()
-                            latest_comic_num = data["num"]
-
-                    help_embed = Embed(
-                        title="XKCD HELP",
-                        description=f"""
-                        **{config.COMMAND_PREFIX}xkcd latest** - (Get the latest comic)
-                        **{config.COMMAND_PREFIX}xkcd <num>** - (Enter a comic number | range 1 to {latest_comic_num})
-                        **{config.COMMAND_PREFIX}xkcd random** - (Get a random comic)
-                        """,
-                    )
-                    await ctx.send(embed=help_embed)
+            latest_comic_num = (await self.index.latest_xkcd())["num"]
+
+            help_embed = Embed(
+                title="XKCD HELP",
+                description=f"""
+                **{config.COMMAND_PREFIX}xkcd latest** - (Get the latest comic)
+                **{config.COMMAND_PREFIX}xkcd <num>** - (Enter a comic number | range 1 to {latest_comic_num})
+                **{config.COMMAND_PREFIX}xkcd random** - (Get a random comic)
+                """,
+            )
+            await ctx.send(embed=help_embed)
 
     @comic.command()
     async def mrls(self, ctx: Context) -> None:
@@ -171,58 +117,24 @@ class Comics(Cog):
 
         async with ctx.typing():
             async with self.bot.session.get(url) as response:
-                soup = BeautifulSoup(await response.text(), "html.parser")
-
-            img_url = (
-                f"http://www.mrlovenstein.com{soup.find(id='comic_main_image')['src']}"
-            )
-
-            async with self.bot.session.get(img_url) as response:
-                img = io.BytesIO(await response.read())
+                src = await self.bot.run_cpu(parse_image_src, await response.text(), "comic_main_image")
 
-            embed = Embed(title="Random Mr. Lovenstein", color=Color.blurple())
-            embed.set_image(url="attachment://mrls.png")
-            file = File(img, "mrls.png")
-            await ctx.send(file=file, embed=embed)
+            img_url = f"http://www.mrlovenstein.com{src}" if src else None
+            await self.send_comic(ctx, "Random Mr. Lovenstein", img_url)
 
     @comic.command()
     async def chainsaw(self, ctx: Context) -> None:
         """Send a random 'Chainsawsuit' comic."""
-        url = "http://chainsawsuit.com/comic/random/?random&nocache=1"
-
         async with ctx.typing():
-            async with self.bot.session.get(url) as response:
-                soup = BeautifulSoup(await response.text(), "html.parser")
-
-            img_url = soup.find(property="og:image")["content"]
-
-            async with self.bot.session.get(img_url) as response:
-                img = io.BytesIO(await response.read())
-
-            embed = Embed(title="Random Chainsawsuit", color=Color.blurple())
-            embed.set_image(url="attachment://chainsawsuit.png")
-            file = File(img, "chainsawsuit.png")
-            await ctx.send(file=file, embed=embed)
+            img_url = await self.index.og_image("http://chainsawsuit.com/comic/random/?random&nocache=1")
+            await self.send_comic(ctx, "Random Chainsawsuit", img_url)
 
     @comic.command()
     async def sarah(self, ctx: Context) -> None:
         """Send a random 'Sarah's Scribbles' comic."""
-        url = "http://www.gocomics.com/random/sarahs-scribbles"
-
         async with ctx.typing():
-            async with self.bot.session.get(url) as response:
-                soup = BeautifulSoup(await response.text(), "html.parser")
-
-            img_url = soup.find(property="og:image")["content"]
-
-            async with self.bot.session.get(img_url) as response:
-                img = io.BytesIO(await response.read())
-
-            embed = Embed(title="Random Sarah Scribbles",
-                          color=Color.blurple())
-            embed.set_image(url="attachment://sarahscribbles.png")
-            file = File(img, "sarahscribbles.png")
-            await ctx.send(file=file, embed=embed)
+            img_url = await self.index.og_image("http://www.gocomics.com/random/sarahs-scribbles")
+            await self.send_comic(ctx, "Random Sarah Scribbles", img_url)
 
     @comic.command()
     async def garfield(self, ctx: Context) -> None:
@@ -233,6 +145,4 @@ class Comics(Cog):
             async with self.bot.session.get(url) as response:
                 img_url = (await response.json())["url"]
 
-            embed = Embed(title="Garfield", color=Color.blurple())
-            embed.set_image(url=img_url)
-            await ctx.send(embed=embed)
+            await self.send_comic(ctx, "Garfield", img_url)
@@ -1,4 +1,5 @@
 from bot import Bot
+from .history import History
 from .join_log import JoinLog
 from .member_log import MemberLog
 from .voice_log import VoiceLog
@@ -6,6 +7,7 @@ from .voice_log import VoiceLog
 
 def setup(bot: Bot) -> None:
     """Load the cogs."""
+    bot.add_cog(History(bot))
     bot.add_cog(JoinLog(bot))
     bot.add_cog(MemberLog(bot))
     bot.add_cog(VoiceLog(bot))
@@ -0,0 +1,106 @@
+import time
+import typing as t
+from datetime import datetime, timedelta
+
+import discord
+from discord.ext.commands import Cog, Context, group, has_permissions
+
+from bot import Bot
+from bot.databases.event_log import EventLog
+from bot.utils.pages import EmbedPages
+
+EVENT_TYPES = (
+    "member_join",
+    "member_leave",
+    "username_change",
+    "discriminator_change",
+    "avatar_change",
+    "nickname_change",
+    "verification",
+    "role_update",
+    "voice_join",
+    "voice_leave",
+    "voice_move",
+    "voice_mute",
+    "voice_deafen",
+    "voice_afk",
+)
+
+
+class History(Cog):
+    """Query the history of the logged events."""
+
+    def __init__(self, bot: Bot) -> None:
+        self.bot = bot
+
+    @staticmethod
+    def format_event(row: dict) -> str:
+        timestamp = int(row["created_at"].timestamp())
+        details = ", ".join(f"{key}: `{value}`" for key, value in row["data"].items())
+
+        line = f"<t:{timestamp}:R> **{row['event_type']}** by <@{row['user_id']}>"
+        return f"{line}\n{details}" if details else line
+
+    async def send_history(self, ctx: Context, title: str, rows: t.List[dict], elapsed: float) -> None:
+        if not rows:
+            await ctx.send(":x: No events were found.")
+            return
+
+        embeds = []
+        for index in range(0, len(rows), 10):
+            embed = discord.Embed(
+                title=title,
+                description="\n\n".join(self.format_event(row) for row in rows[index: index + 10]),
+                color=discord.Color.blue(),
+            )
+            embed.set_footer(text=f"Found {len(rows)} events in {elapsed * 1000:.1f}ms.")
+            embeds.append(embed)
+
+        await EmbedPages(embeds).start(ctx)
+
+    @group(invoke_without_command=True, aliases=["event-log", "events"])
+    @has_permissions(manage_guild=True)
+    async def history(self, ctx: Context) -> None:
+        """Look through the logged events of the server."""
+        await ctx.send_help(ctx.command)
+
+    @history.command(name="user", aliases=["member"])
+    async def history_user(
+        self, ctx: Context, user: discord.User, hours: t.Optional[int] = 24, event_type: t.Optional[str] = None
+    ) -> None:
+        """Show the events of a user within the last hours, optionally of a single type. The hours can be left out."""
+        await self._query(ctx, f"History of {user}", user_id=user.id, event_type=event_type, hours=hours)
+
+    @history.command(name="type")
+    async def history_type(self, ctx: Context, event_type: str, hours: int = 24) -> None:
+        """Show the events of a type within the last hours."""
+        await self._query(ctx, f"History of {event_type}", event_type=event_type, hours=hours)
+
+    @history.command(name="types")
+    async def history_types(self, ctx: Context) -> None:
+        """Show the types of events that are recorded."""
+        await ctx.send(f"Recorded event types: {', '.join(f'`{event_type}`' for event_type in EVENT_TYPES)}")
+
+    async def _query(
+        self,
+        ctx: Context,
+        title: str,
+        user_id: t.Optional[int] = None,
+        event_type: t.Optional[str] = None,
+        hours: int = 24,
+    ) -> None:
+        if event_type is not None and event_type not in EVENT_TYPES:
+            await ctx.send(f":x: Invalid event type! Use `{ctx.prefix}history types` to see them.")
+            return
+
+        start = time.perf_counter()
+        rows = await EventLog.query(
+            self.bot.database,
+            ctx.guild.id,
+            user_id=user_id,
+            event_type=event_type,
+            since=datetime.utcnow() - timedelta(hours=hours),
+        )
+        elapsed = time.perf_counter() - start
+
+        await self.send_history(ctx, title, rows, elapsed)
@@ -31,7 +31,7 @@ class JoinLog(Cog):
         embed.set_footer(text=f"Member ID: {member.id}")
         embed.timestamp = datetime.utcnow()
 
-        await self.send_join_log(member.guild, embed=embed)
+        await self.send_join_log(member, embed, "member_join", {"created_at": member.created_at.isoformat()})
 
     @Cog.listener("on_member_remove")
     async def member_leave_log(self, member: discord.Member) -> None:
@@ -52,9 +52,20 @@ class JoinLog(Cog):
         embed.set_footer(text=f"Member ID: {member.id}")
         embed.timestamp = datetime.utcnow()
 
-        await self.send_join_log(member.guild, embed=embed)
+        await self.send_join_log(
+            member,
+            embed,
+            "member_leave",
+            {
+                "joined_at": member.joined_at.isoformat() if member.joined_at else None,
+                "roles": [role.id for role in member.roles[1:]],
+            },
+        )
 
-    async def send_join_log(self, guild: discord.Guild, *args, **kwargs) -> None:
+    async def send_join_log(
+        self, member: discord.Member, embed: discord.Embed, event_type: str, data: dict
+    ) -> None:
+        guild = member.guild
         join_log_channel_id = await Logging.get_config(self.bot.database, guild.id)
 
         if not join_log_channel_id:
@@ -65,4 +76,5 @@ class JoinLog(Cog):
         if not join_log_channel:
             return
 
-        await join_log_channel.send(*args, **kwargs)
+        self.bot.log_dispatcher.send(join_log_channel, embed)
+        self.bot.event_store.record(guild.id, member.id, event_type, **data)
@@ -1,21 +1,130 @@
+import asyncio
+import collections
 import textwrap
+import typing as t
 from datetime import datetime
 
 import discord
 from discord.ext.commands import Cog
+from loguru import logger
 
 from bot import Bot
 from bot.databases.logging import Logging
-from bot.utils.audit_log import get_latest_audit
+
+# Seconds between the attempts at building the member log index.
+INDEX_RETRY_DELAY = 60
+
+
+class MemberLogIndex:
+    """
+    Reverse index from user IDs to the guilds having member logging enabled.
+
+    User updates are global, so this lets them be routed to just the log channels they
+    concern, without scanning every guild or querying the config of each one.
+    """
+
+    def __init__(self) -> None:
+        self.channels: t.Dict[int, int] = {}
+        self.users: t.DefaultDict[int, t.Set[int]] = collections.defaultdict(set)
+
+    def add_guild(self, guild: discord.Guild, channel_id: int) -> None:
+        self.channels[guild.id] = channel_id
+
+        for member in guild.members:
+            self.users[member.id].add(guild.id)
+
+    def remove_guild(self, guild: discord.Guild) -> None:
+        if self.channels.pop(guild.id, None) is None:
+            return
+
+        for member in guild.members:
+            self.remove_member(guild.id, member.id)
+
+    def add_member(self, guild_id: int, user_id: int) -> None:
+        if guild_id in self.channels:
+            self.users[user_id].add(guild_id)
+
+    def remove_member(self, guild_id: int, user_id: int) -> None:
+        guilds = self.users.get(user_id)
+        if guilds is None:
+            return
+
+        guilds.discard(guild_id)
+        if not guilds:
+            del self.users[user_id]
+
+    def channels_for(self, user_id: int) -> t.Dict[int, int]:
+        """Get the member log channel IDs of the guilds shared with the user, mapped by the guild ID."""
+        return {guild_id: self.channels[guild_id] for guild_id in self.users.get(user_id, ())}
 
 
 class MemberLog(Cog):
     def __init__(self, bot: Bot) -> None:
         self.bot = bot
 
+        self.index = MemberLogIndex()
+        self.index_ready = asyncio.Event()
+        self.bot.loop.create_task(self.build_index())
+
+    async def build_index(self) -> None:
+        """Build the user to guild index from the configured member log channels, retrying until it succeeds."""
+        await self.bot.wait_until_ready()
+
+        while True:
+            try:
+                channels = await Logging.get_log_channels(self.bot.database, "member_log")
+            except Exception:
+                logger.exception(f"Couldn't build the member log index, retrying in {INDEX_RETRY_DELAY} seconds.")
+
+                # The listeners waiting on it go through with what's indexed so far, instead of piling up.
+                self.index_ready.set()
+                await asyncio.sleep(INDEX_RETRY_DELAY)
+                continue
+
+            for guild_id, channel_id in channels.items():
+                guild = self.bot.get_guild(guild_id)
+
+                if guild is not None:
+                    self.index.add_guild(guild, channel_id)
+
+            self.index_ready.set()
+            return
+
+    # -- Index maintenance --
+    @Cog.listener("on_log_channel_update")
+    async def update_index(self, guild: discord.Guild, log_type: str, channel_id: t.Optional[int]) -> None:
+        if log_type != "member_log":
+            return
+
+        self.index.remove_guild(guild)
+        if channel_id is not None:
+            self.index.add_guild(guild, channel_id)
+
+    @Cog.listener("on_member_join")
+    async def index_member_join(self, member: discord.Member) -> None:
+        self.index.add_member(member.guild.id, member.id)
+
+    @Cog.listener("on_member_remove")
+    async def index_member_remove(self, member: discord.Member) -> None:
+        self.index.remove_member(member.guild.id, member.id)
+
+    @Cog.listener("on_guild_join")
+    async def index_guild_join(self, guild: discord.Guild) -> None:
+        """Index a joined guild, its member log may still be configured from an earlier stay."""
+        row = await Logging.get_config(self.bot.database, guild.id)
+
+        if row is not None and row["member_log"] is not None:
+            self.index.add_guild(guild, row["member_log"])
+
+    @Cog.listener("on_guild_remove")
+    async def index_guild_remove(self, guild: discord.Guild) -> None:
+        self.index.remove_guild(guild)
+        self.bot.audit_logs.forget(guild.id)
+
     @Cog.listener("on_user_update")
     async def log_user_update(self, before: discord.User, after: discord.User) -> None:
         if before.name != after.name:
+            event = ("username_change", {"before": before.name, "after": after.name})
             embed = discord.Embed(
                 title="Username change",
                 description=textwrap.dedent(
@@ -28,6 +137,7 @@ class MemberLog(Cog):
                 color=discord.Color.blue(),
             )
         elif before.discriminator != after.discriminator:
+            event = ("discriminator_change", {"before": before.discriminator, "after": after.discriminator})
             embed = discord.Embed(
                 title="Discriminator change",
                 description=textwrap.dedent(
@@ -40,6 +150,7 @@ class MemberLog(Cog):
                 color=discord.Color.blue(),
             )
         elif before.avatar != after.avatar:
+            event = ("avatar_change", {"before": before.avatar, "after": after.avatar})
             embed = discord.Embed(
                 title="Avatar change",
                 description=textwrap.dedent(
@@ -58,32 +169,30 @@ class MemberLog(Cog):
         embed.set_thumbnail(url=after.avatar_url)
         embed.set_footer(text=f"ID: {after.id}")
 
-        member_logs = []
-        for guild in self.bot.guilds:
-            if guild.get_member(after.id) is None:
-                continue
-
-            member_log_channel_id = await Logging.get_config(
-                self.bot.database, guild.id
-            )
-            member_log_channel = None
+        await self.index_ready.wait()
 
-            if member_log_channel_id is not None:
-                member_log_channel = guild.get_channel(
-                    member_log_channel_id["member_log"]
-                )
+        member_logs = []
+        for guild_id, channel_id in self.index.channels_for(after.id).items():
+            guild = self.bot.get_guild(guild_id)
+            member_log_channel = guild.get_channel(channel_id) if guild is not None else None
 
             if member_log_channel is not None:
                 member_logs.append(member_log_channel)
 
         for channel in member_logs:
-            await channel.send(embed=embed)
+            self.bot.log_dispatcher.send(channel, embed)
+            self.bot.event_store.record(channel.guild.id, after.id, event[0], **event[1])
 
     @Cog.listener("on_member_update")
     async def log_member_update(
         self, before: discord.Member, after: discord.Member
     ) -> None:
+        await self.index_ready.wait()
+        if after.guild.id not in self.index.channels:
+            return
+
         if before.nick != after.nick:
+            event = ("nickname_change", {"before": before.nick, "after": after.nick})
             embed = discord.Embed(
                 title="Nickname change",
                 description=textwrap.dedent(
@@ -96,6 +205,7 @@ class MemberLog(Cog):
                 color=discord.Color.blue(),
             )
         elif before.pending != after.pending:
+            event = ("verification", {})
             embed = discord.Embed(
                 title="Member verification completed",
                 description=textwrap.dedent(
@@ -114,13 +224,22 @@ class MemberLog(Cog):
             stats = {"added": old_roles - new_roles,
                      "removed": new_roles - old_roles}
 
-            audit_log = await get_latest_audit(
+            audit_log = await self.bot.audit_logs.get_latest(
                 after.guild, [discord.AuditLogAction.member_role_update], after
             )
 
             if audit_log:
                 user = audit_log.user
 
+            event = (
+                "role_update",
+                {
+                    "added": [role.id for role in new_roles - old_roles],
+                    "removed": [role.id for role in old_roles - new_roles],
+                    "moderator": audit_log.user.id if audit_log else None,
+                },
+            )
+
             action = "added" if not stats.get("removed") else "removed"
 
             description = textwrap.dedent(
@@ -146,18 +265,19 @@ class MemberLog(Cog):
         embed.set_thumbnail(url=after.avatar_url)
         embed.set_footer(text=f"ID: {after.id}")
 
-        await self.send_member_log(after.guild, embed=embed)
-
-    async def send_member_log(self, guild: discord.Guild, *args, **kwargs) -> None:
-        member_log_channel_id = await Logging.get_config(self.bot.database, guild.id)
+        await self.send_member_log(after, embed, *event)
 
+    async def send_member_log(
+        self, member: discord.Member, embed: discord.Embed, event_type: str, data: dict
+    ) -> None:
+        member_log_channel_id = self.index.channels.get(member.guild.id)
         if not member_log_channel_id:
             return
 
-        member_log_channel = guild.get_channel(
-            member_log_channel_id["member_log"])
+        member_log_channel = member.guild.get_channel(member_log_channel_id)
 
         if not member_log_channel:
             return
 
-        await member_log_channel.send(*args, **kwargs)
+        self.bot.log_dispatcher.send(member_log_channel, embed)
+        self.bot.event_store.record(member.guild.id, member.id, event_type, **data)
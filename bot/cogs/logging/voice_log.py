@@ -20,18 +20,21 @@ class VoiceLog(Cog):
             return
 
         if before.mute != after.mute:
+            event = ("voice_mute", {"state": after.mute})
             embed = discord.Embed(
                 title="User muted" if after.mute else "User un-muted",
                 description=f"**`User`**: {member.mention}",
                 color=discord.Color.gold(),
             )
         elif before.deaf != after.deaf:
+            event = ("voice_deafen", {"state": after.deaf})
             embed = discord.Embed(
                 title="User deafened" if after.mute else "User un-deafened",
                 description=f"**`User`**: {member.mention}",
                 color=discord.Color.gold(),
             )
         elif before.afk != after.afk:
+            event = ("voice_afk", {"state": after.afk})
             embed = discord.Embed(
                 title="User is now AFK" if after.afk else "User is not AFK Anymore",
                 description=f"**User:** {member.mention}",
@@ -39,6 +42,13 @@ class VoiceLog(Cog):
             )
         elif before.channel != after.channel:
             description = f"**User**: {member.mention}"
+            event = (
+                "voice_leave" if not after.channel else "voice_join" if not before.channel else "voice_move",
+                {
+                    "before": before.channel.id if before.channel else None,
+                    "after": after.channel.id if after.channel else None,
+                },
+            )
 
             if after.channel:
                 description += f"\n**After Channel**: {after.channel}"
@@ -58,9 +68,12 @@ class VoiceLog(Cog):
 
         embed.set_thumbnail(url=member.avatar_url)
 
-        await self.send_voice_log(member.guild, embed=embed)
+        await self.send_voice_log(member, embed, *event)
 
-    async def send_voice_log(self, guild: discord.Guild, *args, **kwargs) -> None:
+    async def send_voice_log(
+        self, member: discord.Member, embed: discord.Embed, event_type: str, data: dict
+    ) -> None:
+        guild = member.guild
         voice_log_channel_id = await Logging.get_config(self.bot.database, guild.id)
 
         if not voice_log_channel_id:
@@ -72,4 +85,5 @@ class VoiceLog(Cog):
         if not voice_log_channel:
             return
 
-        await voice_log_channel.send(*args, **kwargs)
+        self.bot.log_dispatcher.send(voice_log_channel, embed)
+        self.bot.event_store.record(guild.id, member.id, event_type, **data)
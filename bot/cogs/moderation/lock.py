@@ -1,3 +1,7 @@
+import asyncio
+import typing as t
+from contextlib import suppress
+
 import discord
 from discord.ext.commands import (
     Cog,
@@ -10,13 +14,27 @@ from discord.ext.commands import (
     has_permissions,
 )
 
-from bot import Bot
+from bot import Bot, config
 from bot.databases.roles import Roles as RolesDB
+from bot.utils.lockdown import Lockdown, OverwriteEdit, OverwriteJob, PermissionValues, Target
+
+# Permissions kept for the bot on locked channels, so it can still manage them.
+BOT_PERMISSIONS = {
+    "read_messages": True,
+    "send_messages": True,
+    "manage_messages": True,
+    "add_reactions": True,
+    "manage_channels": True,
+}
+# Channels edited at once before the progress is shown, and seconds between its updates.
+PROGRESS_THRESHOLD = 5
+PROGRESS_INTERVAL = 2
 
 
 class Lock(Cog):
     def __init__(self, bot: Bot) -> None:
         self.bot = bot
+        self.lockdowns: t.Dict[int, Lockdown] = {}
 
     def cog_check(self, ctx: Context) -> bool:
         if ctx.guild:
@@ -33,6 +51,54 @@ class Lock(Cog):
 
         return default_role
 
+    def get_lockdown(self, guild: discord.Guild) -> Lockdown:
+        if guild.id not in self.lockdowns:
+            self.lockdowns[guild.id] = Lockdown.load(config.lockdown_snapshots, guild)
+
+        return self.lockdowns[guild.id]
+
+    async def _report_progress(self, job: OverwriteJob, message: discord.Message) -> None:
+        """Keep editing `message` with the progress of `job` until it's done."""
+        while not job.done:
+            await asyncio.sleep(PROGRESS_INTERVAL)
+            with suppress(discord.HTTPException):
+                await message.edit(content=job.progress())
+
+    async def apply_edits(self, ctx: Context, edits: t.List[OverwriteEdit], reason: str) -> OverwriteJob:
+        """Apply the overwrite edits, showing their progress when there's more than a few channels."""
+        job = OverwriteJob(edits, reason=reason)
+
+        if len(job.channels) <= PROGRESS_THRESHOLD:
+            await job.run()
+            return job
+
+        progress = await ctx.send(job.progress())
+        reporter = asyncio.create_task(self._report_progress(job, progress))
+
+        try:
+            await job.run()
+        finally:
+            reporter.cancel()
+
+        with suppress(discord.HTTPException):
+            await progress.edit(content=job.progress())
+
+        return job
+
+    async def lock_targets(
+        self, ctx: Context, values: PermissionValues, override_roles: t.Optional[t.List[discord.Role]]
+    ) -> t.Dict[Target, PermissionValues]:
+        """Get the permissions to set when locking, denying `values` to the default role and allowing them to the override roles."""
+        targets = {
+            await self.get_default_role(ctx): {name: False for name in values},
+            ctx.guild.me: BOT_PERMISSIONS,
+        }
+
+        for role in override_roles or ():
+            targets[role] = {name: True for name in values}
+
+        return targets
+
     @command()
     @has_permissions(manage_channels=True)
     async def lock(
@@ -46,43 +112,27 @@ class Lock(Cog):
 
         Specify the override roles so that the specified roles can talk.
         """
-        default_role = await self.get_default_role(ctx)
-
-        guild = ctx.guild
-
         if not channels:
             channels = [ctx.channel]
 
-        overwrites = {
-            default_role: discord.PermissionOverwrite(send_messages=False),
-            guild.me: discord.PermissionOverwrite(
-                read_messages=True,
-                send_messages=True,
-                manage_messages=True,
-                add_reactions=True,
-                manage_channels=True,
-            ),
-        }
+        channels = [channel for channel in channels if channel.permissions_for(ctx.author).manage_channels]
 
-        if override_roles is not None:
-            for role in override_roles:
-                overwrites[role] = discord.PermissionOverwrite(
-                    send_messages=True,
-                )
+        lockdown = self.get_lockdown(ctx.guild)
+        edits = lockdown.plan(channels, await self.lock_targets(ctx, {"send_messages": False}, override_roles))
 
-        channel_count = 0
-        for channel in channels:
-            if channel.permissions_for(ctx.author).manage_channels:
-                await channel.edit(overwrites=overwrites)
-                channel_count += 1
+        job = await self.apply_edits(ctx, edits, f"Channel locked | Requested by {ctx.author}.")
+        lockdown.save(config.lockdown_snapshots)
 
-                await channel.send("🔒 Locked down this channel.")
-            else:
-                continue
+        failed = {edit.channel.id for edit, _ in job.failed}
+        for channel in channels:
+            if channel.id not in failed:
+                with suppress(discord.HTTPException):
+                    await channel.send("🔒 Locked down this channel.")
 
-        if channels != [ctx.channel]:
+        if channels != [ctx.channel] or job.failed:
             await ctx.send(
-                f"Locked down {channel_count} channel{'s' if channel_count > 1 else ''}."
+                f"Locked down {len(channels) - len(failed)} channel{'s' if len(channels) - len(failed) != 1 else ''} "
+                f"({job.completed} overwrites edited, {len(job.failed)} failed)."
             )
 
     @command()
@@ -96,43 +146,40 @@ class Lock(Cog):
         """
         Unlock a locked channel to continue traffic.
 
+        The permissions the lock changed are restored to what they were before it.
         Specify the override roles so that the specified roles cannot talk.
         """
-        default_role = await self.get_default_role(ctx)
-        guild = ctx.guild
         if not channels:
             channels = [ctx.channel]
 
-        overwrites = {
-            default_role: discord.PermissionOverwrite(send_messages=True),
-            guild.me: discord.PermissionOverwrite(
-                read_messages=True,
-                send_messages=True,
-                manage_messages=True,
-                add_reactions=True,
-                manage_channels=True,
-            ),
-        }
+        channels = [channel for channel in channels if channel.permissions_for(ctx.author).manage_channels]
 
-        if override_roles is not None:
-            for role in override_roles:
-                overwrites[role] = discord.PermissionOverwrite(
-                    send_messages=False,
-                )
+        lockdown = self.get_lockdown(ctx.guild)
+        locked = [channel for channel in channels if channel.id in lockdown.channel_ids]
+        edits = lockdown.plan_restore(locked)
 
-        channel_count = 0
-        for channel in channels:
-            if channel.permissions_for(ctx.author).manage_channels:
-                await channel.edit(overwrites=overwrites)
-                channel_count += 1
+        # Channels locked before the snapshots existed only get the default role's deny lifted.
+        unknown = [channel for channel in channels if channel not in locked]
+        default_role = await self.get_default_role(ctx)
+        edits += Lockdown(ctx.guild).plan(unknown, {default_role: {"send_messages": None}})
 
-                await channel.send("🔓 Unlocked down this channel.")
-            else:
-                continue
+        if override_roles:
+            edits += Lockdown(ctx.guild).plan(channels, {role: {"send_messages": False} for role in override_roles})
+
+        job = await self.apply_edits(ctx, edits, f"Channel unlocked | Requested by {ctx.author}.")
+        lockdown.keep_failed(edit for edit, _ in job.failed)
+        lockdown.save(config.lockdown_snapshots)
 
-        if channels != [ctx.channel]:
+        failed = {edit.channel.id for edit, _ in job.failed}
+        for channel in channels:
+            if channel.id not in failed:
+                with suppress(discord.HTTPException):
+                    await channel.send("🔓 Unlocked down this channel.")
+
+        if channels != [ctx.channel] or job.failed:
             await ctx.send(
-                f"Unlocked {channel_count} channel{'s' if channel_count > 1 else ''}."
+                f"Unlocked {len(channels) - len(failed)} channel{'s' if len(channels) - len(failed) != 1 else ''} "
+                f"({job.completed} overwrites restored, {len(job.failed)} failed)."
             )
 
     @command()
@@ -177,7 +224,7 @@ class Lock(Cog):
                 f"✅ Disabled slowmode for {channel_count} channel{'s' if channel_count > 1 else ''}."
             )
 
-    @command(name="maintenance-lock", aliases=["maintenancelock", "m-lock"])
+    @command(name="maintenance-lock", aliases=["maintenancelock", "m-lock", "lockdown"])
     @has_permissions(administrator=True)
     async def maintenance_lock(
         self, ctx: Context, override_roles: Greedy[RoleConverter] = None
@@ -185,80 +232,37 @@ class Lock(Cog):
         """
         Disable default role's permission to send message on all channels.
 
+        Only the overwrites that need to change are edited, and what they were is saved so the
+        maintenance unlock can restore them exactly.
         Specify the override roles so that the specified roles can talk or connect to VC.
         """
-        channel_count = 0
-        default_role = await self.get_default_role(ctx)
-        guild = ctx.guild
-
-        overwrites = {
-            default_role: discord.PermissionOverwrite(
-                send_messages=False, connect=False
-            ),
-            guild.me: discord.PermissionOverwrite(
-                read_messages=True,
-                send_messages=True,
-                manage_messages=True,
-                add_reactions=True,
-                manage_channels=True,
-            ),
-        }
+        lockdown = self.get_lockdown(ctx.guild)
+        targets = await self.lock_targets(ctx, {"send_messages": False, "connect": False}, override_roles)
+        edits = lockdown.plan(ctx.guild.channels, targets)
 
-        if override_roles is not None:
-            for role in override_roles:
-                overwrites[role] = discord.PermissionOverwrite(
-                    send_messages=True, connect=True
-                )
-
-        for channel in ctx.guild.channels:
-            await channel.edit(
-                overwrites=overwrites,
-                reason=f"Reason: Server Under Maintenance | Requested by {ctx.author}.",
-            )
-            channel_count += 1
+        job = await self.apply_edits(ctx, edits, f"Reason: Server Under Maintenance | Requested by {ctx.author}.")
+        lockdown.save(config.lockdown_snapshots)
 
         await ctx.send(
-            f"Locked down {channel_count} channel{'s' if channel_count > 1 else ''}. Server Under Maintenance."
+            f"Locked down {len(job.channels)} channel{'s' if len(job.channels) != 1 else ''} "
+            f"({job.completed} overwrites edited, {len(job.failed)} failed). Server Under Maintenance."
         )
 
-    @command(name="maintenance-unlock", aliases=["maintenanceunlock", "m-unlock"])
+    @command(name="maintenance-unlock", aliases=["maintenanceunlock", "m-unlock", "lift-lockdown"])
     @has_permissions(administrator=True)
-    async def maintenance_unlock(
-        self, ctx: Context, override_roles: Greedy[RoleConverter] = None
-    ) -> None:
-        """
-        Enable default role's permission to send message on all channels.
-
-        Specify the override roles so that the specified roles can talk or connect to VC.
-        """
-        channel_count = 0
-        default_role = await self.get_default_role(ctx)
-        guild = ctx.guild
-
-        overwrites = {
-            default_role: discord.PermissionOverwrite(send_messages=True, connect=True),
-            guild.me: discord.PermissionOverwrite(
-                read_messages=True,
-                send_messages=True,
-                manage_messages=True,
-                add_reactions=True,
-                manage_channels=True,
-            ),
-        }
-
-        if override_roles is not None:
-            for role in override_roles:
-                overwrites[role] = discord.PermissionOverwrite(
-                    send_messages=False, connect=False
-                )
-
-        for channel in ctx.guild.channels:
-            await channel.edit(
-                overwrites=overwrites,
-                reason=f"Reason: Server Maintenance Lifted | Requested by {ctx.author}.",
-            )
-            channel_count += 1
+    async def maintenance_unlock(self, ctx: Context) -> None:
+        """Restore every permission changed by the locks on this server to what it was before."""
+        lockdown = self.get_lockdown(ctx.guild)
+        if not lockdown:
+            await ctx.send("❌ There are no locked channels to restore on this server.")
+            return
+
+        edits = lockdown.plan_restore()
+        job = await self.apply_edits(ctx, edits, f"Reason: Server Maintenance Lifted | Requested by {ctx.author}.")
+        lockdown.keep_failed(edit for edit, _ in job.failed)
+        lockdown.save(config.lockdown_snapshots)
 
         await ctx.send(
-            f"Unlocked {channel_count} channel{'s' if channel_count > 1 else ''}. Server Maintenance lifted."
+            f"Unlocked {len(job.channels)} channel{'s' if len(job.channels) != 1 else ''} "
+            f"({job.completed} overwrites restored, {len(job.failed)} failed). Server Maintenance lifted."
         )
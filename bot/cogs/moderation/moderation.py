@@ -1,13 +1,17 @@
+import argparse
 import asyncio
+import functools
+import operator
 import re
+import shlex
 import typing as t
-from collections import Counter
 from contextlib import suppress
 from datetime import datetime
 from textwrap import dedent
 
 import discord
 from discord.ext.commands import (
+    BadArgument,
     Cog,
     Context,
     Greedy,
@@ -24,12 +28,31 @@ from discord.ext.commands import (
 from bot import Bot
 from bot.core.converters import ModerationReason
 from bot.utils.embeds import moderation_embed
+from bot.utils.purge import Predicate, PurgeJob
+
+
+# Searching more than this many messages in one go is almost always a typo.
+MAX_PURGE_SEARCH = 100_000
+# Seconds between the edits of a purge's progress message.
+PROGRESS_INTERVAL = 2
+
+CUSTOM_EMOJI = re.compile(r"<a?:[a-zA-Z0-9\_]+:([0-9]+)>")
+
+
+class Arguments(argparse.ArgumentParser):
+    """Argument parser raising errors instead of exiting."""
+
+    def error(self, message: str) -> t.NoReturn:
+        raise RuntimeError(message)
 
 
 class Moderation(Cog):
     def __init__(self, bot: Bot) -> None:
         self.bot = bot
 
+        # The last purge of each channel, for progress, cancellation and resuming.
+        self.purges: t.Dict[int, PurgeJob] = {}
+
     @property
     def embeds_cog(self) -> discord.Embed:
         """Get currently loaded Embed cog instance."""
@@ -69,44 +92,69 @@ class Moderation(Cog):
         await asyncio.sleep(4)
         await message.delete()
 
-    @staticmethod
-    async def do_removal(
-            ctx: Context, limit: int, predicate: t.Callable, *, before: t.Any = None, after: t.Any = None
-    ) -> None:
-        if limit > 2000:
-            await ctx.send(f"Too many messages to search given ({limit}/2000)")
+    async def _report_progress(self, job: PurgeJob, message: discord.Message) -> None:
+        """Keep editing `message` with the progress of `job` until it's done."""
+        while not job.done:
+            await asyncio.sleep(PROGRESS_INTERVAL)
+            with suppress(discord.HTTPException):
+                await message.edit(content=job.progress())
+
+    async def run_purge(self, ctx: Context, job: PurgeJob) -> None:
+        if ctx.channel.id in self.purges and not self.purges[ctx.channel.id].done:
+            await ctx.send(
+                f"A purge is already running in this channel, use `{ctx.prefix}advanced-clear cancel` to stop it."
+            )
             return
 
-        if before is None:
-            before = ctx.message
-        else:
-            before = discord.Object(id=before)
+        self.purges[ctx.channel.id] = job
 
-        if after is not None:
-            after = discord.Object(id=after)
+        progress = await ctx.send(job.progress())
+        reporter = asyncio.create_task(self._report_progress(job, progress))
 
         try:
-            deleted = await ctx.channel.purge(limit=limit, before=before, after=after, check=predicate)
-        except discord.HTTPException as e:
-            await ctx.send(f"Error: {e} (try a smaller search?)")
-            return
+            await job.run()
+        finally:
+            reporter.cancel()
 
-        spammers = Counter(m.author.display_name for m in deleted)
-        deleted = len(deleted)
-        messages = [f'{deleted} message{" was" if deleted == 1 else "s were"} removed.']
+        with suppress(discord.HTTPException):
+            await progress.delete()
 
-        if deleted:
+        messages = [f'{job.deleted} message{" was" if job.deleted == 1 else "s were"} removed.']
+
+        if job.error is not None:
+            messages.append(f"Stopped by an error: {job.error}, use `{ctx.prefix}advanced-clear resume` to retry.")
+        elif job.cancelled:
+            messages.append(f"Cancelled after searching {job.scanned} messages, use `{ctx.prefix}advanced-clear resume` to continue.")
+
+        if job.deleted:
             messages.append("")
-            spammers = sorted(spammers.items(), key=lambda t: t[1], reverse=True)
+            spammers = sorted(job.authors.items(), key=lambda t: t[1], reverse=True)
             messages.extend(f"• **{name}**: {count}" for name, count in spammers)
 
         to_send = "\n".join(messages)
 
         if len(to_send) > 2000:
-            await ctx.send(f"Successfully removed {deleted} messages.", delete_after=10)
+            await ctx.send(f"Successfully removed {job.deleted} messages.", delete_after=10)
         else:
             await ctx.send(to_send, delete_after=10)
 
+    async def do_removal(
+            self, ctx: Context, limit: int, predicate: Predicate, *, before: t.Any = None, after: t.Any = None
+    ) -> None:
+        if limit > MAX_PURGE_SEARCH:
+            await ctx.send(f"Too many messages to search given ({limit}/{MAX_PURGE_SEARCH})")
+            return
+
+        if before is None:
+            before = ctx.message
+        elif not isinstance(before, discord.abc.Snowflake):
+            before = discord.Object(id=before)
+
+        if after is not None and not isinstance(after, discord.abc.Snowflake):
+            after = discord.Object(id=after)
+
+        await self.run_purge(ctx, PurgeJob(ctx.channel, predicate, limit, before=before, after=after))
+
     @group(aliases=["advanced-purge", "advanced-clear", "advanced-clean"])
     @guild_only()
     @has_permissions(manage_messages=True)
@@ -118,26 +166,24 @@ class Moderation(Cog):
     @advanced_clear.command()
     async def embeds(self, ctx: Context, search: int = 100) -> None:
         """Removes messages that have embeds in them."""
-        await self.do_removal(ctx, search, lambda e: len(e.embeds))
+        await self.do_removal(ctx, search, Predicate.has_embeds())
 
     @advanced_clear.command()
     async def files(self, ctx: Context, search: int = 100) -> None:
         """Removes messages that have attachments in them."""
-        await self.do_removal(ctx, search, lambda e: len(e.attachments))
+        await self.do_removal(ctx, search, Predicate.has_attachments())
 
     @advanced_clear.command()
     async def images(self, ctx: Context, search: int = 100) -> None:
         """Removes messages that have embeds or attachments."""
-        await self.do_removal(
-            ctx, search, lambda e: len(e.embeds) or len(e.attachments)
-        )
+        await self.do_removal(ctx, search, Predicate.has_embeds() | Predicate.has_attachments())
 
     @advanced_clear.command()
     async def user(
         self, ctx: Context, member: discord.Member, search: int = 100
     ) -> None:
         """Removes all messages by the member."""
-        await self.do_removal(ctx, search, lambda e: e.author == member)
+        await self.do_removal(ctx, search, Predicate.by_users(member))
 
     @advanced_clear.command()
     async def contains(self, ctx: Context, *, substr: str) -> None:
@@ -145,34 +191,124 @@ class Moderation(Cog):
         if len(substr) < 3:
             await ctx.send("The substring length must be at least 3 characters.")
         else:
-            await self.do_removal(ctx, 100, lambda e: substr in e.content)
+            await self.do_removal(ctx, 100, Predicate.contains(substr))
 
     @advanced_clear.command(name="bot", aliases=["bots"])
     async def _bot(self, ctx: Context, prefix: str = None, search: int = 100) -> None:
         """Removes a bot user's messages and messages with their optional prefix."""
-
-        def predicate(m: t.Any) -> t.Any:
-            return (m.webhook_id is None and m.author.bot) or (
-                prefix and m.content.startswith(prefix)
-            )
-
-        await self.do_removal(ctx, search, predicate)
+        await self.do_removal(ctx, search, Predicate.from_bots(prefix))
 
     @advanced_clear.command(name="emoji", aliases=["emojis"])
     async def _emoji(self, ctx: Context, search: int = 100) -> None:
         """Removes all messages containing custom emoji."""
-        custom_emoji = re.compile(r"<a?:[a-zA-Z0-9\_]+:([0-9]+)>")
+        await self.do_removal(ctx, search, Predicate.matches(CUSTOM_EMOJI))
+
+    @advanced_clear.command()
+    async def custom(self, ctx: Context, *, arguments: str) -> None:
+        """
+        Removes messages matching a combination of filters, all of them by default or any of them with `--or`.
+
+        Filters: `--user <member>...`, `--regex <pattern>`, `--contains <text>`, `--files`, `--embeds`, `--bots`,
+        `--emoji`, `--after <YYYY-MM-DD>`, `--before <YYYY-MM-DD>`, `--not` to invert, and `--search <amount>`.
+        """
+        parser = Arguments(add_help=False, allow_abbrev=False)
+        parser.add_argument("--user", nargs="+")
+        parser.add_argument("--regex")
+        parser.add_argument("--contains")
+        parser.add_argument("--files", action="store_true")
+        parser.add_argument("--embeds", action="store_true")
+        parser.add_argument("--bots", action="store_true")
+        parser.add_argument("--emoji", action="store_true")
+        parser.add_argument("--after", type=datetime.fromisoformat)
+        parser.add_argument("--before", type=datetime.fromisoformat)
+        parser.add_argument("--or", action="store_true", dest="_or")
+        parser.add_argument("--not", action="store_true", dest="_not")
+        parser.add_argument("--search", type=int, default=100)
+
+        try:
+            args = parser.parse_args(shlex.split(arguments))
+        except (ValueError, RuntimeError) as exc:
+            await ctx.send(f"❌ {exc}")
+            return
+
+        predicates = []
+
+        if args.user:
+            try:
+                users = [await MemberConverter().convert(ctx, user) for user in args.user]
+            except BadArgument as exc:
+                await ctx.send(f"❌ {exc}")
+                return
+
+            predicates.append(Predicate.by_users(*users))
+
+        if args.regex:
+            try:
+                predicates.append(Predicate.matches(args.regex))
+            except re.error as exc:
+                await ctx.send(f"❌ Invalid regex `{args.regex}`: {exc}")
+                return
+
+        if args.contains:
+            predicates.append(Predicate.contains(args.contains))
+        if args.files:
+            predicates.append(Predicate.has_attachments())
+        if args.embeds:
+            predicates.append(Predicate.has_embeds())
+        if args.bots:
+            predicates.append(Predicate.from_bots())
+        if args.emoji:
+            predicates.append(Predicate.matches(CUSTOM_EMOJI))
+
+        predicate = (
+            functools.reduce(operator.or_ if args._or else operator.and_, predicates) if predicates else Predicate.everything()
+        )
 
-        def predicate(m: discord.Message) -> t.Optional[re.Match[str]]:
-            return custom_emoji.search(m.content)
+        if args._not:
+            predicate = ~predicate
+
+        # The date range bounds the history itself, so nothing outside of it is searched.
+        before = discord.Object(id=discord.utils.time_snowflake(args.before)) if args.before else ctx.message
+        after = discord.Object(id=discord.utils.time_snowflake(args.after, high=True)) if args.after else None
+
+        await self.do_removal(ctx, args.search, predicate, before=before, after=after)
+
+    @advanced_clear.command()
+    async def status(self, ctx: Context) -> None:
+        """Show the progress of the last purge in this channel."""
+        job = self.purges.get(ctx.channel.id)
+        if job is None:
+            await ctx.send("❌ There's no purge in this channel.")
+            return
+
+        await ctx.send(job.progress())
+
+    @advanced_clear.command()
+    async def cancel(self, ctx: Context) -> None:
+        """Cancel the purge running in this channel."""
+        job = self.purges.get(ctx.channel.id)
+        if job is None or job.done:
+            await ctx.send("❌ There's no purge running in this channel.")
+            return
+
+        job.cancel()
+        await ctx.message.add_reaction("✅")
+
+    @advanced_clear.command()
+    async def resume(self, ctx: Context) -> None:
+        """Resume the last cancelled or failed purge in this channel from where it stopped."""
+        job = self.purges.get(ctx.channel.id)
+        if job is None or not job.done or not job.remaining or not (job.cancelled or job.error):
+            await ctx.send("❌ There's no stopped purge to resume in this channel.")
+            return
 
-        await self.do_removal(ctx, search, predicate)
+        await self.run_purge(ctx, job.resume())
 
     @advanced_clear.command(name="reactions")
     async def _reactions(self, ctx: Context, search: int = 100) -> None:
         """Removes all reactions from messages that have them."""
-        if search > 2000:
-            await ctx.send(f"Too many messages to search for ({search} / 2000)")
+        if search > MAX_PURGE_SEARCH:
+            await ctx.send(f"Too many messages to search for ({search} / {MAX_PURGE_SEARCH})")
             return
 
         total_reactions = 0
@@ -62,6 +62,7 @@ class LoggingSettings(Cog):
         await Logging.set_log_channel(
             self.bot.database, "server_log", ctx.guild.id, channel.id
         )
+        self.bot.dispatch("log_channel_update", ctx.guild, "server_log", channel.id)
         await ctx.send("Successfully configured the server log channel.")
 
     @logging_config.command()
@@ -72,6 +73,7 @@ class LoggingSettings(Cog):
         await Logging.set_log_channel(
             self.bot.database, "mod_log", ctx.guild.id, channel.id
         )
+        self.bot.dispatch("log_channel_update", ctx.guild, "mod_log", channel.id)
         await ctx.send("Successfully configured the mod log channel.")
 
     @logging_config.command()
@@ -84,6 +86,7 @@ class LoggingSettings(Cog):
         await Logging.set_log_channel(
             self.bot.database, "message_log", ctx.guild.id, channel.id
         )
+        self.bot.dispatch("log_channel_update", ctx.guild, "message_log", channel.id)
         await ctx.send("Successfully configured the message log channel.")
 
     @logging_config.command()
@@ -96,6 +99,7 @@ class LoggingSettings(Cog):
         await Logging.set_log_channel(
             self.bot.database, "member_log", ctx.guild.id, channel.id
         )
+        self.bot.dispatch("log_channel_update", ctx.guild, "member_log", channel.id)
         await ctx.send("Successfully configured the member log channel.")
 
     @logging_config.command()
@@ -108,6 +112,7 @@ class LoggingSettings(Cog):
         await Logging.set_log_channel(
             self.bot.database, "join_log", ctx.guild.id, channel.id
         )
+        self.bot.dispatch("log_channel_update", ctx.guild, "join_log", channel.id)
         await ctx.send("Successfully configured the join log channel.")
 
     @logging_config.command()
@@ -120,4 +125,5 @@ class LoggingSettings(Cog):
         await Logging.set_log_channel(
             self.bot.database, "voice_log", ctx.guild.id, channel.id
         )
+        self.bot.dispatch("log_channel_update", ctx.guild, "voice_log", channel.id)
         await ctx.send("Successfully configured the voice log channel.")
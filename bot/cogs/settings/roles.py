@@ -114,6 +114,7 @@ class Roles(Cog):
         if role.id not in roles:
             roles.append(role.id)
             await AutoRoles.set_role(self.bot.database, ctx.guild.id, roles)
+            self.bot.autoroles.set_roles(ctx.guild.id, roles)
             await ctx.send(f"{role.mention} will be now auto assigned.")
         else:
             await ctx.send("Role already in the autorole list.")
@@ -133,6 +134,7 @@ class Roles(Cog):
         if role.id in roles:
             roles.remove(role.id)
             await AutoRoles.set_role(self.bot.database, ctx.guild.id, roles)
+            self.bot.autoroles.set_roles(ctx.guild.id, roles)
             await ctx.send(f"{role.mention} will not be auto assigned anymore.")
         else:
             await ctx.send("Role is not in the autorole list.")
@@ -141,4 +143,5 @@ class Roles(Cog):
     async def clear(self, ctx: Context) -> None:
         """Remove all the autoroles configured."""
         await AutoRoles.set_role(self.bot.database, ctx.guild.id, [])
+        self.bot.autoroles.set_roles(ctx.guild.id, [])
         await ctx.send("Autoroles list cleared.")
@@ -24,6 +24,9 @@ DATABASE_CONN = (
     f"/{DATABASE['database']}"
 )
 
+# Apply the pending database migrations on startup, instead of refusing to start
+auto_migrate = os.getenv("AUTO_MIGRATE", "false").lower() in ("1", "true", "yes")
+
 # Logger configuration
 log_file = "logs/bot.log"
 log_level = "INFO"
@@ -33,6 +36,33 @@ log_format = (
 )
 log_file_size = "300 MB"
 
+# Local snapshots of remote data, so they're available instantly on startup
+cache_dir = os.getenv("CACHE_DIR", "cache")
+tio_languages_snapshot = f"{cache_dir}/tio_languages.json"
+cog_manifest = f"{cache_dir}/cog_manifest.json"
+# Overwrites replaced by active lockdowns, one file per guild
+lockdown_snapshots = f"{cache_dir}/lockdowns"
+
+# Maximum tio.run eval jobs running at once
+eval_concurrency = int(os.getenv("EVAL_CONCURRENCY", 4))
+
+# Days to keep the logged events for
+event_log_retention = int(os.getenv("EVENT_LOG_RETENTION", 30))
+
+# Worker pool for CPU bound work, defaults to the CPU count when unset
+cpu_workers = int(os.getenv("CPU_WORKERS", 0)) or None
+
+# Clustering, a process is launched per cluster when there's more than one
+cluster_count = int(os.getenv("CLUSTER_COUNT", 1))
+# Total shard count, the one recommended by Discord is used when unset
+shard_count = int(os.getenv("SHARD_COUNT", 0)) or None
+# Port of the launcher's IPC server on localhost, a free port is picked when unset
+ipc_port = int(os.getenv("IPC_PORT", 0))
+
+# Prometheus metrics endpoint, disabled when the port is unset
+metrics_host = os.getenv("METRICS_HOST", "0.0.0.0")
+metrics_port = int(os.getenv("METRICS_PORT", 0))
+
 # -- Music --
 nodes = {
     "MAIN": {
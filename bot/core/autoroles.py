@@ -0,0 +1,153 @@
+import asyncio
+import time
+import typing as t
+
+import discord
+from loguru import logger
+
+from bot.core.telemetry import Histogram
+from bot.databases.autorole import AutoRoles
+
+if t.TYPE_CHECKING:
+    from bot import Bot
+
+# Upper bounds of the histogram of the time from a join to its roles being added, in seconds.
+DELAY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, float("inf"))
+
+
+class AutoRoleQueue:
+    """
+    Queued assignment of the auto roles to new members.
+
+    The auto roles of each guild are cached, and every member gets all of them in a single
+    member edit request, merged with the roles they already have. Joins go through a queue drained by `workers` tasks, so a join wave
+    is spread over time instead of hitting the rate limits all at once. Requests that are
+    still rate limited or fail on Discord's side are retried with a backoff, up to
+    `retries` times.
+    """
+
+    def __init__(self, bot: "Bot", workers: int = 2, retries: int = 3, max_queue: int = 10000) -> None:
+        self.bot = bot
+        self.workers = workers
+        self.retries = retries
+        self.max_queue = max_queue
+
+        # Guild ID -> auto role IDs
+        self._roles: t.Dict[int, t.List[int]] = {}
+        self._queue: "asyncio.Queue[t.Tuple[discord.Member, float]]" = asyncio.Queue()
+        self._tasks: t.List[asyncio.Task] = []
+
+        # Stats
+        self.assigned = 0
+        self.retried = 0
+        self.failed = 0
+        self.dropped = 0
+        self.delay = Histogram(DELAY_BUCKETS)
+
+    # -- Configuration cache --
+    async def get_roles(self, guild_id: int) -> t.List[int]:
+        if guild_id not in self._roles:
+            row = await AutoRoles.get_roles(self.bot.database, guild_id)
+            self._roles[guild_id] = list(row["auto_roles"]) if row is not None and row["auto_roles"] else []
+
+        return self._roles[guild_id]
+
+    def set_roles(self, guild_id: int, roles: t.List[int]) -> None:
+        """Update the cached auto roles of a guild, after they're changed in the database."""
+        self._roles[guild_id] = list(roles)
+
+    # -- Queue --
+    async def add(self, member: discord.Member) -> None:
+        """Queue a member to be given the auto roles of their guild, if there's any."""
+        if not await self.get_roles(member.guild.id):
+            return
+
+        if self._queue.qsize() >= self.max_queue:
+            self.dropped += 1
+            return
+
+        self._queue.put_nowait((member, time.monotonic()))
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+
+        self._tasks = []
+
+    async def _worker(self) -> None:
+        while True:
+            member, queued = await self._queue.get()
+
+            try:
+                await self._assign(member)
+            except Exception:
+                logger.exception(f"Couldn't add the auto roles of {member.id} in {member.guild.id}.")
+                self.failed += 1
+            finally:
+                self.delay.observe(time.monotonic() - queued)
+
+    async def _assign(self, member: discord.Member) -> None:
+        guild = member.guild
+        roles = [
+            role for role in map(guild.get_role, await self.get_roles(guild.id))
+            if role is not None and role not in member.roles and role < guild.me.top_role
+        ]
+
+        if not roles or guild.get_member(member.id) is None:
+            return
+
+        for attempt in range(self.retries + 1):
+            # The edit replaces the whole role list, so it's merged with the member's current roles on every attempt.
+            member = guild.get_member(member.id)
+            if member is None:
+                return
+
+            try:
+                # Not atomic, so all the roles are set in one request instead of one per role.
+                await member.add_roles(*roles, reason="Auto roles", atomic=False)
+            except discord.Forbidden:
+                self.failed += 1
+                return
+            except discord.HTTPException as exc:
+                if (exc.status != 429 and exc.status < 500) or attempt == self.retries:
+                    self.failed += 1
+                    logger.warning(f"Couldn't add the auto roles of {member.id} in {guild.id}: {exc!r}")
+                    return
+
+                self.retried += 1
+                await asyncio.sleep(2 ** attempt)
+            else:
+                self.assigned += 1
+                return
+
+    # -- Reading --
+    def stats(self) -> t.Dict[str, t.Any]:
+        return {
+            "queued": self._queue.qsize(),
+            "assigned": self.assigned,
+            "retried": self.retried,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "p95": self.delay.quantile(0.95),
+        }
+
+    def metrics(self, prefix: str = "overflow") -> t.Iterator[str]:
+        """Export the queue stats as Prometheus text samples."""
+        yield f"# TYPE {prefix}_autorole_queue_size gauge"
+        yield f"{prefix}_autorole_queue_size {self._queue.qsize()}"
+
+        yield f"# TYPE {prefix}_autorole_members_total counter"
+        for result in ("assigned", "failed", "dropped"):
+            yield f'{prefix}_autorole_members_total{{result="{result}"}} {getattr(self, result)}'
+
+        yield f"# TYPE {prefix}_autorole_retries_total counter"
+        yield f"{prefix}_autorole_retries_total {self.retried}"
+
+        yield f"# TYPE {prefix}_autorole_delay_seconds histogram"
+        yield from self.delay.export(f"{prefix}_autorole_delay_seconds")
@@ -0,0 +1,277 @@
+import asyncio
+import multiprocessing
+import signal
+import time
+import typing as t
+
+import aiohttp
+from loguru import logger
+
+from bot.core.ipc import IPCClient, read_message, send_message
+
+GATEWAY_URL = "https://discord.com/api/v9/gateway/bot"
+
+
+def compute_shard_ranges(shard_count: int, cluster_count: int) -> t.List[t.List[int]]:
+    """Split the shards into contiguous ranges, one per cluster, as evenly as possible."""
+    cluster_count = max(1, min(cluster_count, shard_count))
+    size, extra = divmod(shard_count, cluster_count)
+
+    ranges = []
+    start = 0
+    for cluster_id in range(cluster_count):
+        end = start + size + (1 if cluster_id < extra else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+
+    return ranges
+
+
+async def fetch_recommended_shards(token: str) -> int:
+    """Get the shard count recommended by Discord."""
+    async with aiohttp.ClientSession() as session:
+        async with session.get(GATEWAY_URL, headers={"Authorization": f"Bot {token}"}) as response:
+            response.raise_for_status()
+            data = await response.json()
+
+    return data["shards"]
+
+
+def run_cluster(cluster_id: int, cluster_count: int, shard_ids: t.List[int], shard_count: int, ipc_port: int) -> None:
+    """Entrypoint of a cluster process."""
+    from bot.__main__ import TOKEN, create_bot
+
+    bot = create_bot(
+        cluster_id=cluster_id,
+        cluster_count=cluster_count,
+        shard_ids=shard_ids,
+        shard_count=shard_count,
+        ipc_port=ipc_port,
+    )
+    bot.run(TOKEN)
+
+
+class FakeCluster:
+    """
+    Stand-in for the bot in a cluster process, connecting to the IPC server without connecting to Discord.
+
+    It reports made up stats for its shards, and logs the commands broadcasted to it.
+    """
+
+    def __init__(self, cluster_id: int, shard_ids: t.List[int]) -> None:
+        self.cluster = cluster_id
+        self.shard_ids = shard_ids
+        self.started_at = time.time()
+
+    async def wait_until_ready(self) -> None:
+        pass
+
+    def cluster_stats(self) -> dict:
+        return {
+            "guilds": 1000 * len(self.shard_ids),
+            "members": 100_000 * len(self.shard_ids),
+            "shards": self.shard_ids,
+            "latency": 0.05,
+            "started": self.started_at,
+        }
+
+    def dispatch(self, event: str, *args) -> None:
+        logger.info(f"Cluster {self.cluster} received {event}: {args}")
+
+
+def run_fake_cluster(cluster_id: int, cluster_count: int, shard_ids: t.List[int], shard_count: int, ipc_port: int) -> None:
+    """Entrypoint of a fake cluster process, to run the launcher locally without connecting to Discord."""
+    async def run() -> None:
+        client = IPCClient(FakeCluster(cluster_id, shard_ids), "127.0.0.1", ipc_port, interval=1)
+        await client.start()
+
+        # Exit once the launcher is gone.
+        while client.connected:
+            await asyncio.sleep(1)
+
+    asyncio.run(run())
+
+
+class ClusterProcess:
+    def __init__(self, cluster_id: int, shard_ids: t.List[int]) -> None:
+        self.cluster_id = cluster_id
+        self.shard_ids = shard_ids
+
+        self.process: t.Optional[multiprocessing.Process] = None
+        self.restarts = 0
+        self.started_at = 0.0
+
+
+class ClusterLauncher:
+    """
+    Runs the bot as one process per cluster, each with a contiguous range of the shards.
+
+    Cluster processes are supervised and restarted with an exponential backoff if they die.
+    The launcher also hosts the IPC server the clusters connect to, holding their latest
+    stats and relaying broadcasted commands. `target` is the function run in each process,
+    `run_fake_cluster` runs the launcher without connecting to Discord.
+    """
+
+    def __init__(
+        self,
+        cluster_count: int,
+        shard_count: int,
+        ipc_host: str = "127.0.0.1",
+        ipc_port: int = 0,
+        target: t.Callable = run_cluster,
+        max_backoff: float = 300,
+    ) -> None:
+        self.shard_count = shard_count
+        self.ranges = compute_shard_ranges(shard_count, cluster_count)
+        self.cluster_count = len(self.ranges)
+
+        self.ipc_host = ipc_host
+        self.ipc_port = ipc_port
+        self.target = target
+        self.max_backoff = max_backoff
+
+        self.clusters = [ClusterProcess(cluster_id, shard_ids) for cluster_id, shard_ids in enumerate(self.ranges)]
+        self.stats: t.Dict[int, dict] = {}
+
+        self._context = multiprocessing.get_context("spawn")
+        self._writers: t.Dict[int, asyncio.StreamWriter] = {}
+        self._server: t.Optional[asyncio.AbstractServer] = None
+        self._closing = False
+
+    # -- IPC --
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        cluster_id = None
+
+        try:
+            while True:
+                message = await read_message(reader)
+                if message is None:
+                    break
+
+                op = message["op"]
+                if op == "identify":
+                    cluster_id = message["cluster_id"]
+                    self._writers[cluster_id] = writer
+
+                elif op == "stats":
+                    self.stats[cluster_id] = message["data"]
+
+                elif op == "request":
+                    await send_message(writer, {"op": "response", "nonce": message["nonce"], "data": self.answer(message["query"])})
+
+                elif op == "broadcast":
+                    command = {"op": "command", "command": message["command"], "args": message.get("args", [])}
+                    await asyncio.gather(
+                        *(send_message(other, command) for other in list(self._writers.values())),
+                        return_exceptions=True,
+                    )
+        finally:
+            if cluster_id is not None and self._writers.get(cluster_id) is writer:
+                del self._writers[cluster_id]
+
+            writer.close()
+
+    def answer(self, query: str) -> t.Any:
+        if query == "stats":
+            return {str(cluster_id): stats for cluster_id, stats in self.stats.items()}
+
+        if query == "clusters":
+            return {
+                str(cluster.cluster_id): {
+                    "shards": cluster.shard_ids,
+                    "alive": cluster.process is not None and cluster.process.is_alive(),
+                    "restarts": cluster.restarts,
+                }
+                for cluster in self.clusters
+            }
+
+        return None
+
+    # -- Processes --
+    def _spawn(self, cluster: ClusterProcess) -> None:
+        cluster.process = self._context.Process(
+            target=self.target,
+            args=(cluster.cluster_id, self.cluster_count, cluster.shard_ids, self.shard_count, self.ipc_port),
+            name=f"cluster-{cluster.cluster_id}",
+            daemon=False,
+        )
+        cluster.process.start()
+        cluster.started_at = time.monotonic()
+
+        logger.info(f"Started cluster {cluster.cluster_id} with shards {cluster.shard_ids} (pid {cluster.process.pid}).")
+
+    async def _supervise(self, cluster: ClusterProcess) -> None:
+        backoff = 1.0
+
+        while not self._closing:
+            self._spawn(cluster)
+
+            while cluster.process.is_alive():
+                await asyncio.sleep(1)
+
+            if self._closing:
+                return
+
+            # Reset the backoff if the cluster was up for a while before dying.
+            if time.monotonic() - cluster.started_at > 60:
+                backoff = 1.0
+
+            cluster.restarts += 1
+            logger.error(
+                f"Cluster {cluster.cluster_id} exited with {cluster.process.exitcode}, restarting in {backoff:.0f}s."
+            )
+
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle_connection, self.ipc_host, self.ipc_port)
+        self.ipc_port = self._server.sockets[0].getsockname()[1]
+
+        logger.info(f"Launching {self.cluster_count} clusters for {self.shard_count} shards, IPC on port {self.ipc_port}.")
+
+        # Clusters are started one after another, so they don't all identify at the same time.
+        supervisors = []
+        for cluster in self.clusters:
+            supervisors.append(asyncio.create_task(self._supervise(cluster)))
+            await asyncio.sleep(5)
+
+        await asyncio.gather(*supervisors)
+
+    def close(self) -> None:
+        self._closing = True
+
+        for cluster in self.clusters:
+            if cluster.process is not None and cluster.process.is_alive():
+                cluster.process.terminate()
+
+        for cluster in self.clusters:
+            if cluster.process is not None:
+                cluster.process.join(10)
+
+        if self._server is not None:
+            self._server.close()
+
+    def run(self) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, loop.stop)
+            except NotImplementedError:
+                pass
+
+        try:
+            loop.run_until_complete(self.start())
+        except RuntimeError:
+            # The loop was stopped by a signal.
+            pass
+        finally:
+            self.close()
+            loop.close()
+
+
+if __name__ == "__main__":
+    # Supervise fake clusters locally, killing one of their processes shows the restarts.
+    ClusterLauncher(cluster_count=3, shard_count=8, target=run_fake_cluster).run()
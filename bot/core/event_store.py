@@ -0,0 +1,128 @@
+import asyncio
+import typing as t
+from datetime import datetime, timedelta
+
+from loguru import logger
+from sqlalchemy.exc import SQLAlchemyError
+
+from bot.databases.event_log import EventLog
+
+if t.TYPE_CHECKING:
+    from bot import Bot
+
+
+class EventStore:
+    """
+    Buffered writer for the event log.
+
+    Events are appended to an in-memory buffer and inserted in a single batch once
+    `batch_size` events are buffered, or every `flush_interval` seconds. If the database
+    falls behind and the buffer is full, new events are dropped and counted. Events older
+    than `retention` days are pruned daily.
+    """
+
+    def __init__(
+        self,
+        bot: "Bot",
+        flush_interval: float = 5.0,
+        batch_size: int = 500,
+        max_buffer: int = 20000,
+        retention: int = 30,
+    ) -> None:
+        self.bot = bot
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_buffer = max_buffer
+        self.retention = retention
+
+        self._buffer: t.List[dict] = []
+        self._full = asyncio.Event()
+        self._tasks: t.List[asyncio.Task] = []
+        self._closing = False
+
+        # Stats
+        self.written = 0
+        self.dropped = 0
+        self.pruned = 0
+
+    def record(self, guild_id: int, user_id: int, event_type: str, **data) -> None:
+        """Append an event to the buffer."""
+        if len(self._buffer) >= self.max_buffer:
+            self.dropped += 1
+            return
+
+        self._buffer.append(
+            {
+                "guild_id": guild_id,
+                "user_id": user_id,
+                "event_type": event_type,
+                "created_at": datetime.utcnow(),
+                "data": data,
+            }
+        )
+
+        if len(self._buffer) >= self.batch_size:
+            self._full.set()
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+
+        self._tasks = [
+            asyncio.create_task(self._writer()),
+            asyncio.create_task(self._pruner()),
+        ]
+
+    async def flush(self) -> None:
+        """Write the buffered events to the database."""
+        while self._buffer:
+            batch, self._buffer = self._buffer[: self.batch_size], self._buffer[self.batch_size:]
+
+            try:
+                await EventLog.insert_many(self.bot.database, batch)
+            except (SQLAlchemyError, OSError) as exc:
+                self.dropped += len(batch)
+                logger.error(f"Couldn't write {len(batch)} events to the event log: {exc!r}")
+            else:
+                self.written += len(batch)
+
+    async def _writer(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._full.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+
+            self._full.clear()
+            await self.flush()
+
+    async def _pruner(self) -> None:
+        while True:
+            before = datetime.utcnow() - timedelta(days=self.retention)
+
+            try:
+                self.pruned += await EventLog.prune(self.bot.database, before)
+            except (SQLAlchemyError, OSError) as exc:
+                logger.error(f"Couldn't prune the event log: {exc!r}")
+
+            await asyncio.sleep(24 * 60 * 60)
+
+    async def close(self) -> None:
+        """Write everything still buffered, letting a batch being inserted finish instead of cancelling it."""
+        if not self._tasks:
+            return
+
+        writer, pruner = self._tasks
+        self._tasks = []
+        pruner.cancel()
+
+        if self.bot.database is None:
+            writer.cancel()
+            return
+
+        # The writer does a last flush once woken up, the one here is for when it died before.
+        self._closing = True
+        self._full.set()
+        await asyncio.wait((writer,))
+
+        await self.flush()
@@ -0,0 +1,123 @@
+import asyncio
+import collections
+import pickle
+import time
+import typing as t
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+from loguru import logger
+
+from bot.utils.utils import percentile
+
+
+def _timed_call(submitted_at: float, func: t.Callable, *args, **kwargs) -> t.Tuple[float, t.Any]:
+    """Run the function in the worker, and return how long it waited in the queue along with the result."""
+    waited = time.time() - submitted_at
+    return waited, func(*args, **kwargs)
+
+
+class CPUExecutor:
+    """
+    Shared executor for CPU bound work, such as parsing HTML or rendering tables.
+
+    A process pool is used when available, so the work doesn't hold the GIL of the event
+    loop's process. If processes can't be spawned, or a job can't be pickled, it falls
+    back to a thread pool.
+    """
+
+    def __init__(self, max_workers: t.Optional[int] = None, use_processes: bool = True, history: int = 256) -> None:
+        self.max_workers = max_workers
+        self.use_processes = use_processes
+
+        self._process_pool: t.Optional[Executor] = None
+        self._thread_pool: t.Optional[Executor] = None
+
+        # Stats
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.fallbacks = 0
+        self.wait_times = collections.deque(maxlen=history)
+        self.latencies = collections.deque(maxlen=history)
+
+    @property
+    def thread_pool(self) -> Executor:
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix="cpu-worker")
+
+        return self._thread_pool
+
+    @property
+    def process_pool(self) -> t.Optional[Executor]:
+        if self._process_pool is None and self.use_processes:
+            try:
+                self._process_pool = ProcessPoolExecutor(self.max_workers)
+            except (OSError, NotImplementedError, ImportError) as exc:
+                logger.warning(f"Process pool unavailable, falling back to threads: {exc!r}")
+                self.use_processes = False
+
+        return self._process_pool
+
+    async def run(self, func: t.Callable, *args, **kwargs) -> t.Any:
+        """Run the function in the pool, and return the result."""
+        loop = asyncio.get_running_loop()
+        call = partial(_timed_call, time.time(), func, *args, **kwargs)
+
+        self.pending += 1
+        start = time.perf_counter()
+
+        try:
+            pool = self.process_pool
+
+            if pool is not None:
+                try:
+                    waited, result = await loop.run_in_executor(pool, call)
+                except (pickle.PicklingError, AttributeError, TypeError, BrokenProcessPool) as exc:
+                    # Unpicklable jobs (lambdas, bound methods on loop objects) and dead pools go to threads.
+                    if isinstance(exc, BrokenProcessPool):
+                        logger.error("CPU process pool broke, switching to the thread pool.")
+                        self.use_processes = False
+                        self._process_pool = None
+                    elif not isinstance(exc, pickle.PicklingError) and "pickle" not in str(exc):
+                        raise
+
+                    self.fallbacks += 1
+                    waited, result = await loop.run_in_executor(self.thread_pool, call)
+            else:
+                waited, result = await loop.run_in_executor(self.thread_pool, call)
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.pending -= 1
+
+        self.completed += 1
+        self.wait_times.append(max(waited, 0.0))
+        self.latencies.append(time.perf_counter() - start)
+
+        return result
+
+    def stats(self) -> t.Dict[str, t.Any]:
+        """Get the queue depth and latency stats of the pool."""
+        return {
+            "kind": "process" if self._process_pool is not None else "thread",
+            "pending": self.pending,
+            "completed": self.completed,
+            "failed": self.failed,
+            "fallbacks": self.fallbacks,
+            "wait_p50": percentile(self.wait_times, 50),
+            "wait_p95": percentile(self.wait_times, 95),
+            "latency_p50": percentile(self.latencies, 50),
+            "latency_p95": percentile(self.latencies, 95),
+        }
+
+    def shutdown(self) -> None:
+        """Shutdown the pools without waiting for the queued jobs."""
+        for pool in (self._process_pool, self._thread_pool):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+        self._process_pool = None
+        self._thread_pool = None
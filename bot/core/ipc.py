@@ -0,0 +1,123 @@
+import asyncio
+import itertools
+import json
+import typing as t
+
+from loguru import logger
+
+if t.TYPE_CHECKING:
+    from bot import Bot
+
+
+async def send_message(writer: asyncio.StreamWriter, message: dict) -> None:
+    """Write a message as a single JSON line."""
+    writer.write(json.dumps(message).encode() + b"\n")
+    await writer.drain()
+
+
+async def read_message(reader: asyncio.StreamReader) -> t.Optional[dict]:
+    """Read a single JSON line message, or `None` once the connection is closed."""
+    line = await reader.readline()
+    if not line:
+        return None
+
+    return json.loads(line)
+
+
+class IPCClient:
+    """
+    Connection of a cluster to the launcher's IPC server.
+
+    The cluster pushes its stats every `interval` seconds, can query the latest stats of
+    every cluster, and broadcast commands to all of them. Broadcasted commands are
+    dispatched on the bot as the `ipc_command` event.
+    """
+
+    def __init__(self, bot: "Bot", host: str, port: int, interval: float = 15) -> None:
+        self.bot = bot
+        self.host = host
+        self.port = port
+        self.interval = interval
+
+        self._writer: t.Optional[asyncio.StreamWriter] = None
+        self._responses: t.Dict[int, asyncio.Future] = {}
+        self._nonces = itertools.count()
+        self._tasks: t.List[asyncio.Task] = []
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def start(self) -> None:
+        reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        await send_message(self._writer, {"op": "identify", "cluster_id": self.bot.cluster})
+
+        self._tasks = [
+            asyncio.create_task(self._read_loop(reader)),
+            asyncio.create_task(self._stats_loop()),
+        ]
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+
+        if self._writer is not None:
+            self._writer.close()
+
+    async def _read_loop(self, reader: asyncio.StreamReader) -> None:
+        while True:
+            try:
+                message = await read_message(reader)
+            except OSError:
+                message = None
+
+            if message is None:
+                logger.warning("Lost the connection to the cluster launcher.")
+                self._writer = None
+
+                for future in self._responses.values():
+                    if not future.done():
+                        future.set_exception(ConnectionError("Lost the connection to the cluster launcher."))
+                return
+
+            if message["op"] == "response":
+                future = self._responses.pop(message["nonce"], None)
+                if future is not None and not future.done():
+                    future.set_result(message["data"])
+
+            elif message["op"] == "command":
+                self.bot.dispatch("ipc_command", message["command"], *message.get("args", ()))
+
+    async def _stats_loop(self) -> None:
+        await self.bot.wait_until_ready()
+
+        while self.connected:
+            try:
+                await send_message(self._writer, {"op": "stats", "data": self.bot.cluster_stats()})
+            except OSError as exc:
+                logger.warning(f"Couldn't send the cluster stats to the launcher, stopping: {exc!r}")
+                return
+
+            await asyncio.sleep(self.interval)
+
+    async def _send(self, message: dict) -> None:
+        if not self.connected:
+            raise ConnectionError("Not connected to the cluster launcher.")
+
+        await send_message(self._writer, message)
+
+    async def request(self, query: str, timeout: float = 5) -> dict:
+        """Query the launcher, and wait for the response. Raises `ConnectionError` when the launcher isn't reachable."""
+        nonce = next(self._nonces)
+        future = asyncio.get_running_loop().create_future()
+        self._responses[nonce] = future
+
+        try:
+            await self._send({"op": "request", "nonce": nonce, "query": query})
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._responses.pop(nonce, None)
+
+    async def broadcast(self, command: str, *args) -> None:
+        """Send a command to every cluster, including this one. Raises `ConnectionError` when the launcher isn't reachable."""
+        await self._send({"op": "broadcast", "command": command, "args": list(args)})
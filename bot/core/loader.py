@@ -1,40 +1,150 @@
+import ast
 import importlib
-import inspect
-import pkgutil
-import types
+import json
+import os
+import time
 import typing as t
 
-from bot import cogs, databases
+from loguru import logger
 
+from bot import config
 
-def get_module_name(name: str) -> str:
-    """Get the cog name from the module."""
-    return name.split(".")[-1]
+BOT_PATH = os.path.dirname(os.path.dirname(__file__))
 
+# Cogs loaded before connecting, so error handling, help and automod work from the first event.
+CORE_COGS = ("bot.cogs.core", "bot.cogs.automod")
+# Cogs that aren't needed for the first gateway events, loaded last.
+DEFERRED_COGS = ("bot.cogs.fun", "bot.cogs.games", "bot.cogs.nsfw")
 
-def is_a_cog(module: types.ModuleType) -> bool:
-    """Check if the module has a setup function, which implies it's a cog."""
-    imported = importlib.import_module(module.name)
-    return inspect.isfunction(getattr(imported, "setup", None))
 
+def has_setup(path: str) -> bool:
+    """Check if the source defines a top-level setup function, which implies it's a cog."""
+    with open(path, encoding="utf-8") as file:
+        tree = ast.parse(file.read(), path)
 
-def get_modules_list(
-    package: types.ModuleType, check: t.Optional[t.Callable] = None
-) -> t.List[str]:
-    """Get the list of the submodules from the specified package."""
-    modules = []
+    return any(isinstance(node, ast.FunctionDef) and node.name == "setup" for node in tree.body)
 
-    for submodule in pkgutil.walk_packages(package.__path__, f"{package.__name__}."):
-        if get_module_name(submodule.name).startswith("_"):
-            continue
 
-        if check and not check(submodule):
-            continue
+def iter_sources(package: str) -> t.Iterator[t.Tuple[str, str]]:
+    """Get the module names and source paths of a package's submodules, without importing them."""
+    root = os.path.join(BOT_PATH, *package.split(".")[1:])
 
-        modules.append(submodule.name)
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories[:] = sorted(
+            name for name in subdirectories
+            if not name.startswith("_") and os.path.isfile(os.path.join(directory, name, "__init__.py"))
+        )
 
-    return modules
+        relative = os.path.relpath(directory, root)
+        prefix = package if relative == "." else f"{package}.{relative.replace(os.sep, '.')}"
 
+        for name in sorted(files):
+            if not name.endswith(".py"):
+                continue
 
-COGS = get_modules_list(cogs, check=is_a_cog)
-DATABASES = get_modules_list(databases)
+            path = os.path.join(directory, name)
+            if name == "__init__.py":
+                if prefix != package:
+                    yield prefix, path
+            elif not name.startswith("_"):
+                yield f"{prefix}.{name[:-3]}", path
+
+
+class Manifest:
+    """
+    Cached list of the cogs and database tables, with the import time of each cog.
+
+    Discovery only parses the sources for a `setup` function instead of importing every
+    module. The result is saved to `path` along with the modification times of the
+    sources, and reused as long as none of them changed.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+        self.cogs: t.List[str] = []
+        self.databases: t.List[str] = []
+        self.timings: t.Dict[str, float] = {}
+        self.sources: t.Dict[str, float] = {}
+
+    def _scan_sources(self) -> t.Dict[str, float]:
+        return {
+            path: os.path.getmtime(path)
+            for package in ("bot.cogs", "bot.databases")
+            for _, path in iter_sources(package)
+        }
+
+    def load(self) -> "Manifest":
+        sources = self._scan_sources()
+
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                cached = json.load(file)
+        except (OSError, ValueError):
+            cached = None
+
+        if cached is not None and cached.get("sources") == sources:
+            self.cogs = cached["cogs"]
+            self.databases = cached["databases"]
+            self.timings = cached.get("timings", {})
+        else:
+            self.cogs = sorted(name for name, path in iter_sources("bot.cogs") if has_setup(path))
+            self.databases = sorted(name for name, _ in iter_sources("bot.databases"))
+
+        self.sources = sources
+        return self
+
+    def save(self) -> None:
+        data = {
+            "cogs": self.cogs,
+            "databases": self.databases,
+            "timings": self.timings,
+            "sources": self.sources,
+        }
+
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(f"{self.path}.tmp", "w", encoding="utf-8") as file:
+                json.dump(data, file, indent=2)
+
+            os.replace(f"{self.path}.tmp", self.path)
+        except OSError as exc:
+            logger.warning(f"Couldn't save the cog manifest: {exc!r}")
+
+    @property
+    def core_cogs(self) -> t.List[str]:
+        return [cog for cog in self.cogs if cog in CORE_COGS]
+
+    @property
+    def background_cogs(self) -> t.List[str]:
+        return [cog for cog in self.cogs if cog not in CORE_COGS and cog not in DEFERRED_COGS]
+
+    @property
+    def deferred_cogs(self) -> t.List[str]:
+        return [cog for cog in self.cogs if cog in DEFERRED_COGS]
+
+
+MANIFEST = Manifest(config.cog_manifest).load()
+
+COGS = MANIFEST.cogs
+DATABASES = MANIFEST.databases
+
+
+def benchmark() -> None:
+    """Import every cog in a row, printing the import time of each one."""
+    start = time.perf_counter()
+
+    for table in DATABASES:
+        importlib.import_module(table)
+    print(f"{'databases':<28} {(time.perf_counter() - start) * 1000:8.1f}ms")
+
+    for cog in COGS:
+        cog_start = time.perf_counter()
+        importlib.import_module(cog)
+        print(f"{cog:<28} {(time.perf_counter() - cog_start) * 1000:8.1f}ms")
+
+    print(f"{'total':<28} {(time.perf_counter() - start) * 1000:8.1f}ms")
+
+
+if __name__ == "__main__":
+    benchmark()
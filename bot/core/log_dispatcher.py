@@ -0,0 +1,159 @@
+import asyncio
+import collections
+import typing as t
+
+import discord
+from discord.http import Route
+from loguru import logger
+
+if t.TYPE_CHECKING:
+    from bot import Bot
+
+# Discord's limits for the embeds of a single message.
+MAX_EMBEDS = 10
+MAX_EMBED_CHARACTERS = 6000
+
+
+class LogDispatcher:
+    """
+    Buffered delivery of embeds to the log channels.
+
+    Embeds are queued per channel and packed into as few messages as possible, up to 10
+    embeds each. A channel's queue is flushed once it has a full message worth of embeds,
+    or `flush_interval` seconds after the first embed was queued. When a channel falls
+    too far behind, new embeds are dropped and counted instead of piling up.
+    """
+
+    def __init__(self, bot: "Bot", flush_interval: float = 2.0, max_queue: int = 500) -> None:
+        self.bot = bot
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+
+        self._queues: t.Dict[int, t.Deque[discord.Embed]] = {}
+        self._full: t.Dict[int, asyncio.Event] = {}
+        self._flushers: t.Dict[int, asyncio.Task] = {}
+        self._closed = False
+
+        # Stats
+        self.sent_messages = 0
+        self.sent_embeds = 0
+        self.dropped: t.Counter[int] = collections.Counter()
+
+    def send(self, channel: discord.abc.Snowflake, embed: discord.Embed) -> bool:
+        """Queue an embed for the channel, and return whether it was accepted."""
+        if self._closed:
+            return False
+
+        queue = self._queues.setdefault(channel.id, collections.deque())
+
+        if len(queue) >= self.max_queue:
+            self.dropped[channel.id] += 1
+            return False
+
+        queue.append(embed)
+
+        if len(queue) >= MAX_EMBEDS and channel.id in self._full:
+            self._full[channel.id].set()
+
+        if channel.id not in self._flushers:
+            self._full[channel.id] = asyncio.Event()
+            self._flushers[channel.id] = asyncio.create_task(self._flusher(channel.id))
+
+        return True
+
+    @staticmethod
+    def _take_batch(queue: t.Deque[discord.Embed]) -> t.List[discord.Embed]:
+        """Take as many embeds as fit in one message."""
+        batch = []
+        characters = 0
+
+        while queue and len(batch) < MAX_EMBEDS:
+            size = len(queue[0])
+            if batch and characters + size > MAX_EMBED_CHARACTERS:
+                break
+
+            batch.append(queue.popleft())
+            characters += size
+
+        return batch
+
+    async def _flusher(self, channel_id: int) -> None:
+        try:
+            try:
+                await asyncio.wait_for(self._full[channel_id].wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+
+            await self._flush(channel_id)
+        finally:
+            self._flushers.pop(channel_id, None)
+            self._full.pop(channel_id, None)
+
+            # Embeds queued while the last message was being sent get a new flusher.
+            if self._queues.get(channel_id) and not self._closed:
+                self._full[channel_id] = asyncio.Event()
+                self._flushers[channel_id] = asyncio.create_task(self._flusher(channel_id))
+
+    async def _flush(self, channel_id: int) -> None:
+        queue = self._queues.get(channel_id)
+        route = Route("POST", "/channels/{channel_id}/messages", channel_id=channel_id)
+
+        while queue:
+            batch = self._take_batch(queue)
+
+            try:
+                # `Messageable.send` only takes a single embed, so the request is made directly.
+                await self.bot.http.request(route, json={"embeds": [embed.to_dict() for embed in batch]})
+            except (discord.Forbidden, discord.NotFound):
+                # The channel is gone or we lost access, so the rest would fail too.
+                self.dropped[channel_id] += len(batch) + len(queue)
+                queue.clear()
+                break
+            except discord.HTTPException as exc:
+                self.dropped[channel_id] += len(batch)
+                logger.warning(f"Couldn't deliver {len(batch)} log embeds to {channel_id}: {exc!r}")
+            else:
+                self.sent_messages += 1
+                self.sent_embeds += len(batch)
+
+        if not queue:
+            self._queues.pop(channel_id, None)
+
+    @property
+    def queued(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def stats(self) -> t.Dict[str, t.Any]:
+        return {
+            "queued": self.queued,
+            "channels": len(self._queues),
+            "sent_messages": self.sent_messages,
+            "sent_embeds": self.sent_embeds,
+            "dropped": sum(self.dropped.values()),
+        }
+
+    async def close(self, timeout: float = 10) -> None:
+        """
+        Deliver everything still queued, waiting up to `timeout` seconds.
+
+        The flushers are woken up to send right away rather than cancelled, so a message
+        already being sent isn't lost halfway.
+        """
+        self._closed = True
+
+        for event in self._full.values():
+            event.set()
+
+        tasks = list(self._flushers.values())
+        # Channels without a flusher, when one finished while the last message was being sent.
+        tasks += [asyncio.create_task(self._flush(channel_id)) for channel_id in self._queues if channel_id not in self._flushers]
+
+        if not tasks:
+            return
+
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+
+        if pending:
+            logger.warning(f"Gave up on delivering {self.queued} log embeds to {len(pending)} channels on close.")
+            for task in pending:
+                task.cancel()
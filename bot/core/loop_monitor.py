@@ -0,0 +1,144 @@
+import asyncio
+import collections
+import os
+import sys
+import threading
+import time
+import traceback
+import types
+import typing as t
+
+from loguru import logger
+
+from bot.core.telemetry import Histogram
+from bot.utils.utils import percentile
+
+if t.TYPE_CHECKING:
+    from bot import Bot
+
+# Upper bounds of the loop lag histogram buckets, in seconds.
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, float("inf"))
+
+COGS_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "cogs")
+
+
+class LoopMonitor:
+    """
+    Event loop lag and slow callback detection.
+
+    A task sleeps for `interval` seconds at a time, recording how late it wakes up as the
+    loop lag. A watchdog thread checks that the task keeps ticking: when the loop is
+    stuck for over `threshold` seconds, it grabs the stack of the loop's thread while the
+    slow callback is still running, logs it, and counts the stall against the cog it's in.
+    """
+
+    def __init__(self, bot: "Bot", interval: float = 0.25, threshold: float = 0.5, history: int = 1200) -> None:
+        self.bot = bot
+        self.interval = interval
+        self.threshold = threshold
+
+        self.lag = Histogram(LAG_BUCKETS)
+        self.recent: t.Deque[float] = collections.deque(maxlen=history)
+        self.stalls: t.Counter[str] = collections.Counter()
+
+        self._tick = time.monotonic()
+        self._reported_tick = 0.0
+        self._loop: t.Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: t.Optional[int] = None
+        self._task: t.Optional[asyncio.Task] = None
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._tick = time.monotonic()
+        self._stopped.clear()
+
+        self._task = asyncio.create_task(self._monitor())
+        threading.Thread(target=self._watchdog, name="loop-watchdog", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _monitor(self) -> None:
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+
+            self._tick = time.monotonic()
+            lag = max(0.0, self._tick - start - self.interval)
+
+            self.lag.observe(lag)
+            self.recent.append(lag)
+
+    # -- Watchdog thread --
+    def _watchdog(self) -> None:
+        while not self._stopped.wait(self.threshold / 2):
+            tick = self._tick
+            stalled = time.monotonic() - tick - self.interval
+
+            # Only report a stall once, until the loop ticks again.
+            if stalled < self.threshold or tick == self._reported_tick:
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+
+            self._reported_tick = tick
+            location = self.blame(frame)
+
+            # Counted on the loop, as it's read there while exporting the metrics.
+            try:
+                self._loop.call_soon_threadsafe(self._count_stall, location)
+            except RuntimeError:
+                # The loop is closed.
+                return
+
+            stack = "".join(traceback.format_stack(frame))
+            logger.warning(f"Event loop blocked for over {stalled:.2f}s in {location}:\n{stack}")
+
+    def _count_stall(self, location: str) -> None:
+        self.stalls[location] += 1
+
+    @staticmethod
+    def blame(frame: types.FrameType) -> str:
+        """Get the innermost cog function of a stack, or the innermost function if there's none."""
+        innermost = None
+
+        while frame is not None:
+            location = f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}"
+            if innermost is None:
+                innermost = location
+
+            if frame.f_code.co_filename.startswith(COGS_PATH):
+                return location
+
+            frame = frame.f_back
+
+        return innermost or "?"
+
+    # -- Reading --
+    def stats(self) -> t.Dict[str, float]:
+        return {
+            "p50": percentile(self.recent, 50),
+            "p95": percentile(self.recent, 95),
+            "max": max(self.recent, default=0.0),
+            "stalls": sum(self.stalls.values()),
+        }
+
+    def metrics(self, prefix: str = "overflow") -> t.Iterator[str]:
+        """Export the loop lag and stalls as Prometheus text samples."""
+        yield f"# TYPE {prefix}_loop_lag_seconds histogram"
+        yield from self.lag.export(f"{prefix}_loop_lag_seconds")
+
+        yield f"# TYPE {prefix}_loop_stalls_total counter"
+        for location, count in sorted(self.stalls.items()):
+            yield f'{prefix}_loop_stalls_total{{location="{location}"}} {count}'
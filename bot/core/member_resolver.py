@@ -0,0 +1,157 @@
+import asyncio
+import collections
+import time
+import typing as t
+
+import discord
+
+if t.TYPE_CHECKING:
+    from bot import Bot
+
+# Maximum user IDs of a single `query_members` request.
+MAX_QUERY = 100
+
+
+class MemberResolver:
+    """
+    Batched member lookups across concurrent callers.
+
+    Members missing from the cache are collected per guild for `window` seconds (or until
+    100 are pending) and resolved with a single `query_members` request. Users that
+    couldn't be found are kept in a negative cache for `negative_ttl` seconds, so the
+    lookups for members who left don't hit the gateway again.
+    """
+
+    def __init__(
+        self, bot: "Bot", window: float = 0.05, negative_ttl: float = 300, max_negative: int = 10000
+    ) -> None:
+        self.bot = bot
+        self.window = window
+        self.negative_ttl = negative_ttl
+        self.max_negative = max_negative
+
+        self._pending: t.Dict[int, t.Dict[int, asyncio.Future]] = {}
+        self._flushers: t.Dict[int, asyncio.TimerHandle] = {}
+        self._negative: t.OrderedDict[t.Tuple[int, int], float] = collections.OrderedDict()
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.requests = 0
+
+    def forget(self, guild_id: int, user_id: int) -> None:
+        """Drop a negative cache entry, for when the user joins the guild."""
+        self._negative.pop((guild_id, user_id), None)
+
+    def _is_negative(self, guild_id: int, user_id: int) -> bool:
+        expiry = self._negative.get((guild_id, user_id))
+        if expiry is None:
+            return False
+
+        if expiry < time.monotonic():
+            del self._negative[(guild_id, user_id)]
+            return False
+
+        return True
+
+    def _set_negative(self, guild_id: int, user_id: int) -> None:
+        self._negative[(guild_id, user_id)] = time.monotonic() + self.negative_ttl
+        self._negative.move_to_end((guild_id, user_id))
+
+        while len(self._negative) > self.max_negative:
+            self._negative.popitem(last=False)
+
+    async def resolve(self, guild: discord.Guild, user_id: int) -> t.Optional[discord.Member]:
+        """Get a member from the cache, or through the next batched request."""
+        member = guild.get_member(user_id)
+        if member is not None:
+            self.hits += 1
+            return member
+
+        if self._is_negative(guild.id, user_id):
+            self.negative_hits += 1
+            return None
+
+        self.misses += 1
+        pending = self._pending.setdefault(guild.id, {})
+
+        future = pending.get(user_id)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            pending[user_id] = future
+
+            if len(pending) >= MAX_QUERY:
+                self._schedule(guild, 0)
+            elif guild.id not in self._flushers:
+                self._schedule(guild, self.window)
+
+        return await asyncio.shield(future)
+
+    async def resolve_many(
+        self, guild: discord.Guild, user_ids: t.Iterable[int]
+    ) -> t.AsyncIterator[discord.Member]:
+        """Resolve many members at once, yielding the ones that were found."""
+        tasks = [asyncio.ensure_future(self.resolve(guild, user_id)) for user_id in user_ids]
+
+        for task in asyncio.as_completed(tasks):
+            member = await task
+            if member is not None:
+                yield member
+
+    def _schedule(self, guild: discord.Guild, delay: float) -> None:
+        handle = self._flushers.pop(guild.id, None)
+        if handle is not None:
+            handle.cancel()
+
+        loop = asyncio.get_running_loop()
+        self._flushers[guild.id] = loop.call_later(delay, lambda: asyncio.ensure_future(self._flush(guild)))
+
+    async def _flush(self, guild: discord.Guild) -> None:
+        self._flushers.pop(guild.id, None)
+        pending = self._pending.pop(guild.id, {})
+
+        user_ids = list(pending)
+        resolved: t.Dict[int, discord.Member] = {}
+
+        try:
+            for index in range(0, len(user_ids), MAX_QUERY):
+                resolved.update(await self._query(guild, user_ids[index: index + MAX_QUERY]))
+        except Exception as exc:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for user_id, future in pending.items():
+            member = resolved.get(user_id)
+            if member is None:
+                self._set_negative(guild.id, user_id)
+
+            if not future.done():
+                future.set_result(member)
+
+    async def _query(self, guild: discord.Guild, user_ids: t.List[int]) -> t.Dict[int, discord.Member]:
+        self.requests += 1
+        shard = self.bot.get_shard(guild.shard_id)
+
+        # The gateway is rate limited, a single member can still be fetched over HTTP.
+        if len(user_ids) == 1 and shard is not None and shard.is_ws_ratelimited():
+            try:
+                member = await guild.fetch_member(user_ids[0])
+            except discord.HTTPException:
+                return {}
+
+            return {member.id: member}
+
+        members = await guild.query_members(limit=MAX_QUERY, user_ids=user_ids, cache=True)
+        return {member.id: member for member in members}
+
+    def stats(self) -> t.Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "negative_hits": self.negative_hits,
+            "requests": self.requests,
+            "pending": sum(len(pending) for pending in self._pending.values()),
+        }
@@ -0,0 +1,103 @@
+import asyncio
+import collections
+import cProfile
+import io
+import pstats
+import typing as t
+
+from bot.utils.utils import percentile
+
+
+class Timings:
+    """Recent durations of a listener or command, with its call count and total time."""
+
+    __slots__ = ("recent", "calls", "total", "errors")
+
+    def __init__(self, history: int) -> None:
+        self.recent: t.Deque[float] = collections.deque(maxlen=history)
+        self.calls = 0
+        self.total = 0.0
+        self.errors = 0
+
+    def record(self, duration: float, failed: bool = False) -> None:
+        self.recent.append(duration)
+        self.calls += 1
+        self.total += duration
+        self.errors += failed
+
+    def summary(self) -> t.Dict[str, float]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "total": self.total,
+            "p50": percentile(self.recent, 50),
+            "p95": percentile(self.recent, 95),
+            "max": max(self.recent, default=0.0),
+        }
+
+
+class Profiler:
+    """
+    Latency of every event listener and command.
+
+    `Bot._run_event` and `Bot.invoke` report the wall time of each listener and command
+    here, which only costs a deque append per call. Percentiles are computed over the
+    last `history` calls when read. For a closer look, `capture` runs cProfile over the
+    event loop for a given window.
+    """
+
+    def __init__(self, history: int = 256) -> None:
+        self.history = history
+
+        self.listeners: t.Dict[str, Timings] = {}
+        self.commands: t.Dict[str, Timings] = {}
+
+        self._capture_lock = asyncio.Lock()
+
+    def _record(self, timings: t.Dict[str, Timings], name: str, duration: float, failed: bool) -> None:
+        entry = timings.get(name)
+        if entry is None:
+            entry = timings[name] = Timings(self.history)
+
+        entry.record(duration, failed)
+
+    def record_listener(self, name: str, duration: float, failed: bool = False) -> None:
+        self._record(self.listeners, name, duration, failed)
+
+    def record_command(self, name: str, duration: float, failed: bool = False) -> None:
+        self._record(self.commands, name, duration, failed)
+
+    @staticmethod
+    def _top(timings: t.Dict[str, Timings], limit: int, key: str) -> t.List[t.Tuple[str, t.Dict[str, float]]]:
+        summaries = [(name, entry.summary()) for name, entry in timings.items()]
+        return sorted(summaries, key=lambda item: item[1][key], reverse=True)[:limit]
+
+    def top_listeners(self, limit: int = 10, key: str = "p95") -> t.List[t.Tuple[str, t.Dict[str, float]]]:
+        return self._top(self.listeners, limit, key)
+
+    def top_commands(self, limit: int = 10, key: str = "p95") -> t.List[t.Tuple[str, t.Dict[str, float]]]:
+        return self._top(self.commands, limit, key)
+
+    def reset(self) -> None:
+        self.listeners.clear()
+        self.commands.clear()
+
+    @property
+    def capturing(self) -> bool:
+        return self._capture_lock.locked()
+
+    async def capture(self, seconds: float, limit: int = 40, sort: str = "cumulative") -> str:
+        """Profile everything running on the event loop for a window, and get the report."""
+        async with self._capture_lock:
+            profile = cProfile.Profile()
+            profile.enable()
+
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                profile.disable()
+
+        output = io.StringIO()
+        pstats.Stats(profile, stream=output).sort_stats(sort).print_stats(limit)
+
+        return output.getvalue()
@@ -0,0 +1,119 @@
+import collections
+import typing as t
+
+import discord
+
+if t.TYPE_CHECKING:
+    from bot import Bot
+
+KEYS = ("guilds", "members", "loaded_members", "voice", "music", "messages")
+
+
+class ShardStats:
+    """
+    Per-shard counters of the guilds, members, voice sessions and messages.
+
+    The counters of a shard are computed once from its guilds when it becomes ready, then
+    maintained incrementally from the gateway events, so reading them costs O(shards)
+    instead of a scan over every guild and member.
+    """
+
+    def __init__(self, bot: "Bot") -> None:
+        self.bot = bot
+        self.shards: t.Dict[int, t.Counter[str]] = collections.defaultdict(collections.Counter)
+
+        for event in (
+            "on_shard_ready",
+            "on_guild_join",
+            "on_guild_remove",
+            "on_member_join",
+            "on_member_remove",
+            "on_voice_state_update",
+            "on_message",
+        ):
+            bot.add_listener(getattr(self, event), event)
+
+    # -- Counting --
+    def _guild_counts(self, guild: discord.Guild) -> t.Counter[str]:
+        counts = collections.Counter()
+        counts["guilds"] = 1
+        counts["members"] = guild.member_count or 0
+        counts["loaded_members"] = len(guild.members)
+
+        for channel in guild.voice_channels:
+            counts["voice"] += len(channel.voice_states)
+
+            if guild.me is not None and guild.me.id in channel.voice_states:
+                counts["music"] += 1
+
+        return counts
+
+    def rebuild(self, shard_id: int) -> None:
+        """Recompute the counters of a shard from its guilds."""
+        counts = collections.Counter()
+        for guild in self.bot.guilds:
+            if guild.shard_id == shard_id:
+                counts.update(self._guild_counts(guild))
+
+        # Messages are only ever counted from the events, so they're kept.
+        counts["messages"] = self.shards[shard_id]["messages"]
+        self.shards[shard_id] = counts
+
+    # -- Events --
+    async def on_shard_ready(self, shard_id: int) -> None:
+        self.rebuild(shard_id)
+
+    async def on_guild_join(self, guild: discord.Guild) -> None:
+        self.shards[guild.shard_id].update(self._guild_counts(guild))
+
+    async def on_guild_remove(self, guild: discord.Guild) -> None:
+        self.shards[guild.shard_id].subtract(self._guild_counts(guild))
+
+    async def on_member_join(self, member: discord.Member) -> None:
+        counts = self.shards[member.guild.shard_id]
+        counts["members"] += 1
+        counts["loaded_members"] += 1
+
+    async def on_member_remove(self, member: discord.Member) -> None:
+        counts = self.shards[member.guild.shard_id]
+        counts["members"] -= 1
+        counts["loaded_members"] -= 1
+
+    async def on_voice_state_update(
+        self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState
+    ) -> None:
+        if (before.channel is None) == (after.channel is None):
+            return
+
+        change = 1 if after.channel is not None else -1
+        counts = self.shards[member.guild.shard_id]
+        counts["voice"] += change
+
+        if member.id == self.bot.user.id:
+            counts["music"] += change
+
+    async def on_message(self, message: discord.Message) -> None:
+        shard_id = message.guild.shard_id if message.guild is not None else 0
+        self.shards[shard_id]["messages"] += 1
+
+    # -- Reading --
+    def get(self, shard_id: int) -> t.Dict[str, int]:
+        counts = self.shards.get(shard_id, {})
+        return {key: counts.get(key, 0) for key in KEYS}
+
+    def totals(self) -> t.Dict[str, int]:
+        totals = collections.Counter()
+        for counts in self.shards.values():
+            totals.update(counts)
+
+        return {key: totals.get(key, 0) for key in KEYS}
+
+    def metrics(self, prefix: str = "overflow") -> t.Iterator[str]:
+        """Export the counters as Prometheus text samples."""
+        for key in KEYS:
+            kind = "counter" if key == "messages" else "gauge"
+            name = f"{prefix}_shard_{key}" + ("_total" if kind == "counter" else "")
+
+            yield f"# TYPE {name} {kind}"
+            for shard_id in sorted(self.shards):
+                yield f'{name}{{shard="{shard_id}"}} {self.shards[shard_id].get(key, 0)}'
@@ -0,0 +1,197 @@
+import bisect
+import collections
+import time
+import typing as t
+
+from aiohttp import web
+from loguru import logger
+
+if t.TYPE_CHECKING:
+    from bot import Bot
+
+# Upper bounds of the dispatch latency histogram buckets, in seconds.
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, float("inf"))
+
+
+class RateWindow:
+    """Ring buffer of per-second counts over the last `size` seconds."""
+
+    __slots__ = ("size", "buckets", "last")
+
+    def __init__(self, size: int = 300) -> None:
+        self.size = size
+        self.buckets = [0] * size
+        self.last = int(time.monotonic())
+
+    def _advance(self, now: int) -> None:
+        elapsed = now - self.last
+        if elapsed <= 0:
+            return
+
+        # Clear the buckets of the seconds that passed without any counts.
+        for offset in range(1, min(elapsed, self.size) + 1):
+            self.buckets[(self.last + offset) % self.size] = 0
+
+        self.last = now
+
+    def add(self, count: int = 1) -> None:
+        now = int(time.monotonic())
+        self._advance(now)
+        self.buckets[now % self.size] += count
+
+    def rate(self, window: int = 60) -> float:
+        """Average count per second over the last `window` seconds."""
+        window = min(window, self.size)
+        now = int(time.monotonic())
+        self._advance(now)
+
+        return sum(self.buckets[(now - offset) % self.size] for offset in range(window)) / window
+
+
+class Histogram:
+    """Fixed bucket latency histogram."""
+
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: t.Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile as the upper bound of the bucket it falls in."""
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound if bound != float("inf") else self.buckets[-2]
+
+        return self.buckets[-2]
+
+    def export(self, name: str, labels: str = "") -> t.Iterator[str]:
+        """Render the histogram as Prometheus text samples, `labels` being extra `key="value"` pairs."""
+        prefix = f"{labels}," if labels else ""
+        suffix = f"{{{labels}}}" if labels else ""
+
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else bound
+            yield f'{name}_bucket{{{prefix}le="{le}"}} {cumulative}'
+
+        yield f"{name}_sum{suffix} {self.total:.6f}"
+        yield f"{name}_count{suffix} {self.count}"
+
+
+class Telemetry:
+    """
+    Gateway event throughput and dispatch latency.
+
+    The parsers of the connection state are wrapped, so every gateway dispatch is counted
+    per event type and per shard into fixed-size ring buffers, and the time spent parsing
+    it into the cache and dispatching its events is recorded into a histogram per event
+    type. Everything can be exported in the Prometheus text format, optionally over HTTP.
+    """
+
+    def __init__(self, bot: "Bot", window: int = 300) -> None:
+        self.bot = bot
+        self.window = window
+
+        self.totals: t.Counter[str] = collections.Counter()
+        self.events: t.Dict[str, RateWindow] = {}
+        self.shards: t.Dict[int, RateWindow] = {}
+        self.latency: t.Dict[str, Histogram] = {}
+        self.all = RateWindow(window)
+
+        self._runner: t.Optional[web.AppRunner] = None
+
+        parsers = bot._connection.parsers
+        for event, parser in parsers.items():
+            parsers[event] = self._wrap(event, parser)
+
+    def _wrap(self, event: str, parser: t.Callable[[dict], None]) -> t.Callable[[dict], None]:
+        events = self.events[event] = RateWindow(self.window)
+        histogram = self.latency[event] = Histogram()
+
+        def timed_parser(data: dict) -> None:
+            start = time.perf_counter()
+            try:
+                parser(data)
+            finally:
+                histogram.observe(time.perf_counter() - start)
+
+                self.totals[event] += 1
+                events.add()
+                self.all.add()
+                self._shard_window(data).add()
+
+        return timed_parser
+
+    def _shard_window(self, data: t.Any) -> RateWindow:
+        guild_id = data.get("guild_id") if isinstance(data, dict) else None
+        shard_id = (int(guild_id) >> 22) % (self.bot.shard_count or 1) if guild_id else -1
+
+        window = self.shards.get(shard_id)
+        if window is None:
+            window = self.shards[shard_id] = RateWindow(self.window)
+
+        return window
+
+    # -- Reading --
+    def top_events(self, limit: int = 10, window: int = 60) -> t.List[t.Tuple[str, float]]:
+        rates = [(event, rates.rate(window)) for event, rates in self.events.items()]
+        return sorted(rates, key=lambda item: item[1], reverse=True)[:limit]
+
+    def shard_rates(self, window: int = 60) -> t.Dict[int, float]:
+        return {shard_id: rates.rate(window) for shard_id, rates in sorted(self.shards.items())}
+
+    def export(self, prefix: str = "overflow") -> str:
+        """Render the metrics in the Prometheus text format."""
+        lines = [f"# TYPE {prefix}_gateway_events_total counter"]
+        for event, total in sorted(self.totals.items()):
+            lines.append(f'{prefix}_gateway_events_total{{event="{event}"}} {total}')
+
+        lines.append(f"# TYPE {prefix}_gateway_events_per_second gauge")
+        for shard_id, rate in self.shard_rates().items():
+            lines.append(f'{prefix}_gateway_events_per_second{{shard="{shard_id}"}} {rate:.3f}')
+
+        name = f"{prefix}_gateway_dispatch_seconds"
+        lines.append(f"# TYPE {name} histogram")
+        for event, histogram in sorted(self.latency.items()):
+            if histogram.count:
+                lines.extend(histogram.export(name, f'event="{event}"'))
+
+        lines.extend(self.bot.shard_stats.metrics(prefix))
+        lines.extend(self.bot.loop_monitor.metrics(prefix))
+        lines.extend(self.bot.autoroles.metrics(prefix))
+
+        return "\n".join(lines) + "\n"
+
+    # -- HTTP endpoint --
+    async def _handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(text=self.export(), content_type="text/plain")
+
+    async def serve(self, host: str, port: int) -> None:
+        """Serve the metrics on `/metrics` for Prometheus to scrape."""
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle_metrics)
+
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+
+        logger.info(f"Serving metrics on {host}:{port}.")
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
@@ -1,10 +1,12 @@
+import os
 import typing as t
 from importlib import import_module
 
 import discord
 import sqlalchemy as alchemy
 from sqlalchemy.dialects import postgresql
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
 from sqlalchemy.ext.declarative import DeclarativeMeta, declarative_base, declared_attr
 from sqlalchemy.sql.base import ImmutableColumnCollection
 
@@ -64,6 +66,40 @@ def bring_databases_into_scope() -> t.List:
     return loaded_tables
 
 
+# -- Schema version --
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "alembic.ini")
+
+
+def _alembic_config() -> t.Any:
+    from alembic.config import Config
+
+    alembic_config = Config(ALEMBIC_INI)
+    alembic_config.set_main_option("script_location", os.path.join(os.path.dirname(ALEMBIC_INI), "alembic"))
+    return alembic_config
+
+
+def get_schema_head() -> str:
+    """Get the latest migration revision, from the migration scripts."""
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory.from_config(_alembic_config()).get_current_head()
+
+
+async def get_schema_version(conn: AsyncConnection) -> t.Optional[str]:
+    """Get the migration revision the database is at, or `None` if it was never migrated."""
+    try:
+        return await conn.scalar(alchemy.text("SELECT version_num FROM alembic_version"))
+    except ProgrammingError:
+        return None
+
+
+def upgrade_schema() -> None:
+    """Apply the pending migrations. This blocks, and runs its own event loop."""
+    from alembic import command
+
+    command.upgrade(_alembic_config(), "head")
+
+
 # Utility methods
 def get_datatype_int(
     datatype: t.Union[
@@ -0,0 +1,53 @@
+import typing as t
+
+import discord
+from sqlalchemy import BigInteger, Boolean, Column, select
+from sqlalchemy.exc import NoResultFound
+from sqlalchemy.orm import sessionmaker
+
+from bot.databases import DatabaseBase, get_datatype_int, on_conflict
+
+
+class AntiSpam(DatabaseBase):
+    """Whether the spam and flood detection is enabled for a guild."""
+
+    __tablename__ = "anti_spam"
+
+    guild_id = Column(BigInteger, primary_key=True, nullable=False, unique=True)
+
+    enabled = Column(Boolean, nullable=False, default=False)
+
+    @classmethod
+    async def get_config(
+        cls, session: sessionmaker, guild_id: t.Union[str, int, discord.Guild]
+    ) -> t.Optional[dict]:
+        guild_id = get_datatype_int(guild_id)
+
+        async with session() as session:
+            try:
+                row = (
+                    await session.execute(select(cls).filter_by(guild_id=guild_id))
+                ).scalar_one()
+            except NoResultFound:
+                return None
+
+            if row is not None:
+                return row.dict()
+
+    @classmethod
+    async def set_enabled(
+        cls,
+        session: sessionmaker,
+        guild_id: t.Union[str, int, discord.Guild],
+        enabled: bool,
+    ) -> None:
+        guild_id = get_datatype_int(guild_id)
+
+        async with session() as session:
+            await on_conflict(
+                session,
+                cls,
+                conflict_columns=["guild_id"],
+                values={"guild_id": guild_id, "enabled": enabled},
+            )
+            await session.commit()
@@ -1,6 +1,6 @@
 import typing as t
 
-from sqlalchemy import BigInteger, Column, String, select
+from sqlalchemy import BigInteger, Column, Index, String, select
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.orm import sessionmaker
 
@@ -13,11 +13,16 @@ class CommandStats(DatabaseBase):
     command = Column(String, primary_key=True, nullable=False, unique=True)
     usage_count = Column(BigInteger, nullable=False, default=0)
 
+    __table_args__ = (Index("ix_command_stats_usage_count", usage_count.desc()),)
+
     @classmethod
-    async def get_stats(cls, session: sessionmaker) -> t.List:
+    async def get_stats(cls, session: sessionmaker, limit: t.Optional[int] = None) -> t.List:
+        """Get the stats of the most used commands first."""
+        stmt = select(cls).order_by(cls.usage_count.desc()).limit(limit)
+
         async with session() as session:
             try:
-                rows = (await session.execute(select(cls))).scalars().all()
+                rows = (await session.execute(stmt)).scalars().all()
             except NoResultFound:
                 return []
 
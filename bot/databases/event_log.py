@@ -0,0 +1,85 @@
+import typing as t
+from datetime import datetime
+
+import discord
+from sqlalchemy import BigInteger, Column, DateTime, Index, String, delete, insert, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import sessionmaker
+
+from bot.databases import DatabaseBase, get_datatype_int
+
+
+class EventLog(DatabaseBase):
+    """
+    Append-only history of the events seen by the logging cogs.
+
+    Rows are only ever inserted in batches and deleted by age. Queries always filter on the
+    guild and a time range, which the composite indexes cover, while the BRIN index keeps
+    retention deletes on the insertion-ordered `created_at` cheap.
+    """
+
+    __tablename__ = "event_log"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+
+    guild_id = Column(BigInteger, nullable=False)
+    user_id = Column(BigInteger, nullable=False)
+    event_type = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    data = Column(JSONB, nullable=False, default={})
+
+    __table_args__ = (
+        Index("ix_event_log_guild_user_time", "guild_id", "user_id", "created_at"),
+        Index("ix_event_log_guild_type_time", "guild_id", "event_type", "created_at"),
+        Index("ix_event_log_created_at_brin", "created_at", postgresql_using="brin"),
+    )
+
+    @classmethod
+    async def insert_many(cls, session: sessionmaker, rows: t.List[dict]) -> None:
+        if not rows:
+            return
+
+        async with session() as session:
+            await session.execute(insert(cls), rows)
+            await session.commit()
+
+    @classmethod
+    async def query(
+        cls,
+        session: sessionmaker,
+        guild_id: t.Union[str, int, discord.Guild],
+        user_id: t.Optional[t.Union[str, int, discord.User]] = None,
+        event_type: t.Optional[str] = None,
+        since: t.Optional[datetime] = None,
+        until: t.Optional[datetime] = None,
+        limit: int = 50,
+    ) -> t.List[dict]:
+        stmt = select(cls).filter_by(guild_id=get_datatype_int(guild_id))
+
+        if user_id is not None:
+            stmt = stmt.filter_by(user_id=get_datatype_int(user_id))
+
+        if event_type is not None:
+            stmt = stmt.filter_by(event_type=event_type)
+
+        if since is not None:
+            stmt = stmt.where(cls.created_at >= since)
+
+        if until is not None:
+            stmt = stmt.where(cls.created_at < until)
+
+        stmt = stmt.order_by(cls.created_at.desc()).limit(limit)
+
+        async with session() as session:
+            rows = (await session.execute(stmt)).scalars().all()
+
+            return [row.dict() for row in rows]
+
+    @classmethod
+    async def prune(cls, session: sessionmaker, before: datetime) -> int:
+        async with session() as session:
+            result = await session.execute(delete(cls).where(cls.created_at < before))
+            await session.commit()
+
+            return result.rowcount
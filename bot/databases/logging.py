@@ -1,7 +1,7 @@
 import typing as t
 
 import discord
-from sqlalchemy import BigInteger, Column, select
+from sqlalchemy import BigInteger, Column, Index, select
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.orm import sessionmaker
 
@@ -20,6 +20,10 @@ class Logging(DatabaseBase):
     join_log = Column(BigInteger)
     voice_log = Column(BigInteger)
 
+    __table_args__ = (
+        Index("ix_logging_member_log", "guild_id", "member_log", postgresql_where=member_log.isnot(None)),
+    )
+
     @classmethod
     async def get_config(
         cls, session: sessionmaker, guild_id: t.Union[str, int, discord.Guild]
@@ -37,6 +41,18 @@ class Logging(DatabaseBase):
             if row is not None:
                 return row.dict()
 
+    @classmethod
+    async def get_log_channels(cls, session: sessionmaker, log_type: str) -> t.Dict[int, int]:
+        """Get the configured channel of a log type for every guild, mapped by the guild ID."""
+        column = getattr(cls, log_type)
+
+        async with session() as session:
+            rows = (
+                await session.execute(select(cls.guild_id, column).where(column.isnot(None)))
+            ).all()
+
+        return {guild_id: channel_id for guild_id, channel_id in rows}
+
     @classmethod
     async def set_log_channel(
         cls,
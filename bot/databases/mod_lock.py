@@ -19,6 +19,9 @@ class ModLock(DatabaseBase):
     `0` - Lock disabled
     `1` - Kick lock enabled
     `2` - Ban lock enabled
+
+    `raid_action` is the lock enabled automatically when a raid is detected, with the same codes,
+    `0` disabling the raid detection.
     """
 
     __tablename__ = "mod_lock"
@@ -26,6 +29,7 @@ class ModLock(DatabaseBase):
     guild_id = Column(BigInteger, primary_key=True, nullable=False, unique=True)
 
     lock_code = Column(Integer, nullable=False, default=0)
+    raid_action = Column(Integer, nullable=False, default=0, server_default="0")
 
     @classmethod
     async def get_config(
@@ -61,3 +65,21 @@ class ModLock(DatabaseBase):
                 values={"guild_id": guild_id, "lock_code": lock_code},
             )
             await session.commit()
+
+    @classmethod
+    async def set_raid_action(
+        cls,
+        session: sessionmaker,
+        guild_id: t.Union[str, int, discord.Guild],
+        raid_action: int,
+    ) -> None:
+        guild_id = get_datatype_int(guild_id)
+
+        async with session() as session:
+            await on_conflict(
+                session,
+                cls,
+                conflict_columns=["guild_id"],
+                values={"guild_id": guild_id, "raid_action": raid_action},
+            )
+            await session.commit()
@@ -1,3 +1,4 @@
+import codecs
 import json
 import typing as t
 from contextlib import suppress
@@ -5,15 +6,102 @@ from contextlib import suppress
 import aiohttp
 import discord
 
+CHUNK_SIZE = 8192
+MAX_PASTE_SIZE = 512 * 1024
 
-async def file_uploader(session: aiohttp.ClientSession, attachments: list) -> t.Optional[str]:
+# Control characters that don't show up in text files, used to sniff binaries.
+_TEXT_CONTROL = {7, 8, 9, 10, 12, 13, 27}
+
+
+class AttachmentError(Exception):
+    """Base error for the attachments that can't be loaded as text."""
+
+
+class ContentTooLarge(AttachmentError):
+    """Raised when the content exceeds the allowed size."""
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        super().__init__(f"The content is bigger than {max_size} bytes.")
+
+
+class BinaryContent(AttachmentError):
+    """Raised when the content doesn't look like text."""
+
+    def __init__(self) -> None:
+        super().__init__("The content is binary, not text.")
+
+
+def is_binary(chunk: bytes) -> bool:
+    """Sniff whether the first chunk of some content is binary."""
+    if b"\x00" in chunk:
+        return True
+
+    if not chunk:
+        return False
+
+    control = sum(1 for byte in chunk if byte < 32 and byte not in _TEXT_CONTROL)
+    return control / len(chunk) > 0.1
+
+
+async def read_text(response: aiohttp.ClientResponse, max_size: int, encoding: str = "utf-8") -> str:
+    """
+    Read the body of a response as text, chunk by chunk.
+
+    The size cap is checked while reading, so oversized content is never fully buffered,
+    and binary content is rejected from the first chunk.
+    """
+    if response.content_length is not None and response.content_length > max_size:
+        raise ContentTooLarge(max_size)
+
+    decoder = codecs.getincrementaldecoder(encoding)(errors="strict")
+    parts = []
+    size = 0
+
+    try:
+        async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+            if size == 0 and is_binary(chunk):
+                raise BinaryContent()
+
+            size += len(chunk)
+            if size > max_size:
+                raise ContentTooLarge(max_size)
+
+            parts.append(decoder.decode(chunk))
+
+        parts.append(decoder.decode(b"", final=True))
+    except UnicodeDecodeError:
+        raise BinaryContent() from None
+
+    return "".join(parts)
+
+
+async def read_url_text(session: aiohttp.ClientSession, url: str, max_size: int) -> str:
+    """Stream the content at the URL as text, see `read_text`."""
+    async with session.get(url) as response:
+        response.raise_for_status()
+        return await read_text(response, max_size)
+
+
+async def read_attachment_text(
+    session: aiohttp.ClientSession, attachment: discord.Attachment, max_size: int
+) -> str:
+    """Stream an attachment as text, without downloading anything if it's already too large."""
+    if attachment.size > max_size:
+        raise ContentTooLarge(max_size)
+
+    return await read_url_text(session, attachment.url, max_size)
+
+
+async def file_uploader(
+    session: aiohttp.ClientSession, attachments: list, max_size: int = MAX_PASTE_SIZE
+) -> t.Optional[str]:
     file_list_json = []
 
     for attachment in attachments:
         try:
-            content = await attachment.read()
-            value = content.decode("utf-8")
-        except (discord.NotFound, ConnectionError):
+            value = await read_attachment_text(session, attachment, max_size)
+        except (AttachmentError, aiohttp.ClientError, ConnectionError):
             continue
 
         file_list_json.append(
@@ -1,29 +1,119 @@
+import asyncio
+import collections
+import time
 import typing as t
 from datetime import datetime, timedelta
 
 import discord
 
 
-async def get_latest_audit(
-    guild: discord.Guild,
-    actions: t.Iterable[discord.enums.AuditLogAction],
-    target: t.Any = None,
-    max_time: int = 5,
-) -> t.Optional[discord.AuditLogEntry]:
-    logs = []
+class AuditLogTail:
+    """
+    Rolling window of the recent audit log entries of each guild.
 
-    for action in actions:
-        audit_logs = await guild.audit_logs(limit=1, action=action).flatten()
-        logs.extend(audit_logs)
+    Instead of one `audit_logs` request per action type per event, the entries of a guild
+    are fetched in batches at most once every `poll_interval` seconds, and correlation
+    queries are answered from the in-memory window. Concurrent queries for the same guild
+    share the same poll.
+    """
 
-    if not logs or len(logs) == 0:
-        return
+    def __init__(self, poll_interval: float = 1.0, window: int = 30, max_entries: int = 200) -> None:
+        self.poll_interval = poll_interval
+        self.window = window
+        self.max_entries = max_entries
 
-    last_log = max(logs, key=lambda log_: log_.created_at)
+        self._entries: t.Dict[int, t.Deque[discord.AuditLogEntry]] = {}
+        self._last_poll: t.Dict[int, float] = {}
+        self._polls: t.Dict[int, asyncio.Task] = {}
+        self._forbidden_until: t.Dict[int, float] = {}
 
-    time_delta = datetime.utcnow() - timedelta(seconds=max_time)
-    if last_log.created_at < time_delta:
-        return
+        # Stats
+        self.requests = 0
+        self.queries = 0
 
-    if target is not None and last_log.target != target:
-        return
+    def forget(self, guild_id: int) -> None:
+        for store in (self._entries, self._last_poll, self._forbidden_until):
+            store.pop(guild_id, None)
+
+    async def _poll(self, guild: discord.Guild) -> None:
+        entries = self._entries.setdefault(guild.id, collections.deque(maxlen=self.max_entries))
+
+        try:
+            self.requests += 1
+
+            if entries:
+                # Oldest first, so the deque stays ordered.
+                new = await guild.audit_logs(limit=100, after=discord.Object(entries[-1].id)).flatten()
+            else:
+                new = await guild.audit_logs(limit=50).flatten()
+                new.reverse()
+        except discord.Forbidden:
+            # No access to the audit log, don't ask again for a while.
+            self._forbidden_until[guild.id] = time.monotonic() + 300
+            return
+        except discord.HTTPException:
+            return
+        finally:
+            self._last_poll[guild.id] = time.monotonic()
+
+        entries.extend(new)
+
+        oldest = datetime.utcnow() - timedelta(seconds=self.window)
+        while entries and entries[0].created_at < oldest:
+            entries.popleft()
+
+    async def refresh(self, guild: discord.Guild) -> None:
+        """Poll the guild's audit log, if the window is older than the poll interval."""
+        if self._forbidden_until.get(guild.id, 0) > time.monotonic():
+            return
+
+        if time.monotonic() - self._last_poll.get(guild.id, 0) < self.poll_interval:
+            return
+
+        poll = self._polls.get(guild.id)
+        if poll is None:
+            poll = asyncio.create_task(self._poll(guild))
+            self._polls[guild.id] = poll
+            poll.add_done_callback(lambda _: self._polls.pop(guild.id, None))
+
+        await asyncio.shield(poll)
+
+    async def get_latest(
+        self,
+        guild: discord.Guild,
+        actions: t.Iterable[discord.enums.AuditLogAction],
+        target: t.Any = None,
+        max_time: int = 5,
+    ) -> t.Optional[discord.AuditLogEntry]:
+        """Get the latest entry of one of the actions within the last `max_time` seconds."""
+        self.queries += 1
+        requested_at = time.monotonic()
+        await self.refresh(guild)
+
+        entry = self._find(guild.id, set(actions), target, max_time)
+
+        # The entry may have been created after the last poll, so wait for the next one.
+        if entry is None and self._last_poll.get(guild.id, requested_at) < requested_at:
+            await asyncio.sleep(max(self._last_poll[guild.id] + self.poll_interval - time.monotonic(), 0))
+            await self.refresh(guild)
+
+            entry = self._find(guild.id, set(actions), target, max_time)
+
+        return entry
+
+    def _find(
+        self, guild_id: int, actions: t.Set[discord.enums.AuditLogAction], target: t.Any, max_time: int
+    ) -> t.Optional[discord.AuditLogEntry]:
+        oldest = datetime.utcnow() - timedelta(seconds=max_time)
+
+        for entry in reversed(self._entries.get(guild_id, ())):
+            if entry.created_at < oldest:
+                break
+
+            if entry.action not in actions:
+                continue
+
+            if target is not None and getattr(entry.target, "id", None) != target.id:
+                continue
+
+            return entry
@@ -0,0 +1,164 @@
+import asyncio
+import random
+import typing as t
+from collections import OrderedDict
+
+import aiohttp
+from bs4 import BeautifulSoup, SoupStrainer
+from loguru import logger
+
+if t.TYPE_CHECKING:
+    from bot import Bot
+
+SMBC_ARCHIVE_URL = "http://www.smbc-comics.com/comic/archive"
+SMBC_BASE_URL = "http://www.smbc-comics.com/"
+XKCD_LATEST_URL = "https://xkcd.com/info.0.json"
+XKCD_COMIC_URL = "https://xkcd.com/{}/info.0.json"
+
+# Only parse the tags we actually look at, instead of building the whole tree.
+META_STRAINER = SoupStrainer("meta")
+IMG_STRAINER = SoupStrainer("img")
+ARCHIVE_STRAINER = SoupStrainer("select", attrs={"name": "comic"})
+
+
+def parse_og_image(html: str) -> t.Optional[str]:
+    """Get the `og:image` URL from a page."""
+    soup = BeautifulSoup(html, "html.parser", parse_only=META_STRAINER)
+    tag = soup.find(property="og:image")
+
+    if tag is None:
+        return None
+    return tag.get("content")
+
+
+def parse_image_src(html: str, element_id: str) -> t.Optional[str]:
+    """Get the `src` of the image with the specified ID from a page."""
+    soup = BeautifulSoup(html, "html.parser", parse_only=IMG_STRAINER)
+    tag = soup.find(id=element_id)
+
+    if tag is None:
+        return None
+    return tag.get("src")
+
+
+def parse_smbc_archive(html: str) -> t.Tuple[str, ...]:
+    """Get the URL stubs of every comic listed in the SMBC archive page."""
+    soup = BeautifulSoup(html, "html.parser", parse_only=ARCHIVE_STRAINER)
+    select = soup.find("select", attrs={"name": "comic"})
+
+    if select is None:
+        return ()
+    return tuple(option["value"] for option in select.find_all("option") if option.get("value"))
+
+
+class ComicIndex:
+    """
+    In-memory index of comic archives.
+
+    Keeps the parsed SMBC archive, the latest xkcd comic and the already
+    resolved comics around, so commands don't need to download and parse
+    the same pages on every invocation. Parsing runs in the bot's worker
+    pool, and refreshing is driven by the owner.
+    """
+
+    def __init__(self, bot: "Bot", max_cached: int = 512) -> None:
+        self.bot = bot
+        self.max_cached = max_cached
+
+        self.smbc_stubs: t.Tuple[str, ...] = ()
+        self.xkcd_latest: t.Optional[dict] = None
+
+        # Comics never change once published, so resolved data is safe to keep.
+        self._smbc_images: t.OrderedDict[str, str] = OrderedDict()
+        self._xkcd_comics: t.OrderedDict[int, dict] = OrderedDict()
+
+        self._lock = asyncio.Lock()
+
+    def _remember(self, cache: OrderedDict, key: t.Hashable, value: t.Any) -> None:
+        cache[key] = value
+        cache.move_to_end(key)
+
+        if len(cache) > self.max_cached:
+            cache.popitem(last=False)
+
+    async def _get_text(self, url: str) -> str:
+        async with self.bot.session.get(url, headers={"Connection": "keep-alive"}) as response:
+            return await response.text()
+
+    # -- Refreshing --
+    async def refresh(self) -> None:
+        """Refresh all the indexes."""
+        async with self._lock:
+            for refresher in (self.refresh_smbc, self.refresh_xkcd):
+                try:
+                    await refresher()
+                except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as exc:
+                    logger.warning(f"Comic index refresh `{refresher.__name__}` failed: {exc!r}")
+
+    async def refresh_smbc(self) -> None:
+        """Re-parse the SMBC archive."""
+        stubs = await self.bot.run_cpu(parse_smbc_archive, await self._get_text(SMBC_ARCHIVE_URL))
+
+        # Keep the previous index around if the archive page changed shape.
+        if stubs:
+            self.smbc_stubs = stubs
+
+    async def refresh_xkcd(self) -> None:
+        """Fetch the latest xkcd comic."""
+        async with self.bot.session.get(XKCD_LATEST_URL) as response:
+            data = await response.json()
+
+        self.xkcd_latest = data
+        self._remember(self._xkcd_comics, data["num"], data)
+
+    async def _ensure(self, attribute: str, refresher: t.Callable[[], t.Awaitable[None]]) -> None:
+        if getattr(self, attribute):
+            return
+
+        async with self._lock:
+            if not getattr(self, attribute):
+                await refresher()
+
+    # -- Lookups --
+    async def og_image(self, url: str) -> t.Optional[str]:
+        """Get the image URL advertised by a comic page."""
+        return await self.bot.run_cpu(parse_og_image, await self._get_text(url))
+
+    async def random_smbc(self) -> t.Optional[str]:
+        """Get the image URL of a random SMBC comic."""
+        await self._ensure("smbc_stubs", self.refresh_smbc)
+        if not self.smbc_stubs:
+            return None
+
+        stub = random.choice(self.smbc_stubs)
+        if stub in self._smbc_images:
+            return self._smbc_images[stub]
+
+        img_url = await self.og_image(f"{SMBC_BASE_URL}{stub}")
+        if img_url is not None:
+            self._remember(self._smbc_images, stub, img_url)
+
+        return img_url
+
+    async def latest_xkcd(self) -> dict:
+        """Get the latest xkcd comic."""
+        await self._ensure("xkcd_latest", self.refresh_xkcd)
+        return self.xkcd_latest
+
+    async def xkcd(self, number: int) -> t.Optional[dict]:
+        """Get a specific xkcd comic, or `None` if it doesn't exist."""
+        if number in self._xkcd_comics:
+            return self._xkcd_comics[number]
+
+        async with self.bot.session.get(XKCD_COMIC_URL.format(number)) as response:
+            if response.status != 200:
+                return None
+            data = await response.json()
+
+        self._remember(self._xkcd_comics, number, data)
+        return data
+
+    async def random_xkcd(self) -> t.Optional[dict]:
+        """Get a random xkcd comic."""
+        latest = await self.latest_xkcd()
+        return await self.xkcd(random.randint(1, latest["num"]))
@@ -2,7 +2,6 @@ import re
 import urllib.parse
 import zlib
 from functools import partial
-from io import BytesIO
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 import aiohttp
@@ -10,6 +9,8 @@ from discord import Embed
 from discord.ext import commands
 from discord.ext.commands import Context
 
+from bot.utils.attachments import BinaryContent, ContentTooLarge, read_attachment_text, read_text
+
 to_bytes = partial(bytes, encoding="utf-8")
 
 
@@ -74,14 +75,15 @@ class Tio:
 
         self.request = zlib.compress(bytes_, 9)[2:-4]
 
-    async def get_result(self) -> str:
+    async def get_result(self, session: Optional[aiohttp.ClientSession] = None) -> str:
         """Send Request to Tio Run API And Get Result."""
-        async with aiohttp.ClientSession() as client_session:
-            async with client_session.post(self.backend, data=self.request) as res:
-                data = await res.read()
-                data = data.decode("utf-8")
+        if session is None:
+            async with aiohttp.ClientSession() as client_session:
+                return await self.get_result(client_session)
 
-        await client_session.close()
+        async with session.post(self.backend, data=self.request) as res:
+            data = await res.read()
+            data = data.decode("utf-8")
 
         return data.replace(data[:16], "")
 
@@ -158,37 +160,40 @@ class EvalHelper:
     async def code_from_attachments(self, ctx: Context) -> Optional[str]:
         """Code in file."""
         file = ctx.message.attachments[0]
-        if file.size > self.max_file_size:
+
+        try:
+            return await read_attachment_text(ctx.bot.session, file, self.max_file_size)
+        except ContentTooLarge:
             await ctx.send("File must be smaller than 20 kio.")
-            return
-        buffer = BytesIO()
-        await ctx.message.attachments[0].save(buffer)
-        text = buffer.read().decode("utf-8")
-        return text
+        except BinaryContent:
+            await ctx.send("File must be a text file.")
+        except aiohttp.ClientError:
+            await ctx.send("Couldn't download the file. Retry later.")
 
     async def code_from_url(self, ctx: Context, code: str) -> Optional[str]:
         """Get code from url."""
         base_url = urllib.parse.quote_plus(
             code.split(" ")[-1][5:].strip("/"), safe=";/?:@&=$,><-[]"
         )
-        print(base_url)
         url = self.get_raw(base_url)
-        print(url)
-
-        async with aiohttp.ClientSession() as client_session:
-            async with client_session.get(url) as response:
-                print(response.status)
-                if response.status == 404:
-                    await ctx.send("Nothing found. Check your link")
-                    return
-                if response.status != 200:
-                    await ctx.send(
-                        f"An error occurred (status code: {response.status}). "
-                        f"Retry later."
-                    )
-                    return
-                text = await response.text()
-                return text
+
+        async with ctx.bot.session.get(url) as response:
+            if response.status == 404:
+                await ctx.send("Nothing found. Check your link")
+                return
+            if response.status != 200:
+                await ctx.send(
+                    f"An error occurred (status code: {response.status}). "
+                    f"Retry later."
+                )
+                return
+
+            try:
+                return await read_text(response, self.max_file_size)
+            except ContentTooLarge:
+                await ctx.send("The linked code must be smaller than 20 kio.")
+            except BinaryContent:
+                await ctx.send("The linked code must be text.")
 
     async def paste(self, text: str) -> Union[str, dict]:
         """Upload the eval output to a paste service and return a URL to it if successful."""
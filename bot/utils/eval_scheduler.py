@@ -0,0 +1,259 @@
+import asyncio
+import collections
+import time
+import typing as t
+from dataclasses import dataclass, field
+
+import aiohttp
+from loguru import logger
+
+from bot.utils.eval_helper import Tio
+from bot.utils.utils import percentile
+
+JobKey = t.Tuple[str, str, str, t.Tuple[str, ...], t.Tuple[str, ...], t.Tuple[str, ...]]
+
+
+@dataclass
+class EvalJob:
+    key: JobKey
+    guild_id: int
+    user_id: int
+    future: asyncio.Future
+    # Future of each submission waiting on this job -> ID of the user who submitted it.
+    waiters: t.Dict[asyncio.Future, int] = field(default_factory=dict)
+    submitted_at: float = field(default_factory=time.perf_counter)
+
+    def to_tio(self) -> Tio:
+        language, code, inputs, compiler_flags, command_line_options, args = self.key
+        return Tio(language, code, inputs, list(compiler_flags), list(command_line_options), list(args))
+
+
+class EvalScheduler:
+    """
+    Queue for the tio.run eval jobs.
+
+    At most `max_concurrency` jobs run at once, and queued jobs are picked round-robin
+    across guilds, so a single busy guild can't starve the others. Results of identical
+    jobs are cached for a short while, and identical jobs in flight share one request.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        max_concurrency: int = 4,
+        cache_size: int = 256,
+        cache_ttl: float = 600,
+        history: int = 256,
+    ) -> None:
+        self.session = session
+        self.max_concurrency = max_concurrency
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+
+        self._queues: t.OrderedDict[int, t.Deque[EvalJob]] = collections.OrderedDict()
+        self._inflight: t.Dict[JobKey, EvalJob] = {}
+        self._cache: t.OrderedDict[JobKey, t.Tuple[float, str]] = collections.OrderedDict()
+        self._wakeup = asyncio.Event()
+        self._workers: t.List[asyncio.Task] = []
+
+        # Stats
+        self.running = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.wait_times = collections.deque(maxlen=history)
+        self.latencies = collections.deque(maxlen=history)
+
+    @staticmethod
+    def make_key(
+        language: str,
+        code: str,
+        inputs: str = "",
+        compiler_flags: t.Optional[list] = None,
+        command_line_options: t.Optional[list] = None,
+        args: t.Optional[list] = None,
+    ) -> JobKey:
+        return (
+            language,
+            code,
+            inputs,
+            tuple(compiler_flags or ()),
+            tuple(command_line_options or ()),
+            tuple(args or ()),
+        )
+
+    @property
+    def queued(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def start(self) -> None:
+        if self._workers:
+            return
+
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.max_concurrency)]
+
+    def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        self._workers = []
+
+        for queue in self._queues.values():
+            for job in queue:
+                job.future.cancel()
+        self._queues.clear()
+
+    # -- Cache --
+    def _get_cached(self, key: JobKey) -> t.Optional[str]:
+        cached = self._cache.get(key)
+        if cached is None:
+            return None
+
+        stored_at, result = cached
+        if time.monotonic() - stored_at > self.cache_ttl:
+            del self._cache[key]
+            return None
+
+        self._cache.move_to_end(key)
+        return result
+
+    def _store(self, key: JobKey, result: str) -> None:
+        self._cache[key] = (time.monotonic(), result)
+        self._cache.move_to_end(key)
+
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    # -- Submitting --
+    async def submit(self, key: JobKey, guild_id: int, user_id: int) -> str:
+        """Queue the job if the result isn't known already, and wait for the result."""
+        cached = self._get_cached(key)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached
+
+        self.cache_misses += 1
+        self.start()
+
+        loop = asyncio.get_running_loop()
+
+        job = self._inflight.get(key)
+        if job is None:
+            job = EvalJob(key, guild_id, user_id, loop.create_future())
+            job.future.add_done_callback(lambda _: self._resolve(job))
+            self._inflight[key] = job
+
+            self._queues.setdefault(guild_id, collections.deque()).append(job)
+            self._wakeup.set()
+
+        # Every submission waits on its own future, so cancelling one doesn't cancel the others sharing the job.
+        waiter = loop.create_future()
+        job.waiters[waiter] = user_id
+        try:
+            return await waiter
+        finally:
+            del job.waiters[waiter]
+            if not job.waiters and not job.future.done():
+                self._discard(job)
+
+    @staticmethod
+    def _resolve(job: EvalJob) -> None:
+        """Pass the outcome of a job on to everyone waiting on it."""
+        for waiter in job.waiters:
+            if waiter.done():
+                continue
+
+            if job.future.cancelled():
+                waiter.cancel()
+            elif job.future.exception() is not None:
+                waiter.set_exception(job.future.exception())
+            else:
+                waiter.set_result(job.future.result())
+
+    def _discard(self, job: EvalJob) -> None:
+        """Drop a job nobody is waiting on anymore."""
+        queue = self._queues.get(job.guild_id)
+
+        if queue is not None and job in queue:
+            queue.remove(job)
+            if not queue:
+                del self._queues[job.guild_id]
+
+        job.future.cancel()
+        self._forget(job)
+
+    def _forget(self, job: EvalJob) -> None:
+        """Stop coalescing onto a job, unless a newer job for the same key replaced it already."""
+        if self._inflight.get(job.key) is job:
+            del self._inflight[job.key]
+
+    def cancel(self, user_id: int) -> int:
+        """
+        Cancel all the queued submissions of a user, and return how many were cancelled.
+
+        A job shared with other users keeps running for them, it's only dropped once its last
+        submission is cancelled.
+        """
+        cancelled = 0
+
+        for queue in list(self._queues.values()):
+            for job in list(queue):
+                for waiter, waiter_id in list(job.waiters.items()):
+                    if waiter_id == user_id and not waiter.done():
+                        waiter.cancel()
+                        cancelled += 1
+
+        return cancelled
+
+    # -- Running --
+    def _next_job(self) -> t.Optional[EvalJob]:
+        """Take the next job, rotating through the guilds."""
+        if not self._queues:
+            return None
+
+        guild_id, queue = self._queues.popitem(last=False)
+        job = queue.popleft()
+
+        if queue:
+            self._queues[guild_id] = queue
+
+        return job
+
+    async def _worker(self) -> None:
+        while True:
+            job = self._next_job()
+
+            if job is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            self.running += 1
+            self.wait_times.append(time.perf_counter() - job.submitted_at)
+            start = time.perf_counter()
+
+            try:
+                result = await job.to_tio().get_result(self.session)
+            except Exception as exc:
+                logger.warning(f"Eval job in {job.key[0]} failed: {exc!r}")
+                if not job.future.done():
+                    job.future.set_exception(exc)
+            else:
+                self._store(job.key, result)
+                if not job.future.done():
+                    job.future.set_result(result)
+            finally:
+                self.running -= 1
+                self.latencies.append(time.perf_counter() - start)
+                self._forget(job)
+
+    def stats(self) -> t.Dict[str, t.Any]:
+        return {
+            "running": self.running,
+            "queued": self.queued,
+            "guilds_waiting": len(self._queues),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "wait_p50": percentile(self.wait_times, 50),
+            "wait_p95": percentile(self.wait_times, 95),
+            "latency_p50": percentile(self.latencies, 50),
+            "latency_p95": percentile(self.latencies, 95),
+        }
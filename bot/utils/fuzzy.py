@@ -0,0 +1,86 @@
+import collections
+import difflib
+import typing as t
+
+
+def trigrams(word: str) -> t.Set[str]:
+    """Get the set of trigrams of a word, padded so short words still have some."""
+    padded = f"  {word.lower()} "
+    return {padded[index: index + 3] for index in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """
+    Name index for fast fuzzy suggestions.
+
+    Every name is stored under its trigrams, so a lookup only scores the names
+    sharing enough trigrams with the query, instead of comparing the query
+    against every name. Names can be added and removed incrementally.
+    """
+
+    def __init__(self, names: t.Iterable[str] = ()) -> None:
+        self._grams: t.Dict[str, t.Set[str]] = collections.defaultdict(set)
+        self._names: t.Dict[str, t.Set[str]] = {}
+
+        for name in names:
+            self.add(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._names
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __iter__(self) -> t.Iterator[str]:
+        return iter(self._names)
+
+    def add(self, name: str) -> None:
+        if name in self._names:
+            return
+
+        grams = trigrams(name)
+        self._names[name] = grams
+
+        for gram in grams:
+            self._grams[gram].add(name)
+
+    def remove(self, name: str) -> None:
+        grams = self._names.pop(name, None)
+        if grams is None:
+            return
+
+        for gram in grams:
+            bucket = self._grams[gram]
+            bucket.discard(name)
+
+            if not bucket:
+                del self._grams[gram]
+
+    def clear(self) -> None:
+        self._grams.clear()
+        self._names.clear()
+
+    def suggest(self, query: str, limit: int = 3, cutoff: float = 0.6, candidates: int = 20) -> t.List[str]:
+        """Get the names closest to the query, best match first."""
+        query_grams = trigrams(query)
+        shared = collections.Counter()
+
+        for gram in query_grams:
+            for name in self._grams.get(gram, ()):
+                shared[name] += 1
+
+        # Only the names sharing the most trigrams get the expensive similarity check.
+        matcher = difflib.SequenceMatcher()
+        matcher.set_seq2(query.lower())
+        scored = []
+
+        for name, _ in shared.most_common(candidates):
+            matcher.set_seq1(name.lower())
+
+            if matcher.real_quick_ratio() >= cutoff and matcher.quick_ratio() >= cutoff:
+                ratio = matcher.ratio()
+                if ratio >= cutoff:
+                    scored.append((ratio, name))
+
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [name for _, name in scored[:limit]]
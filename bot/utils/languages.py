@@ -0,0 +1,109 @@
+import json
+import typing as t
+from pathlib import Path
+
+import aiohttp
+from loguru import logger
+from yaml import safe_load
+
+from bot.utils.fuzzy import TrigramIndex
+
+LANGUAGES_URL = "https://tio.run/languages.json"
+
+
+class LanguageCatalogue:
+    """
+    Catalogue of the languages supported by tio.run.
+
+    The catalogue is persisted to a local snapshot, so it's available instantly on startup,
+    and refreshed conditionally using the ETag of the last response. The quick map and
+    default language aliases are merged in, so resolving a name is a single lookup.
+    """
+
+    def __init__(self, snapshot: t.Union[str, Path], assets: t.Union[str, Path] = "bot/assets") -> None:
+        self.snapshot = Path(snapshot)
+        self.etag: t.Optional[str] = None
+
+        self.languages: t.Tuple[str, ...] = ()
+        self.index = TrigramIndex()
+
+        assets = Path(assets)
+        with (assets / "quick_map.yml").open(encoding="utf8") as file:
+            quick_map = safe_load(file)
+
+        with (assets / "default_langs.yml").open(encoding="utf8") as file:
+            default_languages = safe_load(file)
+
+        # Quick map entries are applied first, then the default for the resulting name.
+        self.aliases: t.Dict[str, str] = {}
+        for alias in {*quick_map, *default_languages}:
+            name = quick_map.get(alias, alias)
+            self.aliases[alias] = default_languages.get(name, name)
+
+        self.load_snapshot()
+
+    def __contains__(self, language: str) -> bool:
+        return language in self.index
+
+    def __bool__(self) -> bool:
+        return bool(self.languages)
+
+    def _set_languages(self, languages: t.Iterable[str]) -> None:
+        self.languages = tuple(sorted(languages))
+
+        self.index.clear()
+        for language in self.languages:
+            self.index.add(language)
+
+    def load_snapshot(self) -> None:
+        """Load the catalogue saved from the last successful fetch, if any."""
+        try:
+            with self.snapshot.open(encoding="utf8") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as exc:
+            logger.warning(f"Couldn't load the language snapshot at {self.snapshot}: {exc!r}")
+            return
+
+        self.etag = data.get("etag")
+        self._set_languages(data.get("languages", ()))
+
+    def save_snapshot(self) -> None:
+        try:
+            self.snapshot.parent.mkdir(parents=True, exist_ok=True)
+
+            temp = self.snapshot.with_suffix(".tmp")
+            with temp.open("w", encoding="utf8") as file:
+                json.dump({"etag": self.etag, "languages": self.languages}, file)
+
+            temp.replace(self.snapshot)
+        except OSError as exc:
+            logger.warning(f"Couldn't save the language snapshot at {self.snapshot}: {exc!r}")
+
+    async def refresh(self, session: aiohttp.ClientSession) -> bool:
+        """Update the catalogue if it changed upstream, and return whether it did."""
+        headers = {}
+        if self.etag and self.languages:
+            headers["If-None-Match"] = self.etag
+
+        async with session.get(LANGUAGES_URL, headers=headers) as response:
+            if response.status == 304:
+                return False
+
+            response.raise_for_status()
+            languages = json.loads(await response.text())
+            self.etag = response.headers.get("ETag")
+
+        self._set_languages(languages)
+        self.save_snapshot()
+
+        return True
+
+    def resolve(self, language: str) -> str:
+        """Resolve the aliases of a language to the tio.run name."""
+        return self.aliases.get(language, language)
+
+    def suggest(self, language: str, limit: int = 3) -> t.List[str]:
+        """Get the supported languages closest to the specified name."""
+        return self.index.suggest(language, limit=limit)
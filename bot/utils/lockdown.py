@@ -0,0 +1,239 @@
+import asyncio
+import json
+import os
+import typing as t
+
+import discord
+from loguru import logger
+
+Target = t.Union[discord.Role, discord.Member]
+# Permission values of an overwrite, `None` meaning the permission is inherited.
+PermissionValues = t.Dict[str, t.Optional[bool]]
+
+
+class OverwriteEdit(t.NamedTuple):
+    """A single overwrite to set on a channel, `overwrite` being None to delete it."""
+
+    channel: discord.abc.GuildChannel
+    target: Target
+    overwrite: t.Optional[discord.PermissionOverwrite]
+    # For restore edits, the snapshot entry they put back and whether the lock created the overwrite.
+    restores: t.Optional[t.Tuple[PermissionValues, bool]] = None
+
+
+class Lockdown:
+    """
+    Overwrite changes made to the channels of a guild, with what they replaced.
+
+    Planning a lock only emits an edit for the overwrites that would actually change,
+    leaving every other overwrite of the channel alone. The previous value of each
+    changed permission is kept in the snapshot, so restoring puts back exactly those
+    permissions, and deletes the overwrites the lock created if nothing else was set on
+    them since.
+    """
+
+    def __init__(self, guild: discord.Guild) -> None:
+        self.guild = guild
+
+        # Channel ID -> target ID -> previous values of the changed permissions.
+        self.snapshot: t.Dict[int, t.Dict[int, PermissionValues]] = {}
+        # (Channel ID, target ID) of the overwrites that didn't exist before.
+        self.created: t.Set[t.Tuple[int, int]] = set()
+
+    def __bool__(self) -> bool:
+        return bool(self.snapshot)
+
+    @property
+    def channel_ids(self) -> t.Set[int]:
+        return set(self.snapshot)
+
+    def plan(self, channels: t.Iterable[discord.abc.GuildChannel], targets: t.Dict[Target, PermissionValues]) -> t.List[OverwriteEdit]:
+        """Get the edits setting the `targets` permissions on `channels`, recording the values they replace."""
+        edits = []
+
+        for channel in channels:
+            overwrites = channel.overwrites
+
+            for target, values in targets.items():
+                current = overwrites.get(target)
+                overwrite = current or discord.PermissionOverwrite()
+
+                changed = {name: value for name, value in values.items() if getattr(overwrite, name) != value}
+                if not changed:
+                    continue
+
+                previous = self.snapshot.setdefault(channel.id, {}).setdefault(target.id, {})
+                for name in changed:
+                    # Locking twice keeps the state from before the first lock.
+                    previous.setdefault(name, getattr(overwrite, name))
+
+                if current is None:
+                    self.created.add((channel.id, target.id))
+
+                overwrite = discord.PermissionOverwrite(**dict(iter(overwrite)))
+                overwrite.update(**changed)
+                edits.append(OverwriteEdit(channel, target, overwrite))
+
+        return edits
+
+    def _resolve(self, target_id: int) -> t.Optional[Target]:
+        return self.guild.get_role(target_id) or self.guild.get_member(target_id)
+
+    def plan_restore(self, channels: t.Optional[t.Iterable[discord.abc.GuildChannel]] = None) -> t.List[OverwriteEdit]:
+        """
+        Get the edits putting back the recorded permissions of `channels`, or of every channel, and forget them.
+
+        The edits that fail have to be passed to `keep_failed`, so their permissions are still recorded.
+        """
+        if channels is None:
+            channel_ids = list(self.snapshot)
+        else:
+            channel_ids = [channel.id for channel in channels if channel.id in self.snapshot]
+
+        edits = []
+        for channel_id in channel_ids:
+            targets = self.snapshot.pop(channel_id)
+            channel = self.guild.get_channel(channel_id)
+
+            for target_id, previous in targets.items():
+                created = (channel_id, target_id) in self.created
+                self.created.discard((channel_id, target_id))
+
+                target = self._resolve(target_id)
+                if channel is None or target is None:
+                    continue
+
+                overwrite = channel.overwrites_for(target)
+                if all(getattr(overwrite, name) == value for name, value in previous.items()):
+                    continue
+
+                overwrite.update(**previous)
+                edits.append(
+                    OverwriteEdit(channel, target, None if created and overwrite.is_empty() else overwrite, (previous, created))
+                )
+
+        return edits
+
+    def keep_failed(self, edits: t.Iterable[OverwriteEdit]) -> None:
+        """Record again the permissions of the restore edits that failed, so they can still be restored later."""
+        for edit in edits:
+            if edit.restores is None:
+                continue
+
+            previous, created = edit.restores
+            # The snapshot entry is older than anything recorded by a lock since, so it takes precedence.
+            self.snapshot.setdefault(edit.channel.id, {}).setdefault(edit.target.id, {}).update(previous)
+
+            if created:
+                self.created.add((edit.channel.id, edit.target.id))
+
+    # -- Persistence --
+    def to_dict(self) -> dict:
+        return {
+            "snapshot": {
+                str(channel_id): {str(target_id): previous for target_id, previous in targets.items()}
+                for channel_id, targets in self.snapshot.items()
+            },
+            "created": sorted(self.created),
+        }
+
+    @classmethod
+    def from_dict(cls, guild: discord.Guild, data: dict) -> "Lockdown":
+        lockdown = cls(guild)
+        lockdown.snapshot = {
+            int(channel_id): {int(target_id): previous for target_id, previous in targets.items()}
+            for channel_id, targets in data["snapshot"].items()
+        }
+        lockdown.created = {(channel_id, target_id) for channel_id, target_id in data["created"]}
+
+        return lockdown
+
+    @staticmethod
+    def _path(directory: str, guild_id: int) -> str:
+        return os.path.join(directory, f"{guild_id}.json")
+
+    def save(self, directory: str) -> None:
+        """Save the snapshot under `directory`, so a lockdown can still be lifted after a restart."""
+        path = self._path(directory, self.guild.id)
+
+        try:
+            if not self:
+                if os.path.exists(path):
+                    os.remove(path)
+                return
+
+            os.makedirs(directory, exist_ok=True)
+            with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+                json.dump(self.to_dict(), file)
+
+            os.replace(f"{path}.tmp", path)
+        except OSError as exc:
+            logger.warning(f"Couldn't save the lockdown snapshot of {self.guild.id}: {exc!r}")
+
+    @classmethod
+    def load(cls, directory: str, guild: discord.Guild) -> "Lockdown":
+        try:
+            with open(cls._path(directory, guild.id), encoding="utf-8") as file:
+                return cls.from_dict(guild, json.load(file))
+        except (OSError, ValueError, KeyError):
+            return cls(guild)
+
+
+class OverwriteJob:
+    """
+    Concurrent application of overwrite edits.
+
+    Every edit sets or deletes a single overwrite, instead of replacing the whole
+    overwrite map of the channel. The edits of one channel are applied in a row by one
+    worker, while up to `concurrency` channels are edited at once. This only caps how many
+    requests are in flight, the rate limits themselves are handled by discord.py.
+    """
+
+    def __init__(self, edits: t.List[OverwriteEdit], *, reason: t.Optional[str] = None, concurrency: int = 5) -> None:
+        self.edits = edits
+        self.reason = reason
+        self.concurrency = concurrency
+
+        self.completed = 0
+        self.failed: t.List[t.Tuple[OverwriteEdit, Exception]] = []
+        self.done = False
+
+    @property
+    def total(self) -> int:
+        return len(self.edits)
+
+    @property
+    def channels(self) -> t.Set[int]:
+        return {edit.channel.id for edit in self.edits}
+
+    async def _worker(self, queue: "asyncio.Queue[t.List[OverwriteEdit]]") -> None:
+        while not queue.empty():
+            for edit in queue.get_nowait():
+                try:
+                    await edit.channel.set_permissions(edit.target, overwrite=edit.overwrite, reason=self.reason)
+                except discord.HTTPException as exc:
+                    self.failed.append((edit, exc))
+                else:
+                    self.completed += 1
+
+    async def run(self) -> None:
+        by_channel: t.Dict[int, t.List[OverwriteEdit]] = {}
+        for edit in self.edits:
+            by_channel.setdefault(edit.channel.id, []).append(edit)
+
+        queue = asyncio.Queue()
+        for channel_edits in by_channel.values():
+            queue.put_nowait(channel_edits)
+
+        try:
+            await asyncio.gather(*(self._worker(queue) for _ in range(min(self.concurrency, len(by_channel)))))
+        finally:
+            self.done = True
+
+    def progress(self) -> str:
+        state = "Done" if self.done else "Running"
+        return (
+            f"**{state}** - editing {len(self.channels)} channels\n"
+            f"• Overwrites edited: **`{self.completed}`** / `{self.total}`\n"
+            f"• Failed: `{len(self.failed)}`"
+        )
@@ -0,0 +1,295 @@
+import asyncio
+import re
+import time
+import typing as t
+from collections import Counter
+from datetime import datetime, timedelta
+
+import discord
+
+# Messages older than this can't be bulk deleted, a little margin is kept for the time the purge takes.
+BULK_DELETE_MAX_AGE = timedelta(days=14) - timedelta(minutes=5)
+BULK_DELETE_SIZE = 100
+# Messages waiting for single deletion before the history walk waits for the worker to catch up.
+SINGLE_DELETE_QUEUE = 100
+
+
+class Predicate:
+    """
+    Composable message filter.
+
+    Predicates combine with `&`, `|` and `~`, and carry a description of what they match
+    to show in the purge progress.
+    """
+
+    def __init__(self, check: t.Callable[[discord.Message], bool], description: str) -> None:
+        self.check = check
+        self.description = description
+
+    def __call__(self, message: discord.Message) -> bool:
+        return bool(self.check(message))
+
+    def __and__(self, other: "Predicate") -> "Predicate":
+        return Predicate(lambda message: self(message) and other(message), f"({self.description} and {other.description})")
+
+    def __or__(self, other: "Predicate") -> "Predicate":
+        return Predicate(lambda message: self(message) or other(message), f"({self.description} or {other.description})")
+
+    def __invert__(self) -> "Predicate":
+        return Predicate(lambda message: not self(message), f"not {self.description}")
+
+    def __str__(self) -> str:
+        return self.description
+
+    # -- Building blocks --
+    @classmethod
+    def everything(cls) -> "Predicate":
+        return cls(lambda message: True, "any message")
+
+    @classmethod
+    def by_users(cls, *users: discord.abc.Snowflake) -> "Predicate":
+        user_ids = {user.id for user in users}
+        return cls(lambda message: message.author.id in user_ids, f"by {', '.join(str(user) for user in users)}")
+
+    @classmethod
+    def matches(cls, pattern: t.Union[str, t.Pattern]) -> "Predicate":
+        regex = re.compile(pattern) if isinstance(pattern, str) else pattern
+        return cls(lambda message: regex.search(message.content), f"matching `{regex.pattern}`")
+
+    @classmethod
+    def contains(cls, substring: str) -> "Predicate":
+        return cls(lambda message: substring in message.content, f"containing `{substring}`")
+
+    @classmethod
+    def has_attachments(cls) -> "Predicate":
+        return cls(lambda message: message.attachments, "with attachments")
+
+    @classmethod
+    def has_embeds(cls) -> "Predicate":
+        return cls(lambda message: message.embeds, "with embeds")
+
+    @classmethod
+    def from_bots(cls, prefix: t.Optional[str] = None) -> "Predicate":
+        def check(message: discord.Message) -> bool:
+            return (message.webhook_id is None and message.author.bot) or (prefix and message.content.startswith(prefix))
+
+        return cls(check, "from bots" + (f" or starting with `{prefix}`" if prefix else ""))
+
+
+class PurgeJob:
+    """
+    Message removal over any number of messages.
+
+    History is streamed page by page, and matching messages are deleted in batches of 100
+    with up to `concurrency` bulk deletes in flight. Messages too old to be bulk deleted
+    go to a worker deleting them one by one, at most once every `single_delay` seconds.
+
+    History is always walked newest first, and the job keeps a cursor of the last message
+    it went through, so a cancelled or failed purge can be resumed from where it stopped.
+    A finished or failed purge deletes the matching messages up to the cursor before
+    stopping, while a cancelled one stops right away and moves the cursor back to the newest
+    message it didn't delete, so resuming picks up the rest.
+    """
+
+    def __init__(
+        self,
+        channel: discord.TextChannel,
+        predicate: Predicate,
+        limit: int,
+        *,
+        before: t.Optional[discord.abc.Snowflake] = None,
+        after: t.Optional[discord.abc.Snowflake] = None,
+        concurrency: int = 2,
+        single_delay: float = 1.0,
+    ) -> None:
+        self.channel = channel
+        self.predicate = predicate
+        self.limit = limit
+        self.before = before
+        self.after = after
+        self.concurrency = concurrency
+        self.single_delay = single_delay
+
+        # Progress
+        self.scanned = 0
+        self.deleted = 0
+        self.failed = 0
+        self.authors: t.Counter[str] = Counter()
+        self.cursor: t.Optional[discord.abc.Snowflake] = None
+        self.error: t.Optional[Exception] = None
+
+        self.cancelled = False
+        self.done = False
+        self._stopped = asyncio.Event()
+
+        self._bulk_slots = asyncio.Semaphore(concurrency)
+        self._bulk_tasks: t.Set[asyncio.Task] = set()
+        self._old_messages: "asyncio.Queue[t.Optional[discord.Message]]" = asyncio.Queue(SINGLE_DELETE_QUEUE)
+        # Message ID -> messages scanned before it, for the matching messages not deleted yet.
+        self._pending: t.Dict[int, int] = {}
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.limit - self.scanned)
+
+    def cancel(self) -> None:
+        self.cancelled = True
+        self._stopped.set()
+
+    def resume(self) -> "PurgeJob":
+        """Get a job continuing this one, from the last message it went through."""
+        return PurgeJob(
+            self.channel,
+            self.predicate,
+            self.remaining,
+            before=self.cursor or self.before,
+            after=self.after,
+            concurrency=self.concurrency,
+            single_delay=self.single_delay,
+        )
+
+    async def _bulk_delete(self, messages: t.List[discord.Message]) -> None:
+        try:
+            # The batch may have waited for a while, the messages that got too old since go to the single deletion.
+            cutoff = datetime.utcnow() - BULK_DELETE_MAX_AGE
+            for message in messages:
+                if message.created_at < cutoff:
+                    await self._old_messages.put(message)
+
+            messages = [message for message in messages if message.created_at >= cutoff]
+            if not messages:
+                return
+
+            try:
+                await self.channel.delete_messages(messages)
+            except discord.NotFound:
+                # Some were already deleted, the rest are deleted one by one.
+                for message in messages:
+                    await self._old_messages.put(message)
+            except discord.HTTPException:
+                self.failed += len(messages)
+                self._settle(messages)
+            else:
+                self._count(messages)
+                self._settle(messages)
+        finally:
+            self._bulk_slots.release()
+
+    async def _submit_bulk(self, messages: t.List[discord.Message]) -> None:
+        await self._bulk_slots.acquire()
+
+        task = asyncio.create_task(self._bulk_delete(messages))
+        self._bulk_tasks.add(task)
+        task.add_done_callback(self._bulk_tasks.discard)
+
+    async def _single_worker(self) -> None:
+        while True:
+            message = await self._old_messages.get()
+            if message is None:
+                return
+
+            start = time.monotonic()
+            try:
+                await message.delete()
+            except discord.NotFound:
+                pass
+            except discord.HTTPException:
+                self.failed += 1
+            else:
+                self._count([message])
+
+            self._settle([message])
+
+            await asyncio.sleep(max(0.0, self.single_delay - (time.monotonic() - start)))
+
+    def _count(self, messages: t.List[discord.Message]) -> None:
+        self.deleted += len(messages)
+        self.authors.update(message.author.display_name for message in messages)
+
+    def _settle(self, messages: t.List[discord.Message]) -> None:
+        for message in messages:
+            self._pending.pop(message.id, None)
+
+    def _rewind(self) -> None:
+        """Move the cursor back to the newest message not deleted yet, so resuming goes through it again."""
+        if not self._pending:
+            return
+
+        newest = max(self._pending)
+        # The history is searched before the cursor, exclusively.
+        self.cursor = discord.Object(id=newest + 1)
+        self.scanned = self._pending[newest]
+        self._pending.clear()
+
+    async def run(self) -> None:
+        worker = asyncio.create_task(self._single_worker())
+        batch: t.List[discord.Message] = []
+
+        try:
+            async for message in self.channel.history(limit=self.limit, before=self.before, after=self.after, oldest_first=False):
+                if self.cancelled:
+                    break
+
+                self._pending[message.id] = self.scanned
+                self.scanned += 1
+                self.cursor = message
+
+                if not self.predicate(message):
+                    self._pending.pop(message.id)
+                    continue
+
+                # Waits for the single deletion worker when its queue is full.
+                if message.created_at < datetime.utcnow() - BULK_DELETE_MAX_AGE:
+                    await self._old_messages.put(message)
+                    continue
+
+                batch.append(message)
+                if len(batch) == BULK_DELETE_SIZE:
+                    await self._submit_bulk(batch)
+                    batch = []
+
+        except discord.HTTPException as exc:
+            self.error = exc
+        finally:
+            drain = asyncio.create_task(self._drain(batch, worker))
+            stopped = asyncio.create_task(self._stopped.wait())
+
+            await asyncio.wait((drain, stopped), return_when=asyncio.FIRST_COMPLETED)
+            stopped.cancel()
+
+            if not drain.done():
+                # Cancelled, so stop right away, what wasn't deleted is gone through again when resuming.
+                for task in (drain, worker, *self._bulk_tasks):
+                    task.cancel()
+
+                await asyncio.gather(drain, worker, *self._bulk_tasks, return_exceptions=True)
+                self._rewind()
+
+            self.done = True
+
+    async def _drain(self, batch: t.List[discord.Message], worker: asyncio.Task) -> None:
+        """Delete the messages already gone through, as resuming starts after the cursor."""
+        if batch:
+            await self._submit_bulk(batch)
+
+        if self._bulk_tasks:
+            await asyncio.gather(*self._bulk_tasks, return_exceptions=True)
+
+        await self._old_messages.put(None)
+        await worker
+
+    def progress(self) -> str:
+        if self.error is not None:
+            state = f"Stopped by an error: {self.error}"
+        elif self.cancelled:
+            state = "Cancelled"
+        elif self.done:
+            state = "Done"
+        else:
+            state = "Running"
+
+        return (
+            f"**{state}** - removing messages {self.predicate}\n"
+            f"• Searched: **`{self.scanned}`** / `{self.limit}`\n"
+            f"• Removed: **`{self.deleted}`** (queued for single deletion: `{self._old_messages.qsize()}`, failed: `{self.failed}`)"
+        )
@@ -0,0 +1,230 @@
+import collections
+import random
+import re
+import time
+import typing as t
+import unicodedata
+
+# Accounts younger than this are counted as fresh, in seconds.
+FRESH_ACCOUNT_AGE = 7 * 24 * 60 * 60
+# Default avatars all share this key, they're left out of the clustering as they're too common.
+DEFAULT_AVATAR = "default"
+
+_NAME_NOISE = re.compile(r"[\W\d_]+")
+
+
+def name_key(name: str) -> str:
+    """Reduce a username to the part shared by the accounts of a raid, dropping digits, separators and accents."""
+    name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    return _NAME_NOISE.sub("", name.lower())
+
+
+class Join(t.NamedTuple):
+    member_id: int
+    time: float
+    account_age: float
+    name: str
+    avatar: str
+
+    @property
+    def fresh(self) -> bool:
+        return self.account_age < FRESH_ACCOUNT_AGE
+
+
+class Raid(t.NamedTuple):
+    reason: str
+    # The members of the raid who already joined, to act on retroactively.
+    members: t.List[int]
+
+
+class GuildJoins:
+    """
+    The joins of a guild over the last `window` seconds, in a ring buffer of `size` joins.
+
+    The fresh accounts, usernames and avatars are counted as joins are added and expire,
+    so checking the window after a join is O(1).
+    """
+
+    __slots__ = ("window", "joins", "fresh", "names", "avatars", "raid_until")
+
+    def __init__(self, size: int, window: float) -> None:
+        self.window = window
+        self.joins: t.Deque[Join] = collections.deque(maxlen=size)
+
+        self.fresh = 0
+        self.names: t.Counter[str] = collections.Counter()
+        self.avatars: t.Counter[str] = collections.Counter()
+
+        self.raid_until = 0.0
+
+    def _forget(self, join: Join) -> None:
+        self.fresh -= join.fresh
+
+        for counter, key in ((self.names, join.name), (self.avatars, join.avatar)):
+            counter[key] -= 1
+            if not counter[key]:
+                del counter[key]
+
+    def expire(self, now: float) -> None:
+        while self.joins and self.joins[0].time < now - self.window:
+            self._forget(self.joins.popleft())
+
+    def add(self, join: Join) -> None:
+        self.expire(join.time)
+
+        if len(self.joins) == self.joins.maxlen:
+            self._forget(self.joins[0])
+
+        self.joins.append(join)
+        self.fresh += join.fresh
+        self.names[join.name] += 1
+        self.avatars[join.avatar] += 1
+
+    @property
+    def rate(self) -> float:
+        """Joins per minute over the window."""
+        return len(self.joins) * 60 / self.window
+
+
+class RaidDetector:
+    """
+    Join analytics per guild, flagging raids.
+
+    A raid is at least `min_joins` joins in the last `window` seconds, where either at least
+    `fresh_ratio` of the accounts are fresh, or at least `cluster_size` of them share a
+    username or a custom avatar. Once a guild is flagged, it isn't flagged again for `cooldown`
+    seconds, as the lock applied on the first detection handles the following joins.
+    """
+
+    def __init__(
+        self,
+        window: float = 10,
+        min_joins: int = 10,
+        fresh_ratio: float = 0.5,
+        cluster_size: int = 5,
+        cooldown: float = 300,
+        size: int = 500,
+    ) -> None:
+        self.window = window
+        self.min_joins = min_joins
+        self.fresh_ratio = fresh_ratio
+        self.cluster_size = cluster_size
+        self.cooldown = cooldown
+        self.size = size
+
+        self.guilds: t.Dict[int, GuildJoins] = {}
+        self.raids = 0
+
+    def _check(self, joins: GuildJoins, join: Join) -> t.Optional[Raid]:
+        """Check the window, as of the latest join. A cluster can only grow past the threshold with its latest join."""
+        count = len(joins.joins)
+        if count < self.min_joins:
+            return None
+
+        if join.name and joins.names[join.name] >= self.cluster_size:
+            return Raid(
+                f"{joins.names[join.name]} of {count} joins in {self.window:g}s are named like `{join.name}`",
+                [other.member_id for other in joins.joins if other.name == join.name],
+            )
+
+        if join.avatar != DEFAULT_AVATAR and joins.avatars[join.avatar] >= self.cluster_size:
+            return Raid(
+                f"{joins.avatars[join.avatar]} of {count} joins in {self.window:g}s share the same avatar",
+                [other.member_id for other in joins.joins if other.avatar == join.avatar],
+            )
+
+        if joins.fresh >= count * self.fresh_ratio:
+            return Raid(
+                f"{joins.fresh} of {count} joins in {self.window:g}s are accounts younger than a week",
+                [other.member_id for other in joins.joins if other.fresh],
+            )
+
+        return None
+
+    def observe(
+        self, guild_id: int, member_id: int, account_age: float, name: str, avatar: t.Optional[str], now: t.Optional[float] = None
+    ) -> t.Optional[Raid]:
+        """Record a join, returning the raid it's part of when it's the one making it a raid."""
+        now = time.monotonic() if now is None else now
+
+        joins = self.guilds.get(guild_id)
+        if joins is None:
+            joins = self.guilds[guild_id] = GuildJoins(self.size, self.window)
+
+        join = Join(member_id, now, account_age, name_key(name), avatar or DEFAULT_AVATAR)
+        joins.add(join)
+
+        if now < joins.raid_until:
+            return None
+
+        raid = self._check(joins, join)
+        if raid is not None:
+            joins.raid_until = now + self.cooldown
+            self.raids += 1
+
+        return raid
+
+    def rate(self, guild_id: int, now: t.Optional[float] = None) -> float:
+        joins = self.guilds.get(guild_id)
+        if joins is None:
+            return 0.0
+
+        joins.expire(time.monotonic() if now is None else now)
+        return joins.rate
+
+    def prune(self, now: t.Optional[float] = None) -> None:
+        """Drop the guilds without any joins in the window, and out of their raid cooldown."""
+        now = time.monotonic() if now is None else now
+
+        for guild_id, joins in list(self.guilds.items()):
+            joins.expire(now)
+            if not joins.joins and now >= joins.raid_until:
+                del self.guilds[guild_id]
+
+
+def benchmark(guilds: int = 1000, joins_per_minute: int = 6000, minutes: int = 5, raid_size: int = 200) -> None:
+    """Feed synthetic joins through the detector, with a raid in the middle, and print the cost per join."""
+    detector = RaidDetector()
+    rng = random.Random(0)
+
+    total = joins_per_minute * minutes
+    interval = 60 / joins_per_minute
+    raid_start = total // 2
+    raid_guild = 0
+
+    detected_after = None
+    false_positives = 0
+
+    start = time.perf_counter()
+    for index in range(total):
+        now = index * interval
+
+        if raid_start <= index < raid_start + raid_size:
+            # A burst of fresh accounts named alike, all joining the same guild.
+            guild_id = raid_guild
+            raid = detector.observe(guild_id, index, rng.uniform(0, 3600), f"raider{rng.randrange(10000)}", None, now)
+        else:
+            guild_id = rng.randrange(1, guilds)
+            raid = detector.observe(
+                guild_id, index, rng.uniform(0, 5 * 365 * 86400), f"user{rng.getrandbits(32):x}", f"{rng.getrandbits(64):x}", now
+            )
+
+        if raid is not None:
+            if guild_id == raid_guild and detected_after is None:
+                detected_after = index - raid_start + 1
+            elif guild_id != raid_guild:
+                false_positives += 1
+
+        if index % joins_per_minute == 0:
+            detector.prune(now)
+
+    elapsed = time.perf_counter() - start
+
+    print(f"{total} joins over {minutes} minutes across {guilds} guilds ({joins_per_minute}/min)")
+    print(f"{elapsed / total * 1_000_000:.2f}µs per join, {elapsed * 1000:.1f}ms in total")
+    print(f"Raid of {raid_size} joins detected after {detected_after} joins, {false_positives} false positives")
+    print(f"{len(detector.guilds)} guilds tracked at the end")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -40,6 +40,16 @@ def format_time(time: int) -> str:
     return "%02d:%02d:%02d" % (hours, minutes, seconds)
 
 
+def percentile(values: t.Iterable[float], percent: float) -> float:
+    """Get the nearest-rank percentile of the values, or 0 when there are none."""
+    values = sorted(values)
+    if not values:
+        return 0.0
+
+    index = min(len(values) - 1, int(round(percent / 100 * (len(values) - 1))))
+    return values[index]
+
+
 def progress_bar(current: int, total: int) -> str:
     barsize = 12
     num = int(current / total * barsize)
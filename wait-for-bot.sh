@@ -6,5 +6,8 @@ while ! nc -z postgres 5432; do sleep 3; done
 # Lavalink
 while ! nc -z lavalink 2333; do sleep 3; done
 
+# Apply the database migrations
+alembic upgrade head
+
 # Run the bot
 python -m bot